@@ -0,0 +1,256 @@
+"""ASGI entry point: the Flask app plus a WebSocket channel per battle.
+
+Run it with any ASGI server, e.g.
+
+    uvicorn asgi:app --port 5000
+
+Plain HTTP requests are handed to the Flask app in a worker thread, so
+every page and JSON endpoint works as under WSGI. The battle page also
+opens a WebSocket at /battle/ws (or /survival/ws) and plays over it:
+
+    client -> {"action_type": "attack", "attack_index": 1}   one turn
+    client -> {"plan": {...}}                                 a plans.py plan
+    server -> {"type": "state", ...}       bars and effects on connect
+    server -> {"type": "turn", ...}        each turn, as soon as it is played
+    server -> {"type": "done", ...}        outcome once the action or plan is finished
+    server -> {"type": "error", "error": "..."}
+
+Turns are pushed one by one while a plan runs, and an idle connection is
+just a suspended coroutine, so one worker can keep thousands of battles
+open. The socket is tied to the browser session through the Flask session
+cookie, and battle state lives in the same store as the HTTP routes (use a
+SQLite store when running several workers).
+"""
+
+import asyncio
+import json
+import sys
+import traceback
+from http.cookies import SimpleCookie
+from io import BytesIO
+
+import app as web
+from engine import InvalidAction
+from plans import ActionPlan, parse_action
+from save_store import WriteBehindStore, get_save_store
+
+WEBSOCKET_ROUTES = {"/battle/ws": False, "/survival/ws": True}  # path -> survival mode
+
+
+# ── WSGI Bridge ───────────────────────────────────────────────
+
+def _environ(scope, body):
+    """Build a WSGI environ for an ASGI HTTP request."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        "CONTENT_LENGTH": str(len(body)),
+    }
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if key == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif key != "CONTENT_LENGTH":
+            key = "HTTP_" + key
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_wsgi(environ):
+    """Run the Flask app for one request. Returns (status, headers, body)."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = headers
+
+    result = web.app.wsgi_app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return response["status"], response["headers"], body
+
+
+async def handle_http(scope, receive, send):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    status, headers, payload = await asyncio.get_running_loop().run_in_executor(
+        None, _call_wsgi, _environ(scope, bytes(body)))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+# ── Battle WebSocket ──────────────────────────────────────────
+
+def session_id(scope):
+    """Return the battle store id from the request's Flask session cookie, or None."""
+    cookie = SimpleCookie()
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            cookie.load(value.decode("latin-1"))
+    morsel = cookie.get(web.app.config["SESSION_COOKIE_NAME"])
+    if morsel is None:
+        return None
+    serializer = web.app.session_interface.get_signing_serializer(web.app)
+    try:
+        return serializer.loads(morsel.value).get("sid")
+    except Exception:  # bad signature or garbled cookie: treat as logged out
+        return None
+
+
+class BattleSocket:
+    """One WebSocket connection playing one session's battle."""
+
+    def __init__(self, sid, survival, send):
+        self.sid = sid
+        self.survival = survival
+        self._send = send
+
+    async def send(self, message):
+        await self._send({"type": "websocket.send", "text": json.dumps(message)})
+
+    def _fight(self):
+        state = web.store.get(self.sid)
+        return state, (state.active_fight(self.survival) if state else None)
+
+    def _play(self, data, on_turn):
+        """Play a client message under the session's lock, pushing each turn to on_turn.
+
+        Returns the closing "done" message, or None if there is no active
+        battle. The state is read and written back while the lock is held,
+        so an HTTP request for the same session can't interleave with it.
+        """
+        with web.store.lock(self.sid):
+            state, fight = self._fight()
+            if not fight:
+                return None
+
+            def report(events, victory_data):
+                on_turn(dict(web.turn_json(state, events, victory_data), type="turn"))
+
+            try:
+                if "plan" in data:
+                    plan = ActionPlan.from_json(data["plan"])
+                    _, victory_data, turns_played, stopped = web.run_plan(state, plan, report)
+                else:
+                    events, victory_data = web.play_turn(state, parse_action(data))
+                    report(events, victory_data)
+                    turns_played = 1
+                    stopped = "battle_over" if state.fight.over else "plan_done"
+            finally:
+                # Keep any turns already played, whatever happened after them
+                web.store.put(self.sid, state)
+            return dict(web.turn_json(state, [], victory_data), type="done",
+                        turns_played=turns_played, stopped=stopped)
+
+    async def handle(self, data):
+        """Play one client message (an action or a plan), pushing each turn as it is played."""
+        # Turns run in a worker thread and are queued back to this coroutine
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def on_turn(message):
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+        def work():
+            try:
+                return self._play(data, on_turn)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        future = loop.run_in_executor(None, work)
+        while (message := await queue.get()) is not None:
+            await self.send(message)
+        try:
+            done = await future
+        except InvalidAction as e:
+            await self.send({"type": "error", "error": str(e)})
+            return
+        except Exception as e:
+            # A plan can fail part way: report it rather than drop the socket
+            traceback.print_exc(file=sys.stderr)
+            await self.send({"type": "error", "error": f"Server error: {type(e).__name__}"})
+            return
+        if done is None:
+            await self.send({"type": "error", "error": "No active battle"})
+            return
+        await self.send(done)
+
+    async def run(self, receive):
+        state, fight = self._fight()
+        if fight:
+            await self.send(dict(web.fight_json(fight), type="state"))
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            try:
+                data = json.loads(message.get("text") or message.get("bytes") or "")
+            except ValueError:
+                await self.send({"type": "error", "error": "Messages must be JSON"})
+                continue
+            if not isinstance(data, dict):
+                await self.send({"type": "error", "error": "Messages must be JSON objects"})
+                continue
+            await self.handle(data)
+
+
+async def handle_websocket(scope, receive, send):
+    if (await receive())["type"] != "websocket.connect":
+        return
+    sid = session_id(scope)
+    if scope["path"] not in WEBSOCKET_ROUTES or not sid or web.store.get(sid) is None:
+        await send({"type": "websocket.close", "code": 4404 if sid else 4401})
+        return
+    await send({"type": "websocket.accept"})
+    await BattleSocket(sid, WEBSOCKET_ROUTES[scope["path"]], send).run(receive)
+
+
+# ── Application ───────────────────────────────────────────────
+
+async def handle_lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            store = get_save_store()
+            if isinstance(store, WriteBehindStore):
+                await asyncio.get_running_loop().run_in_executor(None, store.close)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "http":
+        await handle_http(scope, receive, send)
+    elif scope["type"] == "websocket":
+        await handle_websocket(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await handle_lifespan(scope, receive, send)
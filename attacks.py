@@ -1,9 +1,14 @@
 """Attack definitions and data structure."""
 
+from collections import namedtuple
+
 
 class Attack:
     """Represents a single attack move."""
 
+    __slots__ = ("name", "power", "accuracy", "energy_cost", "sanity_cost",
+                 "description", "status_effect")
+
     def __init__(self, name, power, accuracy, energy_cost=0, sanity_cost=0,
                  description="", status_effect=None):
         self.name = name
@@ -22,52 +27,45 @@ class Attack:
         return f"{self.name} (Pwr:{self.power} Acc:{self.accuracy}%)"
 
 
-# Player attacks — some now carry status effects
-PLAYER_ATTACKS = [
-    Attack(
-        name="Educated Guess",
-        power=15,
-        accuracy=40,
-        description="Sometimes you get lucky",
-    ),
-    Attack(
-        name="Actually Study",
-        power=45,
-        accuracy=85,
-        energy_cost=20,
-        description="Knowledge is power",
-    ),
-    Attack(
-        name="Caffeine Rush",
-        power=30,
-        accuracy=70,
-        energy_cost=-10,  # negative cost = restores energy
-        sanity_cost=5,
-        description="+10 Energy, -5 Sanity | Can weaken boss",
-        status_effect={"name": "weaken", "chance": 20, "reduction": 0.3, "turns": 2},
-    ),
-    Attack(
-        name="Cry",
-        power=5,
-        accuracy=100,
-        sanity_cost=-10,  # negative cost = restores sanity
-        description="Heals 10 Sanity, low damage",
-    ),
-    Attack(
-        name="Procrastinate",
-        power=0,
-        accuracy=100,
-        energy_cost=-30,  # restores 30 energy
-        sanity_cost=10,
-        description="Skip turn, +30 Energy, -10 Sanity",
-    ),
-    Attack(
-        name="All-Nighter",
-        power=80,
-        accuracy=60,
-        energy_cost=50,
-        sanity_cost=20,
-        description="Massive damage, can poison boss",
-        status_effect={"name": "poison", "chance": 25, "damage": 8, "turns": 3},
-    ),
-]
+class AttackTemplate(namedtuple("AttackTemplate", [
+        "name", "power", "accuracy", "energy_cost", "sanity_cost", "description", "status_effect"])):
+    """Read-only attack definition shared between battles.
+
+    Templates can be read anywhere an Attack is only read; call spawn() for
+    an Attack that a battle is free to modify.
+    """
+
+    __slots__ = ()
+
+    def spawn(self):
+        """Return a mutable Attack copy of this template.
+
+        The status effect is shared read-only with the template; nothing
+        changes it during a battle.
+        """
+        return Attack(self.name, self.power, self.accuracy, self.energy_cost, self.sanity_cost,
+                      self.description, self.status_effect)
+
+    def __str__(self):
+        return f"{self.name} (Pwr:{self.power} Acc:{self.accuracy}%)"
+
+
+# Attacks the scripted "study" policies are built around (simulate.py and
+# batch.py)
+STUDY_ATTACK = "Actually Study"
+REFILL_ATTACK = "Procrastinate"
+
+# PLAYER_ATTACKS lives in data/catalog.json (see catalog.py). Reading it
+# here returns the current catalog's attacks as a tuple of AttackTemplate.
+
+def get_player_attacks():
+    """Return the player's attacks from the live catalog."""
+    from catalog import get_catalog
+
+    return get_catalog().player_attacks
+
+
+def __getattr__(name):
+    if name == "PLAYER_ATTACKS":
+        return get_player_attacks()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
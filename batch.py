@@ -0,0 +1,263 @@
+"""NumPy batch combat kernel: many independent battles advanced in lockstep.
+
+Every battle in a batch is the same player level against the same boss.
+HP, energy, sanity and status-effect timers live in arrays, and every roll
+for a turn is drawn as one vector instead of looping over engine.Battle
+(bench_batch.py measures the speedup). The rules mirror
+engine.Battle.step(); the random streams differ, so results match the
+scalar engine statistically rather than fight-for-fight (see
+tests/test_batch.py).
+"""
+
+import numpy as np
+
+from attacks import REFILL_ATTACK, STUDY_ATTACK
+from engine import CRIT_CHANCE
+
+# Effect kinds, indexes into the per-combatant effect tables
+NO_EFFECT, POISON, STUN, WEAKEN = 0, 1, 2, 3
+EFFECT_KINDS = {"poison": POISON, "stun": STUN, "weaken": WEAKEN}
+
+# Battle results
+ONGOING, VICTORY, DEFEAT = 0, 1, 2
+
+
+class AttackTable:
+    """Column arrays for a list of Attack objects."""
+
+    def __init__(self, attacks):
+        self.names = [a.name for a in attacks]
+        self.power = np.array([a.power for a in attacks], dtype=np.int32)
+        self.accuracy = np.array([a.accuracy for a in attacks], dtype=np.int32)
+        self.energy_cost = np.array([a.energy_cost for a in attacks], dtype=np.int32)
+        self.sanity_cost = np.array([a.sanity_cost for a in attacks], dtype=np.int32)
+        effects = [a.status_effect or {} for a in attacks]
+        self.effect_kind = np.array([EFFECT_KINDS.get(se.get("name"), NO_EFFECT) for se in effects],
+                                    dtype=np.int32)
+        self.effect_chance = np.array([se.get("chance", 0) for se in effects], dtype=np.int32)
+        self.effect_turns = np.array([se.get("turns", 1) for se in effects], dtype=np.int32)
+        self.effect_damage = np.array([se.get("damage", 0) for se in effects], dtype=np.int32)
+        self.effect_reduction = np.array([se.get("reduction", 0.0) for se in effects], dtype=np.float64)
+        self.kinds = set(self.effect_kind.tolist()) - {NO_EFFECT}
+
+
+class EffectTimers:
+    """Poison, stun and weaken timers for one side of every live battle."""
+
+    FIELDS = ("poison_turns", "poison_damage", "stun_turns", "weaken_turns", "weaken_reduction")
+
+    def __init__(self, n):
+        self.poison_turns = np.zeros(n, dtype=np.int32)
+        self.poison_damage = np.zeros(n, dtype=np.int32)
+        self.stun_turns = np.zeros(n, dtype=np.int32)
+        self.weaken_turns = np.zeros(n, dtype=np.int32)
+        self.weaken_reduction = np.zeros(n, dtype=np.float64)
+
+    def compact(self, keep):
+        """Keep only the rows listed in keep (finished battles are dropped)."""
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field).take(keep))
+
+    def tick(self, hp):
+        """Apply start-of-turn effects. Returns the stunned mask."""
+        poisoned = self.poison_turns > 0
+        np.subtract(hp, self.poison_damage, out=hp, where=poisoned)
+        np.maximum(hp, 0, out=hp)
+        stunned = self.stun_turns > 0
+        for turns in (self.poison_turns, self.stun_turns, self.weaken_turns):
+            np.subtract(turns, 1, out=turns, where=turns > 0)
+        return stunned
+
+    def apply(self, table, idx, landed, rng):
+        """Roll each landed attack's status effect onto this side."""
+        if not table.kinds:
+            return
+        kind = table.effect_kind[idx]
+        rolled = landed & (randint(rng, 1, 100, idx.size) <= table.effect_chance[idx])
+        if not rolled.any():
+            return
+        turns = table.effect_turns[idx]
+
+        # Fresh effects take the attack's parameters; active ones only refresh duration
+        if POISON in table.kinds:
+            hit = rolled & (kind == POISON)
+            fresh = hit & (self.poison_turns == 0)
+            self.poison_damage += fresh * (table.effect_damage[idx] - self.poison_damage)
+            self.poison_turns += hit * (turns - self.poison_turns)
+        if STUN in table.kinds:
+            hit = rolled & (kind == STUN)
+            self.stun_turns += hit * (turns - self.stun_turns)
+        if WEAKEN in table.kinds:
+            hit = rolled & (kind == WEAKEN)
+            fresh = hit & (self.weaken_turns == 0)
+            self.weaken_reduction += fresh * (table.effect_reduction[idx] - self.weaken_reduction)
+            self.weaken_turns += hit * (turns - self.weaken_turns)
+
+
+class BatchState:
+    """Arrays describing n battles of one player against one boss.
+
+    Only battles still in progress are kept in the live arrays (hp, energy,
+    sanity, boss_hp and the effect timers); slot maps each live row back to
+    its battle number. Finished battles are written to result, turns and
+    final_hp, which always have one entry per battle.
+    """
+
+    def __init__(self, n, player, boss, player_attacks):
+        self.n = n
+        self.turn = 1
+        self.max_hp = player.max_hp
+        self.max_energy = player.max_energy
+        self.max_sanity = player.max_sanity
+        self.player_table = AttackTable(player_attacks)
+        self.boss_table = AttackTable(boss.attacks)
+
+        self.slot = np.arange(n)
+        self.hp = np.full(n, player.max_hp, dtype=np.int32)
+        self.energy = np.full(n, player.max_energy, dtype=np.int32)
+        self.sanity = np.full(n, player.max_sanity, dtype=np.int32)
+        self.boss_hp = np.full(n, boss.max_hp, dtype=np.int32)
+        self.player_effects = EffectTimers(n)
+        self.boss_effects = EffectTimers(n)
+
+        self.result = np.full(n, ONGOING, dtype=np.int8)
+        self.turns = np.zeros(n, dtype=np.int32)
+        self.final_hp = np.zeros(n, dtype=np.int32)
+
+    @property
+    def live(self):
+        """Number of battles still in progress."""
+        return self.slot.size
+
+    def affordable(self):
+        """Return a (live, attacks) mask of attacks each player can pay for."""
+        t = self.player_table
+        ok_energy = (t.energy_cost <= 0) | (self.energy[:, None] >= t.energy_cost)
+        ok_sanity = (t.sanity_cost <= 0) | (self.sanity[:, None] >= t.sanity_cost)
+        return ok_energy & ok_sanity
+
+    def retire(self, outcome):
+        """Record finished battles and drop them from the live arrays."""
+        done = outcome != ONGOING
+        if done.any():
+            slots = self.slot[done]
+            self.result[slots] = outcome[done]
+            self.turns[slots] = self.turn
+            self.final_hp[slots] = self.hp[done]
+
+            keep = np.flatnonzero(~done)
+            for field in ("slot", "hp", "energy", "sanity", "boss_hp"):
+                setattr(self, field, getattr(self, field).take(keep))
+            self.player_effects.compact(keep)
+            self.boss_effects.compact(keep)
+        self.turn += 1
+
+
+# ── Vector Policies ───────────────────────────────────────────
+# A vector policy takes (state, rng) and returns one attack index per battle.
+
+def random_policy(state, rng):
+    """Pick any affordable attack at random."""
+    keys = rng.random((state.live, state.player_table.power.size))
+    keys[~state.affordable()] = -1.0
+    return keys.argmax(axis=1)
+
+
+def greedy_policy(state, rng):
+    """Best expected damage, with Cry when sanity runs low (see simulate.greedy_policy)."""
+    t = state.player_table
+    afford = state.affordable()
+    # argmax returns the first True, so order columns by preference
+    order = np.argsort(-(t.power * t.accuracy), kind="stable")
+    action = order[afford[:, order].argmax(axis=1)]
+
+    healers = np.flatnonzero(t.sanity_cost < 0)
+    if healers.size:
+        heal = healers[0]
+        action = np.where((state.sanity <= 25) & afford[:, heal], heal, action)
+    return action
+
+
+def study_policy(state, rng):
+    """Actually Study while energy lasts, Procrastinate to refill."""
+    names = state.player_table.names
+    study, refill = names.index(STUDY_ATTACK), names.index(REFILL_ATTACK)
+    return np.where(state.affordable()[:, study], study, refill)
+
+
+VECTOR_POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "study": study_policy,
+}
+
+
+# ── Kernel ────────────────────────────────────────────────────
+# Masks are applied arithmetically (x - mask * delta) rather than with
+# np.where; it's several times cheaper on random masks.
+
+def randint(rng, low, high, n):
+    """Vector of n inclusive random integers, like random.randint()."""
+    return rng.integers(low, high + 1, n, dtype=np.int32)
+
+
+def step(state, policy, rng):
+    """Advance every live battle by one turn."""
+    n = state.live
+    pt, bt = state.player_table, state.boss_table
+    outcome = np.zeros(n, dtype=np.int8)
+
+    # Process effects at start of turn
+    player_stunned = state.player_effects.tick(state.hp)
+    boss_stunned = state.boss_effects.tick(state.boss_hp)
+
+    outcome[state.boss_hp <= 0] = VICTORY
+    outcome[state.hp <= 0] = DEFEAT
+    active = outcome == ONGOING
+
+    # Player turn (skip if stunned)
+    acting = active & ~player_stunned
+    a = policy(state, rng)
+    state.energy = np.clip(state.energy - acting * pt.energy_cost[a], 0, state.max_energy)
+    state.sanity = np.clip(state.sanity - acting * pt.sanity_cost[a], 0, state.max_sanity)
+
+    power = pt.power[a]
+    landed = acting & (power > 0) & (randint(rng, 1, 100, n) <= pt.accuracy[a])
+    damage = np.maximum(1, power + randint(rng, -5, 5, n))
+    damage *= 1 + (randint(rng, 1, 100, n) <= CRIT_CHANCE)  # critical hits double
+    state.boss_hp = np.maximum(0, state.boss_hp - landed * damage)
+    state.boss_effects.apply(pt, a, landed, rng)
+
+    outcome[active & (state.boss_hp <= 0)] = VICTORY
+    active &= outcome == ONGOING
+
+    # Boss turn (skip if stunned)
+    acting = active & ~boss_stunned
+    b = randint(rng, 0, bt.power.size - 1, n)
+    landed = acting & (randint(rng, 1, 100, n) <= bt.accuracy[b])
+    damage = np.maximum(1, bt.power[b] + randint(rng, -3, 3, n))
+    weaken = state.boss_effects
+    damage = (damage * (1.0 - weaken.weaken_reduction * (weaken.weaken_turns > 0))).astype(np.int32)
+    state.hp = np.maximum(0, state.hp - landed * damage)
+    state.sanity = np.clip(state.sanity - landed * randint(rng, 2, 8, n), 0, state.max_sanity)
+    state.player_effects.apply(bt, b, landed, rng)
+
+    # Sanity crisis
+    crisis = active & (state.sanity <= 0) & (state.hp > 0)
+    if crisis.any():
+        state.hp = np.maximum(0, state.hp - crisis * randint(rng, 10, 20, n))
+
+    outcome[active & (state.hp <= 0)] = DEFEAT
+    state.retire(outcome)
+
+
+def run_batch(n, player, boss, player_attacks, policy, seed=None, max_turns=500):
+    """Run n battles to completion. Returns the finished BatchState."""
+    rng = np.random.default_rng(seed)
+    state = BatchState(n, player, boss, player_attacks)
+    while state.live and state.turn <= max_turns:
+        step(state, policy, rng)
+    # Battles cut off by max_turns count as unfinished, like the scalar cap
+    state.turns[state.slot] = state.turn
+    state.final_hp[state.slot] = state.hp
+    return state
@@ -0,0 +1,195 @@
+"""Server-side store for web play state, keyed by a short session id.
+
+The Flask cookie only carries the id. What it points at is a WebState: the
+live Player and, during a fight, the engine Battle, kept as objects rather
+than re-serialized into the cookie on every request.
+
+Two backends share one interface (get / put / delete):
+
+    MemoryStore   in-process LRU with a TTL. Objects stay live between
+                  requests, so put() only refreshes the entry. State is
+                  per process, so use it with a single worker.
+    SQLiteStore   pickled rows in a SQLite file, shared by every worker
+                  on the host. Expired rows are deleted every purge_every
+                  puts, so the file doesn't grow with abandoned sessions.
+
+Both also hand out a per-session lock (lock(id)). A request holds it from
+get() to put(), so two requests for one session, e.g. an HTTP action and
+a WebSocket plan, can't step the same Battle at once. A MemoryStore
+returns the live object to every caller, so this is what keeps it
+consistent. Locks are per process; with SQLiteStore across several
+workers, the last put() still wins.
+
+make_store() picks one from a URL such as "memory", "memory://?max=5000&ttl=600"
+or "sqlite:///data/battles.db?purge=1000".
+"""
+
+import itertools
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_TTL = 6 * 60 * 60    # seconds an idle session is kept
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_PURGE_EVERY = 500    # SQLiteStore puts between sweeps of expired rows
+LOCK_STRIPES = 64            # session locks per store; ids share them by hash
+
+
+def new_session_id():
+    """Return a fresh, unguessable session id."""
+    return secrets.token_urlsafe(16)
+
+
+class WebState:
+    """Everything the web app keeps for one browser session."""
+
+    __slots__ = ("player", "fight", "survival_wave", "survival_xp")
+
+    def __init__(self, player):
+        self.player = player
+        self.fight = None        # engine.Battle while a battle page is open
+        self.survival_wave = 0
+        self.survival_xp = 0
+
+    def active_fight(self, survival=False):
+        """Return the fight in progress if it matches the mode, else None."""
+        fight = self.fight
+        if fight is None or fight.over or fight.survival != survival:
+            return None
+        return fight
+
+
+class SessionLocks:
+    """A fixed set of re-entrant locks that session ids map onto by hash.
+
+    Striping keeps the number of locks bounded without tracking when a
+    session ends; two sessions that share a stripe just take turns.
+    """
+
+    def __init__(self, stripes=LOCK_STRIPES):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+
+class MemoryStore:
+    """In-process LRU of live WebState objects with an idle TTL."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # id -> (expires_at, state), oldest first
+        self._lock = threading.Lock()
+        self.lock = SessionLocks()     # lock(id): held by a request using that state
+
+    def get(self, key):
+        """Return the state for an id, or None if it is unknown or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < now:
+                del self._entries[key]
+                return None
+            self._entries[key] = (now + self.ttl, entry[1])
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, state):
+        """Store (or refresh) the state for an id, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Forget an id."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """WebState rows pickled into a SQLite database, shared across processes."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, purge_every=DEFAULT_PURGE_EVERY):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._puts = itertools.count(1)
+        self._local = threading.local()
+        self.lock = SessionLocks()     # lock(id): held by a request using that state
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS battles ("
+                "id TEXT PRIMARY KEY, expires REAL NOT NULL, state BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS battles_expires ON battles (expires)")
+
+    def _conn(self):
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return the state for an id, or None if it is unknown or expired."""
+        row = self._conn().execute(
+            "SELECT state FROM battles WHERE id = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, key, state):
+        """Store the state for an id and push back its expiry."""
+        blob = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO battles (id, expires, state) VALUES (?, ?, ?)",
+                (key, time.time() + self.ttl, blob),
+            )
+        if self.purge_every and next(self._puts) % self.purge_every == 0:
+            self.purge_expired()
+
+    def delete(self, key):
+        """Forget an id."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM battles WHERE id = ?", (key,))
+
+    def purge_expired(self):
+        """Delete expired rows. Returns how many were removed."""
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM battles WHERE expires < ?", (time.time(),)).rowcount
+
+
+def make_store(url="memory"):
+    """Build a store from a URL: "memory[://?max=N&ttl=S]" or "sqlite:///path[?ttl=S&purge=N]".
+
+    purge=0 turns off the periodic sweep of expired SQLite rows.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme or parsed.path
+    params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+    ttl = float(params.get("ttl", DEFAULT_TTL))
+    if scheme == "memory":
+        return MemoryStore(int(params.get("max", DEFAULT_MAX_ENTRIES)), ttl)
+    if scheme == "sqlite":
+        # sqlite:///data/x.db is relative, sqlite:////abs/x.db absolute
+        return SQLiteStore(parsed.path[1:], ttl, int(params.get("purge", DEFAULT_PURGE_EVERY)))
+    raise ValueError(f"Unknown battle store: {url!r}")
@@ -0,0 +1,56 @@
+"""Benchmark for the NumPy batch kernel against engine.Battle.
+
+Times the same fights through simulate.run_chunk (one engine.Battle at a
+time) and simulate.run_chunk_vectorized (batch.py) on one core, per boss
+and policy, and reports fights per second and the speedup. Needs NumPy.
+Usage:
+
+    python bench_batch.py
+    python bench_batch.py --level 10 --fights 5000 --policy study
+"""
+
+import argparse
+import time
+
+from bosses import BOSS_TEMPLATES
+from simulate import POLICIES, run_chunk, run_chunk_vectorized
+
+
+def _rate(worker, job, repeat):
+    best = min(_elapsed(worker, job) for _ in range(repeat))
+    return job[-1] / best
+
+
+def _elapsed(worker, job):
+    start = time.perf_counter()
+    worker(job)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--level", type=int, default=1, help="player level (default: 1)")
+    parser.add_argument("--fights", type=int, default=2000, help="scalar fights per case")
+    parser.add_argument("--scale", type=int, default=50,
+                        help="vectorized batch size as a multiple of --fights (default: 50)")
+    parser.add_argument("--policy", action="append", choices=sorted(POLICIES),
+                        help="policy to time (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, best kept")
+    args = parser.parse_args()
+
+    print(f"  Player Lv.{args.level}: {args.fights:,} scalar / "
+          f"{args.fights * args.scale:,} vectorized fights per case")
+    print(f"  {'Boss':<20} {'Policy':<8} {'engine/s':>10} {'batch/s':>12} {'speedup':>8}")
+    for policy in args.policy or sorted(POLICIES):
+        for i, template in enumerate(BOSS_TEMPLATES):
+            if i % 5:
+                continue  # a spread of the roster, easy to hard
+            scalar = _rate(run_chunk, (i, args.level, policy, "bench", args.fights), args.repeat)
+            vector = _rate(run_chunk_vectorized,
+                           (i, args.level, policy, "bench", args.fights * args.scale), args.repeat)
+            print(f"  {template.name:<20} {policy:<8} {scalar:>10,.0f} {vector:>12,.0f} "
+                  f"{vector / scalar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Memory benchmark for live battles and the per-turn effect tick.
+
+Uses tracemalloc to measure the bytes held per live Battle (a few turns
+in, with effects active) and the bytes allocated per Battle.step(), and
+compares both with the dict-based layout the engine used before
+EffectTable: instance dicts on every object and a list of small dicts for
+each combatant's status effects. Usage:
+
+    python bench_memory.py
+    python bench_memory.py --battles 20000 --steps 50000
+"""
+
+import argparse
+import random
+import tracemalloc
+from types import SimpleNamespace
+
+from attacks import get_player_attacks
+from bosses import get_boss_templates
+from engine import EFFECT_EXPIRED_LABELS, Battle, EffectTable, process_effects
+from simulate import greedy_policy, player_at_level
+
+
+def legacy_process_effects(target, effects, target_name):
+    """process_effects() as it was over a list of effect dicts."""
+    events = []
+    stunned = False
+    remaining = []
+    for e in effects:
+        if e["name"] == "poison":
+            target.take_damage(e["damage"])
+            events.append({"type": "effect_damage",
+                           "text": f"{target_name} takes {e['damage']} poison damage!",
+                           "damage": e["damage"]})
+        elif e["name"] == "stun":
+            stunned = True
+            events.append({"type": "effect_stun", "text": f"{target_name} is stunned and can't act!"})
+        e["turns_left"] -= 1
+        if e["turns_left"] > 0:
+            remaining.append(e)
+        else:
+            events.append({"type": "effect_expire",
+                           "text": f"{EFFECT_EXPIRED_LABELS.get(e['name'], e['name'])} "
+                                   f"wore off on {target_name}."})
+    effects.clear()
+    effects.extend(remaining)
+    return events, stunned
+
+
+def _unslotted(obj):
+    """Copy a slotted object into an instance with a __dict__, as before __slots__."""
+    return SimpleNamespace(**{name: getattr(obj, name) for name in type(obj).__slots__})
+
+
+def legacy_battle(fight):
+    """The same battle state laid out the dict-based way."""
+    state = fight.__getstate__()
+    state["player"] = _unslotted(fight.player)
+    state["boss"] = _unslotted(fight.boss)
+    state["player_effects"] = fight.player_effects.to_list()
+    state["boss_effects"] = fight.boss_effects.to_list()
+    return SimpleNamespace(**state)
+
+
+def _traced(build):
+    """Return the bytes still allocated after build() runs, per tracemalloc."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()  # held until measured, so its allocations count
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return current - before
+
+
+def _battles(count, level, turns, seed):
+    rng = random.Random(seed)
+    template = get_boss_templates()[-1]  # the longest fights
+    attacks = get_player_attacks()
+    fights = []
+    for i in range(count):
+        player = player_at_level(level)
+        fight = Battle(player, template.spawn(), attacks, seed=seed + i)
+        for _ in range(turns):
+            if fight.over:
+                break
+            fight.step(None if fight.player_stunned() else greedy_policy(fight, rng))
+        fights.append(fight)
+    return fights
+
+
+_EFFECTS = ({"name": "poison", "turns_left": 3, "damage": 8},
+            {"name": "weaken", "turns_left": 2, "reduction": 0.2})
+
+
+def _copy(fight):
+    """A fresh copy of a battle's per-battle state, in the current layout."""
+    copy = Battle.__new__(Battle)
+    copy.__setstate__(fight.__getstate__())
+    copy.player = _clone(fight.player)
+    copy.boss = _clone(fight.boss)
+    copy.player_effects = EffectTable.from_list(fight.player_effects)
+    copy.boss_effects = EffectTable.from_list(fight.boss_effects)
+    return copy
+
+
+def _clone(obj):
+    copy = type(obj).__new__(type(obj))
+    for name in type(obj).__slots__:
+        setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--battles", type=int, default=5000, help="live battles measured")
+    parser.add_argument("--steps", type=int, default=20000, help="effect ticks measured")
+    parser.add_argument("--level", type=int, default=20, help="player level (default: 20)")
+    args = parser.parse_args()
+
+    fights = _battles(args.battles, args.level, 3, seed=0)
+    fights = [f for f in fights if not f.over]
+    n = len(fights)
+    # Measure only the per-battle state: the player attack list and the
+    # boss templates are shared by every battle either way
+    slotted = _traced(lambda: [_copy(f) for f in fights])
+    legacy = _traced(lambda: [legacy_battle(f) for f in fights])
+    print(f"Live battle, 3 turns in ({n:,} battles)")
+    print(f"  {'slots + EffectTable':<34} {slotted / n:8.0f} bytes")
+    print(f"  {'dicts + effect lists':<34} {legacy / n:8.0f} bytes")
+
+    # Results are kept, so the per-call figures include the returned events
+    print(f"Effect tick ({args.steps:,} calls, poison and weaken active)")
+    for label, tick, make in (
+        ("EffectTable", process_effects, lambda: EffectTable.from_list(_EFFECTS)),
+        ("effect dict list", legacy_process_effects, lambda: [dict(e) for e in _EFFECTS]),
+    ):
+        target = SimpleNamespace(hp=10 ** 9, take_damage=lambda d: None)
+        tables = [make() for _ in range(args.steps)]
+        allocated = _traced(lambda: [tick(target, t, "Boss") for t in tables])
+        print(f"  {label:<34} {allocated / args.steps:8.0f} bytes/call")
+
+    steps = _battles(args.battles, args.level, 0, seed=1)
+    rng = random.Random(1)
+    actions = [greedy_policy(f, rng) for f in steps]
+    allocated = _traced(lambda: [f.step(a) for f, a in zip(steps, actions)])
+    print(f"Battle.step() ({len(steps):,} first turns)")
+    print(f"  {'events + state changes':<34} {allocated / len(steps):8.0f} bytes/call")
+
+
+if __name__ == "__main__":
+    main()
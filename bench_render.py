@@ -0,0 +1,86 @@
+"""Micro-benchmark for the terminal render path.
+
+Times draw_hp_bar, format_active_effects and a full battle status block
+against the straightforward implementations they replaced (rebuilding
+every bar and badge string on each call), over a spread of HP values and
+effect states. Usage:
+
+    python bench_render.py
+    python bench_render.py --calls 500000
+"""
+
+import argparse
+import random
+import timeit
+
+from combat import battle_status_lines, format_active_effects
+from display import draw_hp_bar
+from engine import EffectTable
+
+
+def naive_hp_bar(current, maximum, length=20):
+    filled = int((current / maximum) * length) if maximum > 0 else 0
+    bar = "█" * filled + "░" * (length - filled)
+    return f"{bar} {current}/{maximum}"
+
+
+def naive_effects(effects):
+    if not effects:
+        return ""
+    labels = {"poison": "PSN", "stun": "STN", "weaken": "WKN"}
+    return " ".join(f"{labels.get(e['name'], e['name'])}({e['turns_left']})" for e in effects)
+
+
+class _Combatant:
+    __slots__ = ("name", "level", "hp", "max_hp", "energy", "max_energy", "sanity", "max_sanity")
+
+    def __init__(self, rng):
+        self.name, self.level = "Bench", 10
+        self.max_hp = self.max_energy = self.max_sanity = 200
+        self.hp, self.energy, self.sanity = (rng.randint(0, 200) for _ in range(3))
+
+
+def _tables(rng, count):
+    tables = []
+    for _ in range(count):
+        table = EffectTable()
+        table.turns[:] = (rng.choice((0, 0, 1, 2, 3)) for _ in range(3))
+        tables.append(table)
+    return tables
+
+
+def _time(label, func, args, calls):
+    n = len(args)
+    per_call = min(timeit.repeat(lambda: [func(*a) for a in args], number=max(1, calls // n),
+                                 repeat=5)) / max(1, calls // n) / n
+    print(f"  {label:<34} {per_call * 1e9:8.0f} ns/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000, help="calls timed per case")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    bars = [(rng.randint(0, 250), 250) for _ in range(1000)]
+    print("HP bar")
+    before = _time("rebuilt each call", naive_hp_bar, bars, args.calls)
+    after = _time("table + memoized", draw_hp_bar, bars, args.calls)
+    print(f"  {'speedup':<34} {before / after:8.1f}x")
+
+    tables = _tables(rng, 1000)
+    dict_lists = [(t.to_list(),) for t in tables]
+    print("Effect badges")
+    before = _time("rebuilt each call (dict list)", naive_effects, dict_lists, args.calls)
+    after = _time("cached (EffectTable)", format_active_effects, [(t,) for t in tables], args.calls)
+    _time("cached (dict list)", format_active_effects, dict_lists, args.calls)
+    print(f"  {'speedup':<34} {before / after:8.1f}x")
+
+    print("Status block")
+    cases = [(_Combatant(rng), _Combatant(rng), t, t) for t in tables]
+    _time("battle_status_lines", battle_status_lines, cases, args.calls // 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Save-store benchmark and crash check.
+
+Measures Player.save() latency while several processes save at once, and
+checks that killing a writer mid-save never leaves a torn record. Runs
+against a scratch store in a temp directory unless --url is given. Usage:
+
+    python bench_saves.py --procs 8 --saves 500
+    python bench_saves.py --url dir:///tmp/saves --procs 16
+    python bench_saves.py --crash 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import tempfile
+import time
+
+import save_store
+from player import Player
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+# ── Contention Benchmark ──────────────────────────────────────
+
+def _saver(url, worker, saves, players, queue):
+    """Save random players from a shared pool; report each save's latency."""
+    save_store.set_save_store(save_store.make_save_store(url))
+    rng = random.Random(worker)
+    pool = [Player(f"player{i}") for i in range(players)]
+    latencies = []
+    for _ in range(saves):
+        player = rng.choice(pool)
+        player.wins += 1
+        start = time.perf_counter()
+        player.save()
+        latencies.append(time.perf_counter() - start)
+    queue.put(latencies)
+
+
+def run_benchmark(url, procs, saves, players):
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_saver, args=(url, w, saves, players, queue))
+               for w in range(procs)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    latencies = sorted(x for _ in workers for x in queue.get())
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{url}: {procs} processes x {saves} saves over {players} players")
+    print(f"  {len(latencies) / elapsed:,.0f} saves/s")
+    for pct in (50, 90, 99):
+        print(f"  p{pct}: {_percentile(latencies, pct) * 1000:.2f} ms")
+    print(f"  max: {latencies[-1] * 1000:.2f} ms")
+
+
+# ── Crash Check ───────────────────────────────────────────────
+
+def _crash_writer(url):
+    """Save the same few players forever, with records big enough to span several writes."""
+    store = save_store.make_save_store(url)
+    players = [Player(f"victim{i}") for i in range(4)]
+    for p in players:
+        p.bosses_defeated = [f"Boss {n}" for n in range(2000)]
+    while True:
+        for p in players:
+            p.wins += 1
+            store.put(p.name, p.to_dict())
+
+
+def run_crash_check(url, rounds):
+    """Kill a writer at random moments and check every record still parses."""
+    store = save_store.make_save_store(url)
+    torn = 0
+    for _ in range(rounds):
+        writer = multiprocessing.Process(target=_crash_writer, args=(url,))
+        writer.start()
+        time.sleep(random.uniform(0.01, 0.2))
+        os.kill(writer.pid, signal.SIGKILL)
+        writer.join()
+        for name in store.names():
+            try:
+                record = store.get(name)
+            except (ValueError, json.JSONDecodeError):
+                record = None
+            if not record or record.get("name") != name:
+                torn += 1
+    print(f"{url}: killed the writer {rounds} times, {torn} torn record(s) found")
+    return torn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", action="append",
+                        help="save store URL (repeatable; default: a scratch SQLite and dir store)")
+    parser.add_argument("--procs", type=int, default=8, help="concurrent saving processes")
+    parser.add_argument("--saves", type=int, default=500, help="saves per process")
+    parser.add_argument("--players", type=int, default=50, help="distinct players saved")
+    parser.add_argument("--crash", type=int, metavar="ROUNDS",
+                        help="run the kill-mid-save check instead of the benchmark")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_saves_")
+    urls = args.url or [f"sqlite:///{scratch}/saves.db", f"dir:///{scratch}/saves"]
+    try:
+        if args.crash:
+            torn = sum(run_crash_check(url, args.crash) for url in urls)
+            raise SystemExit(1 if torn else 0)
+        for url in urls:
+            run_benchmark(url, args.procs, args.saves, args.players)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
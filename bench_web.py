@@ -0,0 +1,256 @@
+"""Load generator for the web battle endpoints.
+
+Simulated users play the way a browser does: log in with /start, then
+alternate boss battles (/battle/start, the battle page, /battle/action
+until the fight ends or they run) and survival runs (/survival/start,
+/survival/action until they fall). Each user keeps its own session cookie
+and several users share a pool of player names, so session handling and
+save contention are both exercised.
+
+By default the app is driven in-process through Flask's test client, with
+saves and the event log in a scratch directory; --url drives a running
+server instead. Reports per-endpoint p50/p95/p99 latency, throughput,
+error rates and session cookie sizes. Usage:
+
+    python bench_web.py --users 16 --battles 10
+    python bench_web.py --users 8 --players 2        # heavy save contention
+    python bench_web.py --url http://127.0.0.1:5000 --users 32
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookies import SimpleCookie
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+# ── Transports ────────────────────────────────────────────────
+# Both transports leave cookies to the caller, so cookie sizes are
+# measured the same way whichever one is used.
+
+class TestClientTransport:
+    """Sends requests to the app in-process through Flask's test client."""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client(use_cookies=False)
+
+    def request(self, method, path, headers, form=None, payload=None):
+        response = self.client.open(path, method=method, headers=headers,
+                                    data=form, json=payload)
+        return response.status_code, response.headers.getlist("Set-Cookie"), response.data
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPTransport:
+    """Sends requests to a running server over HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+    def request(self, method, path, headers, form=None, payload=None):
+        headers = dict(headers)
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode(form).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self.base_url + path, data=body, headers=headers,
+                                     method=method)
+        try:
+            with self.opener.open(req) as response:
+                return response.status, response.headers.get_all("Set-Cookie") or [], response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get_all("Set-Cookie") or [], e.read()
+
+
+# ── Simulated Users ───────────────────────────────────────────
+
+class Stats:
+    """Latencies, statuses and cookie sizes collected from every user."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}   # endpoint -> [seconds]
+        self.errors = {}      # endpoint -> count
+        self.cookie_sizes = []
+        self.outcomes = {}    # result -> count
+
+    def add(self, endpoint, elapsed, failed, cookie_size):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + failed
+            self.cookie_sizes.append(cookie_size)
+
+    def outcome(self, result):
+        with self.lock:
+            self.outcomes[result] = self.outcomes.get(result, 0) + 1
+
+
+class User:
+    """One browser session playing battles through a transport."""
+
+    def __init__(self, transport, stats, name, rng, max_turns):
+        from attacks import get_player_attacks
+        from bosses import get_boss_templates
+
+        self.transport = transport
+        self.stats = stats
+        self.name = name
+        self.rng = rng
+        self.max_turns = max_turns
+        self.cookies = {}
+        # (energy, sanity) cost of each attack, by attack_index
+        self.attack_costs = [(max(a.energy_cost, 0), max(a.sanity_cost, 0))
+                             for a in get_player_attacks()]
+        self.boss_count = len(get_boss_templates())
+
+    def _cookie_header(self):
+        return "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+
+    def call(self, method, path, form=None, payload=None, ok=(200, 302)):
+        """Make one request, time it and keep any cookies it sets. Returns (status, body)."""
+        cookie = self._cookie_header()
+        headers = {"Cookie": cookie} if cookie else {}
+        start = time.perf_counter()
+        status, set_cookies, body = self.transport.request(method, path, headers, form, payload)
+        elapsed = time.perf_counter() - start
+        for header in set_cookies:
+            parsed = SimpleCookie(header)
+            for key, morsel in parsed.items():
+                if morsel["max-age"] == "0" or not morsel.value:
+                    self.cookies.pop(key, None)
+                else:
+                    self.cookies[key] = morsel.value
+        self.stats.add(f"{method} {path}", elapsed, status not in ok, len(cookie))
+        return status, body
+
+    def choose_action(self, bars):
+        """Pick an affordable attack like a casual player would, or try to run now and then."""
+        if self.rng.random() < 0.03:
+            return {"action_type": "run"}
+        player = bars["player"]
+        choices = [i for i, (energy, sanity) in enumerate(self.attack_costs)
+                   if energy <= player["energy"] and sanity <= player["sanity"]]
+        return {"action_type": "attack", "attack_index": self.rng.choice(choices or [0])}
+
+    def fight(self, survival):
+        """Play one battle or survival run to the end (or until max_turns)."""
+        mode = "survival" if survival else "battle"
+        form = None if survival else {"boss_index": str(self.rng.randrange(self.boss_count))}
+        self.call("POST", f"/{mode}/start", form=form)
+        status, body = self.call("GET", f"/{mode}", ok=(200,))
+        if status != 200:
+            return
+        # The page only renders HTML; start from full bars as the browser would
+        bars = {"player": {"energy": 100, "sanity": 100}}
+        for _ in range(self.max_turns):
+            status, body = self.call("POST", f"/{mode}/action", payload=self.choose_action(bars),
+                                     ok=(200,))
+            if status != 200:
+                self.stats.outcome("error")
+                return
+            bars = json.loads(body)
+            if bars["battle_over"]:
+                self.stats.outcome(f"{mode} {bars['result']}")
+                return
+        self.stats.outcome(f"{mode} unfinished")
+
+    def run(self, battles, survival_share):
+        self.call("POST", "/start", form={"name": self.name})
+        for _ in range(battles):
+            self.fight(survival=self.rng.random() < survival_share)
+
+
+# ── Report ────────────────────────────────────────────────────
+
+def report(stats, elapsed):
+    total = sum(len(v) for v in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"{'endpoint':<24} {'reqs':>7} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for endpoint in sorted(stats.latencies):
+        values = sorted(stats.latencies[endpoint])
+        n = len(values)
+        print(f"{endpoint:<24} {n:>7} {stats.errors[endpoint] / n * 100:>6.2f} "
+              + " ".join(f"{_percentile(values, p) * 1000:>8.2f}" for p in (50, 95, 99))
+              + f" {values[-1] * 1000:>8.2f}")
+    cookies = sorted(stats.cookie_sizes)
+    print()
+    print(f"  {total} requests in {elapsed:.2f}s: {total / elapsed:,.0f} req/s, "
+          f"{errors} error(s) ({errors / max(total, 1) * 100:.2f}%)")
+    print(f"  cookie bytes sent: mean {sum(cookies) / len(cookies):.0f}, "
+          f"p99 {_percentile(cookies, 99)}, max {cookies[-1]}")
+    print("  outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(stats.outcomes.items())))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server (default: in-process test client)")
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--battles", type=int, default=5, help="battles or survival runs per user")
+    parser.add_argument("--players", type=int, help="distinct player names shared by the users "
+                                                    "(default: one per user)")
+    parser.add_argument("--survival", type=float, default=0.3,
+                        help="share of fights that are survival runs")
+    parser.add_argument("--max-turns", type=int, default=150, help="turns before a fight is abandoned")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the users' choices")
+    args = parser.parse_args()
+
+    scratch = None
+    if args.url:
+        make_transport = lambda: HTTPTransport(args.url)
+    else:
+        # Keep the benchmark's saves and events out of data/ unless told otherwise
+        scratch = tempfile.mkdtemp(prefix="bench_web_")
+        os.environ.setdefault("BOSS_BATTLE_SAVES", f"sqlite:///{scratch}/saves.db")
+        os.environ.setdefault("BOSS_BATTLE_EVENT_LOG", os.path.join(scratch, "events.log"))
+        import app as web
+        make_transport = lambda: TestClientTransport(web.app)
+
+    players = args.players or args.users
+    stats = Stats()
+    users = [User(make_transport(), stats, f"load{i % players}", random.Random(args.seed * 1000 + i),
+                  args.max_turns)
+             for i in range(args.users)]
+    threads = [threading.Thread(target=u.run, args=(args.battles, args.survival)) for u in users]
+    try:
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if scratch:
+            from save_store import get_save_store
+            close = getattr(get_save_store(), "close", None)
+            if close:
+                close()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{args.url or 'in-process'}: {args.users} users x {args.battles} fights "
+          f"over {players} player(s)")
+    raise SystemExit(1 if report(stats, elapsed) else 0)
+
+
+if __name__ == "__main__":
+    main()
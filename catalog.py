@@ -0,0 +1,286 @@
+"""Boss and attack catalog loaded from data/catalog.json.
+
+The JSON file is the source of truth for PLAYER_ATTACKS and the boss roster.
+It is validated against a small schema and compiled into read-only
+templates, and the compiled form is pickled to data/catalog.cache so later
+processes skip parsing and validation. The cache records the source's
+mtime and size and is rebuilt whenever they change.
+
+get_catalog() re-checks the source on each call (one stat), so a running
+Flask worker picks up balance edits without a restart. If an edited file
+fails validation the previous catalog stays in use.
+"""
+
+import copyreg
+import json
+import os
+import pickle
+import threading
+import warnings
+from bisect import bisect_right
+from types import MappingProxyType
+
+from attacks import AttackTemplate
+from bosses import BossTemplate
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "catalog.json")
+CACHE_VERSION = 1
+
+EFFECT_NAMES = ("poison", "stun", "weaken")
+
+
+def _read_only(d):
+    """Wrap a status-effect dict so templates can't be modified through it."""
+    return MappingProxyType(d)
+
+
+# Status effects are MappingProxyType in templates; pickle them as dicts.
+copyreg.pickle(MappingProxyType, lambda m: (_read_only, (dict(m),)))
+
+
+class CatalogError(ValueError):
+    """Raised when the catalog file is missing, malformed, or fails validation."""
+
+
+# ── Schema Validation ─────────────────────────────────────────
+
+ATTACK_FIELDS = {"name", "power", "accuracy", "energy_cost", "sanity_cost",
+                 "description", "status_effect"}
+BOSS_FIELDS = {"name", "level", "hp", "attacks", "art", "intro_quote", "defeat_quote"}
+EFFECT_FIELDS = {
+    "poison": {"name", "chance", "turns", "damage"},
+    "stun": {"name", "chance", "turns"},
+    "weaken": {"name", "chance", "turns", "reduction"},
+}
+
+
+def _check(cond, where, message):
+    if not cond:
+        raise CatalogError(f"{where}: {message}")
+
+
+def _check_int(obj, key, where, low=None, high=None, required=True):
+    """Validate an integer field, optionally bounded. Returns its value."""
+    if key not in obj:
+        _check(not required, where, f"missing '{key}'")
+        return None
+    value = obj[key]
+    _check(isinstance(value, int) and not isinstance(value, bool), f"{where}.{key}",
+           "expected an integer")
+    _check(low is None or value >= low, f"{where}.{key}", f"must be >= {low}")
+    _check(high is None or value <= high, f"{where}.{key}", f"must be <= {high}")
+    return value
+
+
+def _check_str(obj, key, where, required=False):
+    if key not in obj:
+        _check(not required, where, f"missing '{key}'")
+        return
+    _check(isinstance(obj[key], str), f"{where}.{key}", "expected a string")
+    _check(obj[key] or not required, f"{where}.{key}", "must not be empty")
+
+
+def _check_keys(obj, allowed, where):
+    _check(isinstance(obj, dict), where, "expected an object")
+    unknown = set(obj) - allowed
+    _check(not unknown, where, f"unknown field(s) {', '.join(sorted(unknown))}")
+
+
+def validate_effect(se, where):
+    """Validate a status_effect object."""
+    _check(isinstance(se, dict), where, "expected an object")
+    _check(se.get("name") in EFFECT_NAMES, f"{where}.name",
+           f"expected one of {', '.join(EFFECT_NAMES)}")
+    _check_keys(se, EFFECT_FIELDS[se["name"]], where)
+    _check_int(se, "chance", where, 0, 100)
+    _check_int(se, "turns", where, 1, required=False)
+    if se["name"] == "poison":
+        _check_int(se, "damage", where, 1)
+    elif se["name"] == "weaken":
+        _check("reduction" in se, where, "missing 'reduction'")
+        value = se["reduction"]
+        _check(isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value < 1,
+               f"{where}.reduction", "expected a number in [0, 1)")
+
+
+def validate_attack(atk, where):
+    """Validate one attack object."""
+    _check_keys(atk, ATTACK_FIELDS, where)
+    _check_str(atk, "name", where, required=True)
+    _check_int(atk, "power", where, 0)
+    _check_int(atk, "accuracy", where, 0, 100)
+    _check_int(atk, "energy_cost", where, required=False)
+    _check_int(atk, "sanity_cost", where, required=False)
+    _check_str(atk, "description", where)
+    if atk.get("status_effect") is not None:
+        validate_effect(atk["status_effect"], f"{where}.status_effect")
+
+
+def validate_boss(boss, where):
+    """Validate one boss object."""
+    _check_keys(boss, BOSS_FIELDS, where)
+    _check_str(boss, "name", where, required=True)
+    _check_int(boss, "level", where, 1)
+    _check_int(boss, "hp", where, 1)
+    for key in ("art", "intro_quote", "defeat_quote"):
+        _check_str(boss, key, where)
+    attacks = boss.get("attacks")
+    _check(isinstance(attacks, list) and attacks, f"{where}.attacks", "expected a non-empty list")
+    for i, atk in enumerate(attacks):
+        validate_attack(atk, f"{where}.attacks[{i}]")
+
+
+def validate(data):
+    """Validate a parsed catalog document. Raises CatalogError on the first problem."""
+    _check_keys(data, {"version", "player_attacks", "bosses"}, "catalog")
+    _check(data.get("version") == 1, "catalog.version", "unsupported version")
+    for key in ("player_attacks", "bosses"):
+        _check(isinstance(data.get(key), list) and data[key], f"catalog.{key}",
+               "expected a non-empty list")
+    for i, atk in enumerate(data["player_attacks"]):
+        validate_attack(atk, f"player_attacks[{i}]")
+    names = set()
+    for i, boss in enumerate(data["bosses"]):
+        where = f"bosses[{i}]"
+        validate_boss(boss, where)
+        _check(boss["name"] not in names, f"{where}.name", f"duplicate boss {boss['name']!r}")
+        names.add(boss["name"])
+
+
+# ── Compiling ─────────────────────────────────────────────────
+
+def _attack_template(atk):
+    se = atk.get("status_effect")
+    return AttackTemplate(atk["name"], atk["power"], atk["accuracy"], atk.get("energy_cost", 0),
+                          atk.get("sanity_cost", 0), atk.get("description", ""),
+                          _read_only(dict(se)) if se else None)
+
+
+def _boss_template(boss):
+    return BossTemplate(boss["name"], boss["level"], boss["hp"],
+                        tuple(_attack_template(a) for a in boss["attacks"]),
+                        boss.get("art", ""), boss.get("intro_quote", ""),
+                        boss.get("defeat_quote", ""))
+
+
+class Catalog:
+    """Compiled catalog: player attacks and boss templates with lookup indexes."""
+
+    def __init__(self, player_attacks, bosses, source_stamp=None):
+        self.player_attacks = player_attacks  # tuple of AttackTemplate
+        self.bosses = bosses                  # tuple of BossTemplate, in file order
+        self.source_stamp = source_stamp      # (mtime_ns, size) of the JSON it came from
+        self.by_name = {b.name: b for b in bosses}
+        self.by_level = sorted(bosses, key=lambda b: b.level)
+        self.levels = [b.level for b in self.by_level]
+
+    @classmethod
+    def from_data(cls, data, source_stamp=None):
+        """Validate a parsed catalog document and compile it."""
+        validate(data)
+        return cls(tuple(_attack_template(a) for a in data["player_attacks"]),
+                   tuple(_boss_template(b) for b in data["bosses"]),
+                   source_stamp)
+
+    def up_to_level(self, level):
+        """Return every boss at or below a level, lowest first."""
+        return self.by_level[:bisect_right(self.levels, level)]
+
+    def __getstate__(self):
+        # Only the templates are stored; the indexes are rebuilt on load
+        return (self.player_attacks, self.bosses, self.source_stamp)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+# ── Loading ───────────────────────────────────────────────────
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def cache_path(path):
+    """Return where the compiled cache for a catalog file lives."""
+    return os.path.splitext(path)[0] + ".cache"
+
+
+def _read_cache(path, stamp):
+    try:
+        with open(cache_path(path), "rb") as f:
+            version, cached_stamp, catalog = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        return None
+    if version != CACHE_VERSION or cached_stamp != stamp:
+        return None
+    return catalog
+
+
+def _write_cache(path, catalog):
+    """Write the compiled cache atomically; a failure just means no cache."""
+    target = cache_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump((CACHE_VERSION, catalog.source_stamp, catalog), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except (OSError, pickle.PicklingError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def load_catalog(path=CATALOG_PATH, use_cache=True):
+    """Load a catalog file, from its compiled cache when that is up to date."""
+    try:
+        stamp = _stamp(path)
+    except OSError as e:
+        raise CatalogError(f"Can't read catalog {path}: {e}") from e
+
+    if use_cache:
+        catalog = _read_cache(path, stamp)
+        if catalog is not None:
+            return catalog
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise CatalogError(f"Can't read catalog {path}: {e}") from e
+
+    catalog = Catalog.from_data(data, stamp)
+    if use_cache:
+        _write_cache(path, catalog)
+    return catalog
+
+
+_current = None
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the live catalog, reloading it if the source file has changed."""
+    global _current
+    catalog = _current
+    try:
+        stamp = _stamp(CATALOG_PATH)
+    except OSError:
+        stamp = None
+    if catalog is not None and (stamp is None or stamp == catalog.source_stamp):
+        return catalog
+
+    with _lock:
+        if _current is not catalog:  # another thread already reloaded
+            return _current
+        try:
+            _current = load_catalog()
+        except CatalogError as e:
+            if catalog is None:
+                raise
+            # Keep serving the last good catalog until the file is fixed
+            warnings.warn(f"Catalog reload failed, keeping previous version: {e}")
+            catalog.source_stamp = stamp
+        return _current
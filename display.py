@@ -1,90 +1,243 @@
 """Display helpers for formatting, ASCII art, and UI boxes."""
 
+import os
+import sys
 import time
+import warnings
+from functools import lru_cache
+
+
+# ── Pacing ──────────────────────────────────────────────────
+# Typing effects and dramatic pauses are scaled by the pacing mode:
+# "normal", "fast" (a quarter of the delay) or "instant" (no sleeps, and
+# output is buffered until the next prompt). Set it with --pacing or the
+# BOSS_BATTLE_PACING environment variable.
+
+PACING_SCALES = {"normal": 1.0, "fast": 0.25, "instant": 0.0}
+_pacing_scale = 1.0
+
+
+def set_pacing(mode):
+    """Switch the pacing mode. Raises ValueError for an unknown mode."""
+    global _pacing_scale
+    if mode not in PACING_SCALES:
+        raise ValueError(f"Unknown pacing {mode!r}; choose from {', '.join(PACING_SCALES)}")
+    _pacing_scale = PACING_SCALES[mode]
+    # input() flushes stdout itself, so instant mode can drop per-line flushes
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=_pacing_scale > 0 and sys.stdout.isatty())
+
+
+def pause(seconds):
+    """Sleep for a dramatic pause, scaled by the pacing mode."""
+    if _pacing_scale:
+        time.sleep(seconds * _pacing_scale)
+
+
+# ── Frames ──────────────────────────────────────────────────
+# Screens are assembled into a Frame and written with one write() call
+# instead of a print() (and, on a terminal, a flush) per line.
+
+def write(text):
+    """Write text to stdout in a single call."""
+    sys.stdout.write(text)
+    if _pacing_scale:
+        sys.stdout.flush()
+
+
+class Frame:
+    """The lines of one screen, written out together."""
+
+    __slots__ = ("lines",)
+
+    def __init__(self, lines=()):
+        self.lines = list(lines)
+
+    def add(self, line=""):
+        self.lines.append(line)
+
+    def extend(self, lines):
+        self.lines.extend(lines)
+
+    def render(self):
+        return "\n".join(self.lines) + "\n"
+
+    def show(self):
+        write(self.render())
+
+
+def ansi_terminal(stream=None):
+    """Return True if a stream is a terminal that understands cursor movement."""
+    stream = stream or sys.stdout
+    try:
+        tty = stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+    return tty and os.name != "nt" and os.environ.get("TERM", "dumb") != "dumb"
+
+
+class LivePanel:
+    """A block of lines pinned to the top of the terminal and redrawn by diff.
+
+    The first update() scrolls the screen clear, draws the block and limits
+    scrolling to the rows below it, so prompts and battle events scroll
+    underneath. Later updates rewrite only the lines that changed, with the
+    cursor saved and restored around them. Where the terminal can't do that
+    (not a TTY, TERM=dumb, Windows), every update prints the whole block.
+    Use it as a context manager so the scroll region is always reset.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.live = ansi_terminal(self.stream)
+        self.lines = None
+
+    def update(self, lines):
+        """Show a new version of the block."""
+        lines = list(lines)
+        if not self.live:
+            self.stream.write("\n".join(lines) + "\n")
+        elif self.lines is None or len(lines) != len(self.lines):
+            rows = max(os.get_terminal_size(self.stream.fileno()).lines, len(lines) + 2)
+            self.stream.write(
+                "\n" * rows + "\x1b[H"  # push what's on screen up into the scrollback
+                + "\n".join(lines)
+                + f"\x1b[{len(lines) + 1};{rows}r"  # scroll only below the panel
+                + f"\x1b[{rows};1H"
+            )
+        else:
+            changed = [f"\x1b[{row};1H\x1b[2K{line}"
+                       for row, (line, old) in enumerate(zip(lines, self.lines), 1) if line != old]
+            if changed:
+                self.stream.write("\x1b7" + "".join(changed) + "\x1b8")
+        self.stream.flush()
+        self.lines = lines
+
+    def close(self):
+        """Release the pinned rows back to normal scrolling."""
+        if self.live and self.lines is not None:
+            self.stream.write("\x1b[r\x1b[999;1H\n")
+            self.stream.flush()
+        self.lines = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 def draw_box(title, lines):
     """Draw a bordered box with a title and content lines."""
+    frame = Frame()
     width = 60
     border = "=" * width
-    print(f"\n╔{border}╗")
-    print(f"║{title:^{width}}║")
-    print(f"╠{border}╣")
+    frame.add(f"\n╔{border}╗")
+    frame.add(f"║{title:^{width}}║")
+    frame.add(f"╠{border}╣")
     for line in lines:
-        print(f"║  {line:<{width - 2}}║")
-    print(f"╚{border}╝")
+        frame.add(f"║  {line:<{width - 2}}║")
+    frame.add(f"╚{border}╝")
+    frame.show()
+
+
+_bar_tables = {}  # length -> every bar of that length, indexed by filled cells
+
 
+def bar_table(length):
+    """Return the precomputed bars for a length: table[n] has n of `length` cells filled."""
+    table = _bar_tables.get(length)
+    if table is None:
+        table = _bar_tables[length] = tuple("█" * n + "░" * (length - n) for n in range(length + 1))
+    return table
 
+
+@lru_cache(maxsize=4096)
 def draw_hp_bar(current, maximum, length=20):
-    """Return an HP bar string like: ████████░░░░ 80/100"""
+    """Return an HP bar string like: ████████░░░░ 80/100
+
+    Bars are built from bar_table() and the finished strings are memoized,
+    so redrawing an unchanged bar is a cache lookup.
+    """
     filled = int((current / maximum) * length) if maximum > 0 else 0
-    empty = length - filled
-    bar = "█" * filled + "░" * empty
+    bar = bar_table(length)[min(max(filled, 0), length)]
     return f"{bar} {current}/{maximum}"
 
 
 def draw_title_screen():
     """Display the game title screen."""
-    print()
-    print("╔════════════════════════════════════════════════════════════════╗")
-    print("║                                                              ║")
-    print("║      ⚔️  BOSS BATTLE SIMULATOR: LIFE EDITION ⚔️               ║")
-    print("║                                                              ║")
-    print("║               ╔═══════════════════════╗                      ║")
-    print("║               ║   _____               ║                      ║")
-    print("║               ║  |     |  FIGHT YOUR  ║                      ║")
-    print("║               ║  | x_x |  DAILY       ║                      ║")
-    print("║               ║  |_____|  DEMONS       ║                      ║")
-    print("║               ╚═══════════════════════╝                      ║")
-    print("║                                                              ║")
-    print("║            [ Press ENTER to begin your fate ]                ║")
-    print("║                                                              ║")
-    print("╚════════════════════════════════════════════════════════════════╝")
+    frame = Frame()
+    frame.add()
+    frame.add("╔════════════════════════════════════════════════════════════════╗")
+    frame.add("║                                                              ║")
+    frame.add("║      ⚔️  BOSS BATTLE SIMULATOR: LIFE EDITION ⚔️               ║")
+    frame.add("║                                                              ║")
+    frame.add("║               ╔═══════════════════════╗                      ║")
+    frame.add("║               ║   _____               ║                      ║")
+    frame.add("║               ║  |     |  FIGHT YOUR  ║                      ║")
+    frame.add("║               ║  | x_x |  DAILY       ║                      ║")
+    frame.add("║               ║  |_____|  DEMONS       ║                      ║")
+    frame.add("║               ╚═══════════════════════╝                      ║")
+    frame.add("║                                                              ║")
+    frame.add("║            [ Press ENTER to begin your fate ]                ║")
+    frame.add("║                                                              ║")
+    frame.add("╚════════════════════════════════════════════════════════════════╝")
+    frame.show()
 
 
 def draw_victory():
     """Display the victory screen."""
-    print()
-    print("  ╔════════════════════════════════════════╗")
-    print("  ║                                        ║")
-    print("  ║     ★  ★  ★  ★  ★  ★  ★  ★  ★        ║")
-    print("  ║                                        ║")
-    print("  ║         🎉  V I C T O R Y !  🎉        ║")
-    print("  ║                                        ║")
-    print("  ║     ★  ★  ★  ★  ★  ★  ★  ★  ★        ║")
-    print("  ║                                        ║")
-    print("  ╚════════════════════════════════════════╝")
+    frame = Frame()
+    frame.add()
+    frame.add("  ╔════════════════════════════════════════╗")
+    frame.add("  ║                                        ║")
+    frame.add("  ║     ★  ★  ★  ★  ★  ★  ★  ★  ★        ║")
+    frame.add("  ║                                        ║")
+    frame.add("  ║         🎉  V I C T O R Y !  🎉        ║")
+    frame.add("  ║                                        ║")
+    frame.add("  ║     ★  ★  ★  ★  ★  ★  ★  ★  ★        ║")
+    frame.add("  ║                                        ║")
+    frame.add("  ╚════════════════════════════════════════╝")
+    frame.show()
 
 
 def draw_defeat():
     """Display the defeat screen."""
-    print()
-    print("  ╔════════════════════════════════════════╗")
-    print("  ║                                        ║")
-    print("  ║            ┌─────────┐                 ║")
-    print("  ║            │  R.I.P  │                 ║")
-    print("  ║            │  Your   │                 ║")
-    print("  ║            │  G.P.A  │                 ║")
-    print("  ║            └────┬────┘                 ║")
-    print("  ║              ___|___                   ║")
-    print("  ║                                        ║")
-    print("  ║         💀  D E F E A T E D  💀        ║")
-    print("  ║                                        ║")
-    print("  ╚════════════════════════════════════════╝")
+    frame = Frame()
+    frame.add()
+    frame.add("  ╔════════════════════════════════════════╗")
+    frame.add("  ║                                        ║")
+    frame.add("  ║            ┌─────────┐                 ║")
+    frame.add("  ║            │  R.I.P  │                 ║")
+    frame.add("  ║            │  Your   │                 ║")
+    frame.add("  ║            │  G.P.A  │                 ║")
+    frame.add("  ║            └────┬────┘                 ║")
+    frame.add("  ║              ___|___                   ║")
+    frame.add("  ║                                        ║")
+    frame.add("  ║         💀  D E F E A T E D  💀        ║")
+    frame.add("  ║                                        ║")
+    frame.add("  ╚════════════════════════════════════════╝")
+    frame.show()
 
 
 def draw_boss_entrance(boss_name):
     """Show dramatic boss entrance with ASCII art."""
+    frame = Frame()
     art = BOSS_ART.get(boss_name, BOSS_ART["default"])
-    print()
-    print("  ╔════════════════════════════════════════╗")
+    frame.add()
+    frame.add("  ╔════════════════════════════════════════╗")
     for line in art:
-        print(f"  ║  {line:<38}║")
-    print("  ╚════════════════════════════════════════╝")
+        frame.add(f"  ║  {line:<38}║")
+    frame.add("  ╚════════════════════════════════════════╝")
+    frame.show()
 
 
 def type_text(text, delay=0.03):
-    """Print text with a typing effect."""
+    """Print text with a typing effect (all at once in instant pacing)."""
+    if not _pacing_scale:
+        print(text)
+        return
+    delay *= _pacing_scale
     for char in text:
         print(char, end="", flush=True)
         time.sleep(delay)
@@ -93,14 +246,16 @@ def type_text(text, delay=0.03):
 
 def draw_attack_hit(damage, critical=False):
     """Show attack impact visual."""
+    frame = Frame()
     if critical:
-        print("              ╔═══════════════╗")
-        print("              ║  ★ CRITICAL   ║")
-        print("              ║     HIT! ★    ║")
-        print(f"              ║   -{damage} HP!     ║")
-        print("              ╚═══════════════╝")
+        frame.add("              ╔═══════════════╗")
+        frame.add("              ║  ★ CRITICAL   ║")
+        frame.add("              ║     HIT! ★    ║")
+        frame.add(f"              ║   -{damage} HP!     ║")
+        frame.add("              ╚═══════════════╝")
     else:
-        print(f"              >>> -{damage} HP! <<<")
+        frame.add(f"              >>> -{damage} HP! <<<")
+    frame.show()
 
 
 def draw_miss():
@@ -110,28 +265,32 @@ def draw_miss():
 
 def draw_level_up(player):
     """Show level up celebration."""
-    print()
-    print("  ╔══════════════════════════════════════╗")
-    print("  ║                                      ║")
-    print("  ║     ★  ★  ★  LEVEL UP!  ★  ★  ★     ║")
-    print(f"  ║         Now Level {player.level}!{' ' * (18 - len(str(player.level)))}║")
-    print("  ║                                      ║")
-    print(f"  ║     Max HP:     {player.max_hp}{' ' * (20 - len(str(player.max_hp)))}║")
-    print(f"  ║     Max Energy: {player.max_energy}{' ' * (20 - len(str(player.max_energy)))}║")
-    print(f"  ║     Max Sanity: {player.max_sanity}{' ' * (20 - len(str(player.max_sanity)))}║")
-    print("  ║                                      ║")
-    print("  ╚══════════════════════════════════════╝")
+    frame = Frame()
+    frame.add()
+    frame.add("  ╔══════════════════════════════════════╗")
+    frame.add("  ║                                      ║")
+    frame.add("  ║     ★  ★  ★  LEVEL UP!  ★  ★  ★     ║")
+    frame.add(f"  ║         Now Level {player.level}!{' ' * (18 - len(str(player.level)))}║")
+    frame.add("  ║                                      ║")
+    frame.add(f"  ║     Max HP:     {player.max_hp}{' ' * (20 - len(str(player.max_hp)))}║")
+    frame.add(f"  ║     Max Energy: {player.max_energy}{' ' * (20 - len(str(player.max_energy)))}║")
+    frame.add(f"  ║     Max Sanity: {player.max_sanity}{' ' * (20 - len(str(player.max_sanity)))}║")
+    frame.add("  ║                                      ║")
+    frame.add("  ╚══════════════════════════════════════╝")
+    frame.show()
 
 
 def draw_reward_screen(boss_name, xp_gained, player):
     """Show post-battle rewards."""
+    frame = Frame()
     remaining = player.xp_to_next_level() - player.xp
-    print()
-    print("  ┌──────────── REWARDS ────────────┐")
-    print(f"  │  💫 +{xp_gained} XP{' ' * (26 - len(str(xp_gained)))}│")
-    print(f"  │  📊 XP: {player.xp}/{player.xp_to_next_level()} ({remaining} to next){' ' * max(0, 10 - len(str(remaining)))}│")
-    print(f"  │  🏆 Defeated: {boss_name}{' ' * max(0, 17 - len(boss_name))}│")
-    print("  └────────────────────────────────┘")
+    frame.add()
+    frame.add("  ┌──────────── REWARDS ────────────┐")
+    frame.add(f"  │  💫 +{xp_gained} XP{' ' * (26 - len(str(xp_gained)))}│")
+    frame.add(f"  │  📊 XP: {player.xp}/{player.xp_to_next_level()} ({remaining} to next){' ' * max(0, 10 - len(str(remaining)))}│")
+    frame.add(f"  │  🏆 Defeated: {boss_name}{' ' * max(0, 17 - len(boss_name))}│")
+    frame.add("  └────────────────────────────────┘")
+    frame.show()
 
 
 # ── Boss ASCII Art ──────────────────────────────────────────
@@ -349,3 +508,10 @@ BOSS_ART = {
 def clear_screen():
     """Print some newlines to simulate clearing the screen."""
     print("\n" * 3)
+
+
+if os.environ.get("BOSS_BATTLE_PACING"):
+    try:
+        set_pacing(os.environ["BOSS_BATTLE_PACING"])
+    except ValueError as e:
+        warnings.warn(f"Ignoring BOSS_BATTLE_PACING: {e}")
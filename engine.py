@@ -0,0 +1,399 @@
+"""Headless battle engine: combat rules with no printing, input, or sleeping.
+
+A Battle holds the live state of one fight. Each call to Battle.step() takes
+a single action and returns the list of events it produced, so the terminal
+client, the web routes and batch tools can all drive the same rules.
+"""
+
+import random
+import secrets
+
+EFFECT_APPLIED_LABELS = {"poison": "POISONED", "stun": "STUNNED", "weaken": "WEAKENED"}
+EFFECT_EXPIRED_LABELS = {"poison": "Poison", "stun": "Stun", "weaken": "Weaken"}
+
+XP_PER_BOSS_LEVEL = 20
+RUN_CHANCE = 50
+CRIT_CHANCE = 10
+
+
+class InvalidAction(ValueError):
+    """Raised when an action can't be taken in the current battle state."""
+
+
+# ── Status Effects ────────────────────────────────────────────
+
+POISON, STUN, WEAKEN = range(3)
+EFFECT_NAMES = ("poison", "stun", "weaken")
+EFFECT_IDS = {name: i for i, name in enumerate(EFFECT_NAMES)}
+
+
+class EffectTable:
+    """Status effects on one combatant, one fixed slot per effect id.
+
+    turns[id] is the turns left (0 = inactive) and magnitude[id] holds the
+    poison damage or weaken reduction. Ticking a turn updates the slots in
+    place instead of rebuilding a list of effect dicts.
+    """
+
+    __slots__ = ("turns", "magnitude")
+
+    def __init__(self):
+        self.turns = [0, 0, 0]
+        self.magnitude = [0, 0, 0.0]
+
+    def __bool__(self):
+        return any(self.turns)
+
+    def __iter__(self):
+        """Yield the active effects as dicts, the shape the web session and templates use."""
+        for i, turns in enumerate(self.turns):
+            if turns:
+                effect = {"name": EFFECT_NAMES[i], "turns_left": turns}
+                if i == POISON:
+                    effect["damage"] = self.magnitude[i]
+                elif i == WEAKEN:
+                    effect["reduction"] = self.magnitude[i]
+                yield effect
+
+    def to_list(self):
+        """Return the active effects as a list of dicts."""
+        return list(self)
+
+    @classmethod
+    def from_list(cls, effects):
+        """Build a table from a list of effect dicts."""
+        table = cls()
+        for e in effects:
+            i = EFFECT_IDS[e["name"]]
+            table.turns[i] = e["turns_left"]
+            table.magnitude[i] = e.get("damage", e.get("reduction", 0))
+        return table
+
+    def clear(self):
+        """Remove every effect."""
+        self.turns[:] = (0, 0, 0)
+        self.magnitude[:] = (0, 0, 0.0)
+
+
+def try_apply_effect(atk, target_effects, target_name, rng=random):
+    """Roll for a status effect from an attack. Returns a message or None."""
+    se = atk.status_effect
+    if not se:
+        return None
+
+    if rng.randint(1, 100) > se["chance"]:
+        return None
+
+    i = EFFECT_IDS[se["name"]]
+    turns = target_effects.turns
+
+    # Don't stack the same effect — refresh duration instead
+    if turns[i]:
+        turns[i] = se.get("turns", turns[i])
+        return f"{target_name} is already {se['name']}ed — duration refreshed!"
+
+    turns[i] = se.get("turns", 1)
+    if i == POISON:
+        target_effects.magnitude[i] = se["damage"]
+    elif i == WEAKEN:
+        target_effects.magnitude[i] = se["reduction"]
+    return f"{target_name} is {EFFECT_APPLIED_LABELS.get(se['name'], se['name'].upper())}!"
+
+
+def process_effects(target, effects, target_name):
+    """Apply active effects at start of turn. Returns (events, is_stunned)."""
+    events = []
+    turns = effects.turns
+    stunned = turns[STUN] > 0
+
+    if turns[POISON]:
+        damage = effects.magnitude[POISON]
+        target.take_damage(damage)
+        events.append({
+            "type": "effect_damage",
+            "text": f"{target_name} takes {damage} poison damage!",
+            "damage": damage,
+        })
+    if stunned:
+        events.append({"type": "effect_stun", "text": f"{target_name} is stunned and can't act!"})
+    # weaken is checked during damage calculation, not here
+
+    for i in (POISON, STUN, WEAKEN):
+        if turns[i]:
+            turns[i] -= 1
+            if not turns[i]:
+                effects.magnitude[i] = 0
+                events.append({
+                    "type": "effect_expire",
+                    "text": f"{EFFECT_EXPIRED_LABELS[EFFECT_NAMES[i]]} wore off on {target_name}.",
+                })
+
+    return events, stunned
+
+
+def get_weaken_multiplier(effects):
+    """Return the damage multiplier from weaken effects (1.0 = normal)."""
+    if effects.turns[WEAKEN]:
+        return 1.0 - effects.magnitude[WEAKEN]
+    return 1.0
+
+
+def is_stunned(effects):
+    """Return True if a stun will take effect at the start of the next turn."""
+    return effects.turns[STUN] > 0
+
+
+# ── Attack Resolution ─────────────────────────────────────────
+
+def check_attack_cost(player, atk):
+    """Raise InvalidAction if the player can't pay for an attack."""
+    if atk.energy_cost > 0 and player.energy < atk.energy_cost:
+        raise InvalidAction(f"Not enough energy! Need {atk.energy_cost}, have {player.energy}")
+    if atk.sanity_cost > 0 and player.sanity < atk.sanity_cost:
+        raise InvalidAction(f"Not enough sanity! Need {atk.sanity_cost}, have {player.sanity}")
+
+
+def player_attack(player, boss, atk, boss_effects, rng=random):
+    """Resolve a player attack against the boss. Returns a list of events."""
+    player.use_energy(atk.energy_cost)
+    player.use_sanity(atk.sanity_cost)
+
+    events = [{"type": "player_attack", "text": f"You used {atk.name}!", "attack": atk.name}]
+
+    # Procrastinate does no damage but restores resources
+    if atk.power == 0:
+        events.append({"type": "skip", "text": "You're... doing nothing. But you feel rested."})
+        return events
+
+    if rng.randint(1, 100) <= atk.accuracy:
+        damage = max(1, atk.power + rng.randint(-5, 5))
+
+        if rng.randint(1, 100) <= CRIT_CHANCE:
+            damage *= 2
+            events.append({"type": "critical", "text": f"CRITICAL HIT! {damage} damage!", "damage": damage})
+        else:
+            events.append({"type": "hit", "text": f"{damage} damage!", "damage": damage})
+
+        boss.take_damage(damage)
+
+        msg = try_apply_effect(atk, boss_effects, boss.name, rng)
+        if msg:
+            events.append({"type": "status_effect", "text": msg})
+    else:
+        events.append({"type": "miss", "text": f"MISS! {atk.description}",
+                       "description": atk.description})
+
+    return events
+
+
+def boss_attack(player, boss, player_effects, boss_effects, rng=random):
+    """Resolve a random boss attack against the player. Returns a list of events."""
+    atk = rng.choice(boss.attacks)
+    events = [
+        {"type": "boss_attack", "text": f"{boss.name} uses {atk.name}!", "attack": atk.name},
+        {"type": "boss_desc", "text": f'"{atk.description}"'},
+    ]
+
+    if rng.randint(1, 100) <= atk.accuracy:
+        damage = max(1, atk.power + rng.randint(-3, 3))
+
+        # Boss deals less damage when weakened
+        damage = int(damage * get_weaken_multiplier(boss_effects))
+
+        player.take_damage(damage)
+        events.append({"type": "boss_hit", "text": f"-{damage} HP!", "damage": damage})
+
+        # Bosses also drain sanity
+        sanity_drain = rng.randint(2, 8)
+        player.use_sanity(sanity_drain)
+        events.append({"type": "sanity_drain", "text": f"Sanity -{sanity_drain}...", "amount": sanity_drain})
+
+        msg = try_apply_effect(atk, player_effects, player.name, rng)
+        if msg:
+            events.append({"type": "status_effect", "text": msg})
+    else:
+        events.append({"type": "boss_miss", "text": "You dodged it!"})
+
+    return events
+
+
+def sanity_check(player, rng=random):
+    """Apply existential-crisis damage if sanity hit 0. Returns a list of events."""
+    if player.sanity <= 0 and player.is_alive():
+        extra = rng.randint(10, 20)
+        player.take_damage(extra)
+        return [{
+            "type": "sanity_crisis",
+            "text": f"Your sanity reached 0! Existential crisis deals {extra} damage!",
+            "damage": extra,
+        }]
+    return []
+
+
+# ── Survival Helpers ──────────────────────────────────────────
+
+def scale_for_wave(template, wave):
+    """Return a fresh Boss spawned from a BossTemplate with HP scaled for a survival wave."""
+    return template.spawn(hp=int(template.max_hp * (1 + 0.15 * wave)))
+
+
+def survival_wave(templates, wave, player, player_attacks, rng=None):
+    """Start a survival wave against a boss drawn from templates.
+
+    rng is the run's random stream: None to start a new run from a fresh
+    seed, then the finished wave's fight.rng for each wave after it. The
+    boss and the new battle's seed are both drawn from it, so a whole run
+    follows from its first seed like a single battle does.
+    """
+    if rng is None:
+        rng = random.Random(new_seed())
+    boss = scale_for_wave(rng.choice(templates), wave)
+    return Battle(player, boss, player_attacks, survival=True, seed=rng.getrandbits(63))
+
+
+def recover_between_waves(player):
+    """Partial recovery after a survival wave is cleared."""
+    player.heal(30)
+    player.use_energy(-20)  # restores 20
+    player.use_sanity(-20)  # restores 20
+
+
+# ── Battle State ──────────────────────────────────────────────
+
+def new_seed():
+    """Return a fresh seed for a battle's RNG stream."""
+    return secrets.randbits(63)
+
+
+class Battle:
+    """State of one fight between a player and a boss.
+
+    Actions passed to step() are an index into player_attacks, "run", or
+    None when the player is stunned and has nothing to choose.
+    In survival battles running is refused and a victory isn't counted as
+    a win (the run as a whole ends in a loss).
+
+    Unless a caller passes its own rng, each battle draws from a private
+    random.Random seeded with `seed`, so the seed plus the list of actions
+    reproduces the fight exactly (see replay.py).
+    """
+
+    __slots__ = ("player", "boss", "player_attacks", "survival", "rng", "seed", "player_effects",
+                 "boss_effects", "turn", "over", "result", "xp_gained", "leveled_up", "log_id")
+
+    def __init__(self, player, boss, player_attacks, survival=False, rng=None, seed=None):
+        self.player = player
+        self.boss = boss
+        self.player_attacks = player_attacks
+        self.survival = survival
+        if rng is None:
+            seed = new_seed() if seed is None else seed
+            rng = random.Random(seed)
+        self.rng = rng
+        self.seed = seed  # None when the caller supplied the rng
+        self.player_effects = EffectTable()  # effects on the player
+        self.boss_effects = EffectTable()    # effects on the boss
+        self.turn = 1
+        self.over = False
+        self.result = None  # "victory", "defeat" or "run"
+        self.xp_gained = 0
+        self.leveled_up = False
+        self.log_id = None  # set by event_log when the battle is being recorded
+
+    def __getstate__(self):
+        # The shared random module can't be pickled; it is put back on load
+        state = {name: getattr(self, name) for name in self.__slots__}
+        if state["rng"] is random:
+            state["rng"] = None
+        return state
+
+    def __setstate__(self, state):
+        state["rng"] = state["rng"] or random
+        state.setdefault("log_id", None)
+        state.setdefault("seed", None)
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def player_stunned(self):
+        """Return True if the player's next turn will be skipped."""
+        return is_stunned(self.player_effects)
+
+    def resolve_action(self, action):
+        """Validate an action and return the Attack it names ("run" and None pass through)."""
+        if self.over:
+            raise InvalidAction("The battle is already over.")
+        if action is None or action == "run":
+            if action is None and not self.player_stunned():
+                raise InvalidAction("Choose an attack.")
+            return action
+        if not isinstance(action, int) or not (0 <= action < len(self.player_attacks)):
+            raise InvalidAction("Invalid attack")
+        atk = self.player_attacks[action]
+        if not self.player_stunned():
+            check_attack_cost(self.player, atk)
+        return atk
+
+    def step(self, action):
+        """Play one full turn. Returns the list of events it produced."""
+        choice = self.resolve_action(action)
+        rng = self.rng
+        player, boss = self.player, self.boss
+        events = []
+
+        # Process effects at start of turn
+        effect_events, player_stunned = process_effects(player, self.player_effects, player.name)
+        events.extend(effect_events)
+        effect_events, boss_stunned = process_effects(boss, self.boss_effects, boss.name)
+        events.extend(effect_events)
+
+        if not player.is_alive():
+            return self._finish("defeat", events)
+        if not boss.is_alive():
+            return self._finish("victory", events)
+
+        # Player turn (skip if stunned)
+        if player_stunned:
+            events.append({"type": "stun_skip", "text": "You're stunned! Turn skipped..."})
+        elif choice == "run":
+            if self.survival:
+                events.append({"type": "run_fail", "text": "No running in survival mode! Stand and fight!"})
+            elif rng.randint(1, 100) <= RUN_CHANCE:
+                events.append({"type": "run_success", "text": "You successfully ran away!"})
+                return self._finish("run", events)
+            else:
+                events.append({"type": "run_fail", "text": "You tried to run but tripped over your backpack!"})
+        else:
+            events.extend(player_attack(player, boss, choice, self.boss_effects, rng))
+
+        if not boss.is_alive():
+            return self._finish("victory", events)
+
+        # Boss turn (skip if stunned)
+        if boss_stunned:
+            events.append({"type": "stun_skip", "text": f"{boss.name} is stunned! Turn skipped!"})
+        else:
+            events.extend(boss_attack(player, boss, self.player_effects, self.boss_effects, rng))
+        events.extend(sanity_check(player, rng))
+
+        if not player.is_alive():
+            return self._finish("defeat", events)
+
+        self.turn += 1
+        return events
+
+    def _finish(self, result, events):
+        """Close the battle and update the player's record."""
+        self.over = True
+        self.result = result
+        player = self.player
+
+        if result == "victory":
+            self.xp_gained = self.boss.level * XP_PER_BOSS_LEVEL
+            self.leveled_up = player.gain_xp(self.xp_gained)
+            player.record_victory(self.boss.name)
+            if not self.survival:
+                player.wins += 1
+        elif result == "defeat":
+            player.losses += 1
+
+        return events
@@ -0,0 +1,432 @@
+"""Append-only binary log of battle events, compacted into per-player summaries.
+
+Every battle writes three kinds of record to data/events.log:
+
+    start   battle id, player, boss and mode, when a Battle begins, plus
+            the seed and setup replay.py needs to reproduce it
+    turn    the action taken, the events it produced and the bars after it
+    end     the result and XP once the battle is over
+
+Each record is a length-prefixed frame: a 2-byte magic number, a 4-byte
+little-endian payload length, a 4-byte CRC32 of the payload, then the
+payload as compact JSON. Appends are a single write() on a file opened in
+append mode, with no fsync, so they are cheap enough to sit in the request
+path. A frame cut short by a crash fails its CRC check; readers skip ahead
+to the next magic number, so records other processes appended after it
+are still read.
+
+compact() folds finished battles into data/events.summary.json, one
+summary per player, and rewrites the log keeping only battles still in
+progress. The folding works on a snapshot of the log, so appenders are
+only held up for the final swap; maybe_compact() runs it on a background
+thread once the log is big enough, so no request ever waits for it. Each
+rewritten log starts with a random log id and the summary file records
+which log it has already folded, so a log that was rotated, replaced or
+never compacted is never mistaken for one that was.
+
+open_battles() lists the battles still in progress, with their last known
+bars, and resume() rebuilds one as a live Battle by replaying its logged
+actions from the seed and setup in its start record. Usage:
+
+    python event_log.py summary [NAME]
+    python event_log.py open
+    python event_log.py compact
+"""
+
+import argparse
+import itertools
+import json
+import os
+import secrets
+import struct
+import threading
+import time
+import warnings
+import zlib
+
+from replay import battle_setup, rebuild
+from save_store import DATA_DIR, atomic_write, fcntl
+
+LOG_PATH = os.path.join(DATA_DIR, "events.log")
+MAGIC = 0xB7E1
+HEADER = struct.Struct("<HII")  # magic, payload length, CRC32
+MAGIC_BYTES = HEADER.pack(MAGIC, 0, 0)[:2]
+COMPACT_BYTES = 8 * 1024 * 1024  # maybe_compact() threshold
+STALE_AFTER = 24 * 60 * 60       # open battles older than this are folded as abandoned
+
+
+def _encode(record):
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def _parse(data):
+    """Return (intact records, offset just past the last of them) for log bytes."""
+    records = []
+    pos, end, good = 0, len(data), 0
+    while pos + HEADER.size <= end:
+        magic, length, crc = HEADER.unpack_from(data, pos)
+        start = pos + HEADER.size
+        payload = data[start:start + length]
+        if magic == MAGIC and len(payload) == length and zlib.crc32(payload) == crc:
+            records.append(json.loads(payload))
+            pos = good = start + length
+        else:
+            # Torn or garbled frame: resume at the next magic number
+            pos = data.find(MAGIC_BYTES, pos + 1)
+            if pos < 0:
+                break
+    return records, good
+
+
+def _read(path):
+    """Return (bytes, (device, inode)) of a log file, or (b"", None) if there is none."""
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            return f.read(), (st.st_dev, st.st_ino)
+    except FileNotFoundError:
+        return b"", None
+
+
+def read_records(path):
+    """Return every intact record in a log file, skipping torn frames."""
+    return _parse(_read(path)[0])[0]
+
+
+# ── Summaries ─────────────────────────────────────────────────
+
+def _new_summary():
+    return {"battles": 0, "victories": 0, "defeats": 0, "runs": 0, "abandoned": 0,
+            "turns": 0, "damage_dealt": 0, "damage_taken": 0, "crits": 0, "misses": 0,
+            "xp": 0, "bosses": {}, "last_battle": 0}
+
+
+def _fold(summaries, records):
+    """Add one battle's records (start, turns, optional end) to its player's summary."""
+    start = records[0]
+    summary = summaries.setdefault(start["player"], _new_summary())
+    boss = summary["bosses"].setdefault(start["boss"], {"fights": 0, "wins": 0})
+    summary["battles"] += 1
+    boss["fights"] += 1
+    summary["last_battle"] = max(summary["last_battle"], start["ts"])
+
+    for rec in records[1:]:
+        if rec["k"] == "turn":
+            summary["turns"] += 1
+            for ev in rec["events"]:
+                kind = ev["type"]
+                if kind in ("hit", "critical"):
+                    summary["damage_dealt"] += ev["damage"]
+                    summary["crits"] += kind == "critical"
+                elif kind in ("boss_hit", "sanity_crisis"):
+                    summary["damage_taken"] += ev["damage"]
+                elif kind == "miss":
+                    summary["misses"] += 1
+        elif rec["k"] == "end":
+            result = rec["result"]
+            summary["xp"] += rec["xp"]
+            if result == "victory":
+                summary["victories"] += 1
+                boss["wins"] += 1
+            elif result == "defeat":
+                summary["defeats"] += 1
+            elif result == "run":
+                summary["runs"] += 1
+            return
+    summary["abandoned"] += 1
+
+
+def _by_battle(records):
+    """Group records by battle id, in log order. Returns (log id or None, {id: [records]})."""
+    log_id = None
+    battles = {}
+    for rec in records:
+        if rec["k"] == "gen":
+            log_id = rec.get("log")
+        elif rec["k"] == "start":
+            battles[rec["id"]] = [rec]
+        elif rec["id"] in battles:
+            battles[rec["id"]].append(rec)
+    return log_id, battles
+
+
+def _identity(log_id, battles, file_id):
+    """Name a log for the summary file: its log id, or for a log compaction never
+    wrote, the file it lives in plus its first battle id."""
+    if log_id:
+        return log_id
+    if file_id is None or not battles:
+        return None
+    return "{}:{}:{}".format(*file_id, next(iter(battles)))
+
+
+# ── Log ───────────────────────────────────────────────────────
+
+class EventLog:
+    """One append-only event log file and its compacted summaries."""
+
+    def __init__(self, path=LOG_PATH):
+        self.path = path
+        self.summary_path = os.path.splitext(path)[0] + ".summary.json"
+        self.lock_path = path + ".lock"
+        self._file = None
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._prefix = secrets.token_hex(4)  # keeps ids unique across processes
+        self._compacting = threading.Lock()  # held while a background compaction runs
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Appending
+
+    def _open(self):
+        """Return the append handle, reopening it if compaction replaced the file."""
+        f = self._file
+        if f is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(f.fileno()).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()
+        self._file = f = open(self.path, "ab", buffering=0)
+        return f
+
+    def append(self, record):
+        """Append one record as a single write."""
+        frame = _encode(record)
+        with self._lock:
+            if self._lock_file is None:
+                self._lock_file = open(self.lock_path, "a")
+            # Shared lock: appenders run side by side, compact() waits for them
+            if fcntl:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_SH)
+            try:
+                f = self._open()  # compaction may have swapped the file meanwhile
+                f.write(frame)
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def begin(self, fight, wave=None):
+        """Log the start of a Battle and tag it with a battle id."""
+        fight.log_id = f"{self._prefix}-{next(self._ids)}"
+        record = {"k": "start", "id": fight.log_id, "ts": time.time(),
+                  "player": fight.player.name, "level": fight.player.level,
+                  "boss": fight.boss.name, "boss_level": fight.boss.level,
+                  "boss_max_hp": fight.boss.max_hp, "survival": fight.survival}
+        if wave is not None:
+            record["wave"] = wave
+        if fight.seed is not None:
+            record["setup"] = battle_setup(fight)  # enough to replay the battle
+        self.append(record)
+
+    def record_turn(self, fight, turn, action, events):
+        """Log turn number `turn` just played, and the battle's end if it finished it."""
+        if fight.log_id is None:
+            return
+        player = fight.player
+        self.append({"k": "turn", "id": fight.log_id, "turn": turn, "action": action,
+                     "events": events,
+                     "bars": [player.hp, player.energy, player.sanity, fight.boss.hp]})
+        if fight.over:
+            self.append({"k": "end", "id": fight.log_id, "result": fight.result,
+                         "xp": fight.xp_gained})
+
+    # Reading
+
+    def records(self):
+        """Return every record in the log."""
+        return read_records(self.path)
+
+    def load_summaries(self):
+        """Return (identity of the log already folded in or None, summaries)."""
+        try:
+            with open(self.summary_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None, {}
+        return data.get("folded_log"), data.get("players", {})
+
+    def summaries(self):
+        """Return per-player summaries including battles not yet compacted."""
+        folded_log, summaries = self.load_summaries()
+        data, file_id = _read(self.path)
+        log_id, battles = _by_battle(_parse(data)[0])
+        identity = _identity(log_id, battles, file_id)
+        # A log the summary file names was folded by a compaction that died
+        # before swapping it out; anything else still needs counting
+        if identity is None or identity != folded_log:
+            for records in battles.values():
+                if records[-1]["k"] == "end":
+                    _fold(summaries, records)
+        return summaries
+
+    def open_battles(self):
+        """Return {battle id: (start record, last turn record or None)} for unfinished battles."""
+        _, battles = _by_battle(self.records())
+        return {
+            bid: (records[0], records[-1] if len(records) > 1 else None)
+            for bid, records in battles.items() if records[-1]["k"] != "end"
+        }
+
+    def resume(self, battle_id):
+        """Rebuild an unfinished battle as a live Battle at its last logged turn.
+
+        The battle is replayed from the seed and setup in its start record,
+        so its RNG picks up where it left off, and keeps logging under its
+        id. Raises KeyError for an unknown or finished battle and ValueError
+        if it can't be replayed faithfully.
+        """
+        _, battles = _by_battle(self.records())
+        records = battles.get(battle_id)
+        if records is None or records[-1]["k"] == "end":
+            raise KeyError(f"No open battle {battle_id!r}")
+        if "setup" not in records[0]:
+            raise ValueError(f"Battle {battle_id!r} was logged without a setup")
+        fight = rebuild(records[0]["setup"])
+        for rec in records[1:]:
+            fight.step(rec["action"])
+            bars = [fight.player.hp, fight.player.energy, fight.player.sanity, fight.boss.hp]
+            if bars != rec["bars"]:
+                raise ValueError(f"Battle {battle_id!r} diverged from its log at turn {rec['turn']}")
+        fight.log_id = battle_id
+        return fight
+
+    # Compaction
+
+    def compact(self, stale_after=STALE_AFTER):
+        """Fold finished battles into the summaries and rewrite the log without them.
+
+        Returns the number of battles folded (0 if another process compacted
+        the log in the meantime).
+        """
+        with open(self.lock_path, "a") as lock:
+            # Fold from a snapshot while appenders carry on
+            data, file_id = _read(self.path)
+            records, snapshot_end = _parse(data)
+            folded_log, summaries = self.load_summaries()
+            log_id, battles = _by_battle(records)
+            identity = _identity(log_id, battles, file_id)
+            # A previous compaction saved its summaries but died before
+            # swapping the log: this log's battles are already counted
+            already_counted = identity is not None and identity == folded_log
+
+            stale = time.time() - stale_after
+            keep = []
+            folded = 0
+            for records in battles.values():
+                if records[-1]["k"] == "end" or records[0]["ts"] < stale:
+                    if not already_counted:
+                        _fold(summaries, records)
+                    folded += 1
+                else:
+                    keep.extend(records)
+
+            # Exclusive lock only for the swap: pick up whatever was appended
+            # since the snapshot and move it into the new log unread
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            with open(self.path, "ab+") as f:
+                st = os.fstat(f.fileno())
+                if file_id is not None and (st.st_dev, st.st_ino) != file_id:
+                    return 0
+                f.seek(snapshot_end)
+                tail = f.read()
+
+            atomic_write(self.summary_path, json.dumps(
+                {"folded_log": identity, "players": summaries}, separators=(",", ":")))
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(_encode({"k": "gen", "log": secrets.token_hex(8)}))
+                for rec in keep:
+                    f.write(_encode(rec))
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        return folded
+
+    def maybe_compact(self, threshold=COMPACT_BYTES):
+        """Start compacting on a background thread once the log has grown past a threshold.
+
+        Returns the thread, or None if the log is small enough or a
+        compaction from this EventLog is already running.
+        """
+        try:
+            if os.path.getsize(self.path) < threshold:
+                return None
+        except OSError:
+            return None
+        if not self._compacting.acquire(blocking=False):
+            return None
+        thread = threading.Thread(target=self._background_compact, name="event-log-compact",
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def _background_compact(self):
+        try:
+            self.compact()
+        except Exception as e:  # never take the app down over bookkeeping
+            warnings.warn(f"Event log compaction failed: {e}")
+        finally:
+            self._compacting.release()
+
+
+class NullEventLog:
+    """Stand-in used when event logging is turned off."""
+
+    def begin(self, fight, wave=None):
+        pass
+
+    def record_turn(self, fight, turn, action, events):
+        pass
+
+    def maybe_compact(self, threshold=COMPACT_BYTES):
+        return None
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_event_log():
+    """Return the process-wide event log. BOSS_BATTLE_EVENT_LOG=off disables it."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                path = os.environ.get("BOSS_BATTLE_EVENT_LOG", LOG_PATH)
+                _log = NullEventLog() if path in ("", "off") else EventLog(path)
+    return _log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or compact the battle event log.")
+    parser.add_argument("command", choices=("summary", "open", "compact"))
+    parser.add_argument("name", nargs="?", help="player name (summary only)")
+    parser.add_argument("--log", default=LOG_PATH, help="log file path")
+    args = parser.parse_args()
+    log = EventLog(args.log)
+
+    if args.command == "compact":
+        print(f"Folded {log.compact()} battle(s) into {log.summary_path}")
+    elif args.command == "open":
+        for bid, (start, last) in log.open_battles().items():
+            bars = "not started" if last is None else \
+                "turn {} HP {} / EN {} / SAN {} vs boss HP {}".format(last["turn"], *last["bars"])
+            resumable = "" if "setup" in start else "  (no setup, can't resume)"
+            print(f"{bid}  {start['player']} vs {start['boss']}: {bars}{resumable}")
+    else:
+        summaries = log.summaries()
+        if args.name:
+            summaries = {args.name: summaries.get(args.name, _new_summary())}
+        print(json.dumps(summaries, indent=2))
+
+
+if __name__ == "__main__":
+    main()
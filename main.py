@@ -1,8 +1,14 @@
-"""Boss Battle Simulator: Life Edition - Main game loop."""
+"""Boss Battle Simulator: Life Edition - Main game loop.
 
-from display import draw_box, draw_title_screen, draw_hp_bar
+    python main.py                    # normal pacing
+    python main.py --pacing instant   # no typing effects or pauses
+"""
+
+import argparse
+
+from display import PACING_SCALES, draw_box, draw_title_screen, draw_hp_bar, set_pacing
 from player import Player
-from bosses import get_all_bosses
+from bosses import BOSS_TEMPLATES
 from attacks import PLAYER_ATTACKS
 from combat import battle, survival_battle
 
@@ -32,8 +38,7 @@ def show_main_menu(player):
 def quick_battle(player):
     """Start a battle with a random boss."""
     import random
-    bosses = get_all_bosses()
-    boss = random.choice(bosses)
+    boss = random.choice(BOSS_TEMPLATES).spawn()
     player.restore_for_battle()
     print(f"\n  A wild {boss.name} (Lv.{boss.level}) appeared!")
     battle(player, boss, PLAYER_ATTACKS)
@@ -43,7 +48,7 @@ def quick_battle(player):
 
 def choose_boss(player):
     """Let the player pick a boss to fight."""
-    bosses = get_all_bosses()
+    bosses = BOSS_TEMPLATES
     lines = [
         "",
         "  EASY",
@@ -80,7 +85,7 @@ def choose_boss(player):
     try:
         idx = int(choice) - 1
         if 0 <= idx < len(bosses):
-            boss = bosses[idx]
+            boss = bosses[idx].spawn()
             player.restore_for_battle()
             print(f"\n  You challenge {boss.name}!")
             battle(player, boss, PLAYER_ATTACKS)
@@ -100,7 +105,7 @@ def view_stats(player):
         if (player.wins + player.losses) > 0
         else "N/A"
     )
-    total_bosses = len(get_all_bosses())
+    total_bosses = len(BOSS_TEMPLATES)
     defeated_count = len(player.bosses_defeated)
 
     draw_box(
@@ -127,7 +132,7 @@ def view_stats(player):
 
 def view_victory_log(player):
     """Display list of defeated bosses."""
-    all_bosses = get_all_bosses()
+    all_bosses = BOSS_TEMPLATES
     total = len(all_bosses)
     defeated_count = len(player.bosses_defeated)
 
@@ -149,9 +154,8 @@ def view_victory_log(player):
 
 def survival_mode(player):
     """Start survival mode — endless boss waves until defeat."""
-    bosses = get_all_bosses()
     player.restore_for_battle()
-    waves, total_xp = survival_battle(player, bosses, PLAYER_ATTACKS)
+    waves, total_xp = survival_battle(player, BOSS_TEMPLATES, PLAYER_ATTACKS)
     player.save()
     print("  💾 Progress saved!")
     input("  Press Enter to continue...")
@@ -193,6 +197,13 @@ def show_help():
 
 def main():
     """Main game loop."""
+    parser = argparse.ArgumentParser(description="Boss Battle Simulator: Life Edition")
+    parser.add_argument("--pacing", choices=PACING_SCALES,
+                        help="animation speed (default: $BOSS_BATTLE_PACING or normal)")
+    args = parser.parse_args()
+    if args.pacing:
+        set_pacing(args.pacing)
+
     draw_title_screen()
     print("\n  Welcome, brave student!")
     name = input("  Enter your name: ").strip()
@@ -0,0 +1,146 @@
+"""Queued multi-turn action plans for auto-battle.
+
+A plan is a list of steps, each an action repeated up to N times or until a
+condition on the fight holds, for example "Actually Study until energy is
+below 20, then Procrastinate". With loop=True the plan starts over when it
+runs out. The JSON form, as posted to /battle/actions:
+
+    {
+        "steps": [
+            {"action_type": "attack", "attack_index": 1, "repeat": 99,
+             "until": {"energy_below": 20}},
+            {"action_type": "attack", "attack_index": 4}
+        ],
+        "loop": true,
+        "max_turns": 100
+    }
+
+"until" keys are <stat>_below or <stat>_at_least, with stat one of hp,
+energy, sanity or boss_hp; a step ends when any of them holds. Conditions
+are checked before each turn, so a step whose condition already holds is
+skipped.
+"""
+
+from attacks import get_player_attacks
+from engine import InvalidAction
+
+MAX_REPEAT = 999
+MAX_PLAN_TURNS = 200
+MAX_STEPS = 20
+
+STATS = {
+    "hp": lambda fight: fight.player.hp,
+    "energy": lambda fight: fight.player.energy,
+    "sanity": lambda fight: fight.player.sanity,
+    "boss_hp": lambda fight: fight.boss.hp,
+}
+
+
+def parse_action(data):
+    """Turn an action request body into a Battle.step() action.
+
+    Raises InvalidAction if the body is not an object or names no valid action.
+    """
+    data = data or {}
+    if not isinstance(data, dict):
+        raise InvalidAction("Action must be an object")
+    action_type = data.get("action_type", "")
+    if action_type == "run":
+        return "run"
+    if action_type == "attack":
+        return _int_field(data, "attack_index", 0, 0, len(get_player_attacks()) - 1)
+    raise InvalidAction("Unknown action")
+
+
+def _int_field(data, key, default, low, high):
+    value = data.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or not (low <= value <= high):
+        raise InvalidAction(f"{key} must be a whole number from {low} to {high}")
+    return value
+
+
+def _parse_until(until):
+    """Return a list of (stat getter, is_below, threshold) conditions."""
+    if not isinstance(until, dict):
+        raise InvalidAction("until must be an object")
+    conditions = []
+    for key, threshold in until.items():
+        below = key.endswith("_below")
+        stat = key[:-len("_below")] if below else key[:-len("_at_least")]
+        if stat not in STATS or not (below or key.endswith("_at_least")):
+            raise InvalidAction(f"Unknown condition: {key}")
+        if not isinstance(threshold, (int, float)) or isinstance(threshold, bool):
+            raise InvalidAction(f"{key} needs a number")
+        conditions.append((STATS[stat], below, threshold))
+    return conditions
+
+
+class PlanStep:
+    """One action, repeated until its count runs out or a condition holds."""
+
+    __slots__ = ("action", "repeat", "conditions")
+
+    def __init__(self, action, repeat=1, conditions=()):
+        self.action = action
+        self.repeat = repeat
+        self.conditions = conditions
+
+    def done(self, fight):
+        """Return True if any of the step's until-conditions holds."""
+        for stat, below, threshold in self.conditions:
+            value = stat(fight)
+            if (value < threshold) if below else (value >= threshold):
+                return True
+        return False
+
+
+class ActionPlan:
+    """A queue of steps that hands out one action per turn."""
+
+    def __init__(self, steps, loop=False, max_turns=MAX_PLAN_TURNS):
+        self.steps = steps
+        self.loop = loop
+        self.max_turns = max_turns
+        self.turns = 0
+        self._index = 0
+        self._count = 0       # repetitions of the current step so far
+        self._pass_turns = 0  # turns since the plan last started over
+
+    @classmethod
+    def from_json(cls, data):
+        """Build a plan from a request body. Raises InvalidAction if it is malformed."""
+        if not isinstance(data, dict):
+            raise InvalidAction("Plan must be an object")
+        raw_steps = data.get("steps")
+        if not isinstance(raw_steps, list) or not (1 <= len(raw_steps) <= MAX_STEPS):
+            raise InvalidAction(f"A plan needs 1 to {MAX_STEPS} steps")
+        steps = []
+        for raw in raw_steps:
+            if not isinstance(raw, dict):
+                raise InvalidAction("Each step must be an object")
+            steps.append(PlanStep(
+                parse_action(raw),
+                _int_field(raw, "repeat", 1, 1, MAX_REPEAT),
+                _parse_until(raw.get("until", {})),
+            ))
+        return cls(steps, bool(data.get("loop", False)),
+                   _int_field(data, "max_turns", MAX_PLAN_TURNS, 1, MAX_PLAN_TURNS))
+
+    def next_action(self, fight):
+        """Return the action for the next turn, or raise StopIteration when the plan is spent."""
+        if self.turns >= self.max_turns:
+            raise StopIteration
+        while True:
+            if self._index == len(self.steps):
+                # Starting over is pointless if a whole pass played no turns
+                if not self.loop or self._pass_turns == 0:
+                    raise StopIteration
+                self._index = self._pass_turns = 0
+            step = self.steps[self._index]
+            if self._count < step.repeat and not step.done(fight):
+                self._count += 1
+                self._pass_turns += 1
+                self.turns += 1
+                return step.action
+            self._index += 1
+            self._count = 0
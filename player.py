@@ -1,14 +1,14 @@
 """Player data structure, stats management, and save/load persistence."""
 
-import json
-import os
-
-SAVE_PATH = os.path.join(os.path.dirname(__file__), "data", "save.json")
+from save_store import get_save_store
 
 
 class Player:
     """Represents the player character."""
 
+    __slots__ = ("name", "level", "xp", "max_hp", "hp", "max_energy", "energy",
+                 "max_sanity", "sanity", "wins", "losses", "bosses_defeated")
+
     def __init__(self, name="Student"):
         self.name = name
         self.level = 1
@@ -72,9 +72,9 @@ class Player:
 
     # ── Save / Load ──────────────────────────────────────────
 
-    def save(self):
-        """Save player data to JSON file."""
-        data = {
+    def to_dict(self):
+        """Return the persistent part of the player as a dict."""
+        return {
             "name": self.name,
             "level": self.level,
             "xp": self.xp,
@@ -85,26 +85,10 @@ class Player:
             "losses": self.losses,
             "bosses_defeated": self.bosses_defeated,
         }
-        os.makedirs(os.path.dirname(SAVE_PATH), exist_ok=True)
-        with open(SAVE_PATH, "w") as f:
-            json.dump(data, f, indent=2)
 
     @classmethod
-    def load(cls, name):
-        """Load player data from JSON. Returns existing player or new one."""
-        if not os.path.exists(SAVE_PATH):
-            return cls(name)
-
-        try:
-            with open(SAVE_PATH, "r") as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, KeyError):
-            return cls(name)
-
-        # Only load if the save matches the player name
-        if not data or data.get("name") != name:
-            return cls(name)
-
+    def from_dict(cls, data):
+        """Build a player from a saved record, with full stats for the session."""
         player = cls(data["name"])
         player.level = data.get("level", 1)
         player.xp = data.get("xp", 0)
@@ -113,11 +97,21 @@ class Player:
         player.max_sanity = data.get("max_sanity", 100)
         player.wins = data.get("wins", 0)
         player.losses = data.get("losses", 0)
-        player.bosses_defeated = data.get("bosses_defeated", [])
-
-        # Restore full stats for the session
+        player.bosses_defeated = list(data.get("bosses_defeated", []))
         player.restore_for_battle()
         return player
 
+    def save(self):
+        """Save this player's record to the save store."""
+        get_save_store().put(self.name, self.to_dict())
+
+    @classmethod
+    def load(cls, name):
+        """Load a player by name. Returns the saved player or a new one."""
+        data = get_save_store().get(name)
+        if not data:
+            return cls(name)
+        return cls.from_dict(data)
+
     def __str__(self):
         return f"{self.name} (Lv.{self.level})"
@@ -1,14 +1,8 @@
-import json
-import os
-from flask import Flask, render_template, abort
+from flask import Flask, render_template, abort, jsonify, request
 
-app = Flask(__name__)
-
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+from dysfunction_catalog import get_catalog
 
-def load_dysfunctions():
-    with open(os.path.join(DATA_DIR, "dysfunctions.json"), "r") as f:
-        return json.load(f)
+app = Flask(__name__)
 
 CATEGORY_LABELS = {
     "head_neck": "Head & Neck",
@@ -19,41 +13,116 @@ CATEGORY_LABELS = {
 
 CATEGORY_ORDER = ["head_neck", "shoulders_upper_back", "lower_back_pelvis", "knees_lower_body"]
 
+SEARCH_LIMIT = 20
+
+
+def _limit(value):
+    """A result limit capped at SEARCH_LIMIT, or None if it isn't a whole number of at least 1."""
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        return None
+    return min(value, SEARCH_LIMIT)
+
+
+def home_context(catalog):
+    return {
+        "grouped": catalog.by_category,
+        "category_labels": CATEGORY_LABELS,
+        "category_order": CATEGORY_ORDER,
+    }
+
+
+def detail_context(catalog, dysfunction_id):
+    return {
+        "d": catalog.get(dysfunction_id),
+        "connected": catalog.connected[dysfunction_id],
+        "caused_by": catalog.caused_by[dysfunction_id],
+        "causes": catalog.causes[dysfunction_id],
+        "root_causes": catalog.graph.root_causes(dysfunction_id),
+        "upstream": catalog.graph.upstream(dysfunction_id),
+        "downstream": catalog.graph.downstream(dysfunction_id),
+        "category_labels": CATEGORY_LABELS,
+    }
+
 
 @app.route("/")
 def home():
-    dysfunctions = load_dysfunctions()
-    grouped = {}
-    for d in dysfunctions:
-        cat = d["category"]
-        grouped.setdefault(cat, []).append(d)
-    return render_template(
-        "home.html",
-        grouped=grouped,
-        category_labels=CATEGORY_LABELS,
-        category_order=CATEGORY_ORDER,
-    )
+    return render_template("home.html", **home_context(get_catalog()))
 
 
 @app.route("/dysfunction/<dysfunction_id>")
 def dysfunction_detail(dysfunction_id):
-    dysfunctions = load_dysfunctions()
-    lookup = {d["id"]: d for d in dysfunctions}
-    d = lookup.get(dysfunction_id)
-    if d is None:
+    catalog = get_catalog()
+    if catalog.get(dysfunction_id) is None:
+        abort(404)
+    return render_template("dysfunction.html", **detail_context(catalog, dysfunction_id))
+
+
+@app.route("/api/graph")
+def graph_json():
+    return jsonify(get_catalog().graph.to_json())
+
+
+@app.route("/api/dysfunction/<dysfunction_id>/graph")
+def dysfunction_graph_json(dysfunction_id):
+    catalog = get_catalog()
+    if catalog.get(dysfunction_id) is None:
         abort(404)
+    return jsonify(catalog.graph.node_json(dysfunction_id))
 
-    connected = [lookup[cid] for cid in d.get("connected_dysfunctions", []) if cid in lookup]
-    caused_by = [lookup[cid] for cid in d.get("caused_by_dysfunctions", []) if cid in lookup]
 
+@app.route("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    # Same matching as /api/search, so a reload shows what type-ahead showed
+    results = get_catalog().search.search(query, limit=SEARCH_LIMIT) if query else []
     return render_template(
-        "dysfunction.html",
-        d=d,
-        connected=connected,
-        caused_by=caused_by,
+        "search.html",
+        query=query,
+        results=[d for d, _ in results],
         category_labels=CATEGORY_LABELS,
     )
 
 
+@app.route("/api/search")
+def search_json():
+    query = request.args.get("q", "")
+    limit = _limit(request.args.get("limit", 10, type=int))
+    if limit is None:
+        return jsonify({"error": "limit must be a whole number of at least 1"}), 400
+    results = get_catalog().search.search(query, limit=limit)
+    return jsonify([
+        {"id": d["id"], "name": d["name"], "category": d["category"],
+         "category_label": CATEGORY_LABELS.get(d["category"], d["category"]),
+         "description": d["description"], "score": round(score, 4)}
+        for d, score in results
+    ])
+
+
+@app.route("/api/symptoms", methods=["GET", "POST"])
+def symptoms_json():
+    if request.method == "POST":
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({"error": "body must be a JSON object with a symptoms list"}), 400
+        symptoms = body.get("symptoms", [])
+        limit = body.get("limit", request.args.get("limit", 10, type=int))
+    else:
+        symptoms = request.args.getlist("symptom")
+        limit = request.args.get("limit", 10, type=int)
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        return jsonify({"error": "symptoms must be a list of strings"}), 400
+    if not symptoms:
+        return jsonify({"error": "give at least one symptom"}), 400
+    limit = _limit(limit)
+    if limit is None:
+        return jsonify({"error": "limit must be a whole number of at least 1"}), 400
+
+    return jsonify([
+        {"id": d["id"], "name": d["name"], "category": d["category"],
+         "score": round(score, 4), "matched_symptoms": matched}
+        for d, score, matched in get_catalog().symptoms.rank(symptoms, limit=limit)
+    ])
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,188 @@
+"""Export posture_app as a static site.
+
+Pre-renders the home page and one page per dysfunction into a directory
+any plain file server or CDN can serve:
+
+    build/index.html
+    build/dysfunction/<id>/index.html
+    build/static/style.<hash>.css      assets renamed by content hash
+
+Asset URLs carry a hash of the file's content, so they can be cached
+forever and change whenever the file does. Builds are incremental: each
+page's fingerprint (its template sources, its render context and the
+asset names) is kept in build/.manifest.json, and a page is only
+re-rendered when its fingerprint changes. Pages and assets that no longer
+exist are removed. Usage:
+
+    python build_static.py
+    python build_static.py --out /srv/posture --force
+    python -m http.server -d build
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+from flask import render_template
+
+from app import app, detail_context, home_context
+from dysfunction_catalog import get_catalog
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT = os.path.join(APP_DIR, "build")
+TEMPLATE_DIR = os.path.join(app.root_path, app.template_folder)
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+HASH_LENGTH = 10
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _remove(out, relpath):
+    try:
+        os.remove(os.path.join(out, relpath))
+    except FileNotFoundError:
+        return
+    # Drop directories the file leaves empty, up to the output root
+    directory = os.path.dirname(os.path.join(out, relpath))
+    while os.path.abspath(directory) != os.path.abspath(out):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+# ── Assets ────────────────────────────────────────────────────
+
+_asset_names = {}  # static filename -> hashed filename, while a build runs
+
+
+@app.url_defaults
+def _hashed_static(endpoint, values):
+    if endpoint == "static" and values.get("filename") in _asset_names:
+        values["filename"] = _asset_names[values["filename"]]
+
+
+def hash_assets():
+    """Return {static filename: content-hashed filename} for every static file."""
+    assets = {}
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            filename = os.path.relpath(path, app.static_folder).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                digest = _digest(f.read())[:HASH_LENGTH]
+            stem, ext = os.path.splitext(filename)
+            assets[filename] = f"{stem}.{digest}{ext}"
+    return assets
+
+
+def copy_assets(out, assets):
+    """Copy assets under their hashed names, skipping ones already there."""
+    for filename, hashed in assets.items():
+        target = os.path.join(out, "static", hashed)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(os.path.join(app.static_folder, filename), target)
+
+
+# ── Pages ─────────────────────────────────────────────────────
+
+def template_digest(name):
+    """Hash of a page template and the base template it extends."""
+    h = hashlib.sha256()
+    for template in ("base.html", name):
+        with open(os.path.join(TEMPLATE_DIR, template), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def pages(catalog):
+    """Yield (output path, template, context) for every page of the site."""
+    yield "index.html", "home.html", home_context(catalog)
+    for d in catalog.dysfunctions:
+        yield (f"dysfunction/{d['id']}/index.html", "dysfunction.html",
+               detail_context(catalog, d["id"]))
+
+
+def fingerprint(template_hash, context, assets):
+    data = json.dumps([template_hash, context, assets], sort_keys=True, default=str)
+    return _digest(data.encode("utf-8"))
+
+
+def load_manifest(out):
+    try:
+        with open(os.path.join(out, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"pages": {}, "assets": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"pages": {}, "assets": {}}
+    return manifest
+
+
+def build(out=DEFAULT_OUT, force=False):
+    """Render the site into out. Returns (pages rendered, pages unchanged, files removed)."""
+    catalog = get_catalog()
+    previous = load_manifest(out)
+    assets = hash_assets()
+    copy_assets(out, assets)
+    templates = {}
+    fingerprints = {}
+    rendered = 0
+
+    _asset_names.update(assets)
+    try:
+        with app.test_request_context("/"):
+            for path, template, context in pages(catalog):
+                if template not in templates:
+                    templates[template] = template_digest(template)
+                fingerprints[path] = fingerprint(templates[template], context, assets)
+                if (not force and previous["pages"].get(path) == fingerprints[path]
+                        and os.path.exists(os.path.join(out, path))):
+                    continue
+                html = render_template(template, static_export=True, **context)
+                _write(os.path.join(out, path), html.encode("utf-8"))
+                rendered += 1
+    finally:
+        _asset_names.clear()
+
+    removed = 0
+    for path in set(previous["pages"]) - set(fingerprints):
+        _remove(out, path)
+        removed += 1
+    for hashed in set(previous["assets"].values()) - set(assets.values()):
+        _remove(out, os.path.join("static", hashed))
+        removed += 1
+
+    _write(os.path.join(out, MANIFEST_NAME), json.dumps(
+        {"version": MANIFEST_VERSION, "pages": fingerprints, "assets": assets},
+        indent=1, sort_keys=True).encode("utf-8"))
+    return rendered, len(fingerprints) - rendered, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export posture_app as a static site.")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="output directory")
+    parser.add_argument("--force", action="store_true", help="re-render every page")
+    args = parser.parse_args()
+
+    rendered, unchanged, removed = build(args.out, args.force)
+    print(f"{args.out}: {rendered} page(s) rendered, {unchanged} unchanged, {removed} file(s) removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Dysfunction catalog loaded from data/dysfunctions.json.
+
+The file is parsed once into a Catalog with the lookups the routes need
+prebuilt: by id, by category, the resolved connected / caused-by lists for
+every entry together with their reverse references, the causal graph
+(dysfunction_graph.py), the search index (dysfunction_search.py) and the
+symptom index (dysfunction_symptoms.py). get_catalog() re-checks the
+file's mtime and size at most once a second and reloads it when they
+change, so edits show up without a restart while requests normally do no
+file I/O at all. If an edited file fails to parse the previous catalog
+stays in use.
+"""
+
+import json
+import os
+import threading
+import time
+import warnings
+
+from dysfunction_graph import DysfunctionGraph
+from dysfunction_search import SearchIndex
+from dysfunction_symptoms import SymptomIndex
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "dysfunctions.json")
+CHECK_INTERVAL = 1.0  # seconds between stat() checks of the source file
+
+
+class CatalogError(ValueError):
+    """Raised when the dysfunction file is missing or malformed."""
+
+
+class Catalog:
+    """Parsed dysfunctions with id, category and cross-reference indexes."""
+
+    def __init__(self, dysfunctions, source_stamp=None):
+        self.dysfunctions = dysfunctions      # list of entry dicts, in file order
+        self.source_stamp = source_stamp      # (mtime_ns, size) of the JSON it came from
+        self.by_id = {d["id"]: d for d in dysfunctions}
+        self.by_category = {}
+        for d in dysfunctions:
+            self.by_category.setdefault(d["category"], []).append(d)
+
+        # Forward references resolved to entries (unknown ids dropped), and
+        # the reverse of each: who lists this entry as connected / as a cause
+        self.connected = {}
+        self.caused_by = {}
+        self.connected_from = {d["id"]: [] for d in dysfunctions}
+        self.causes = {d["id"]: [] for d in dysfunctions}
+        for d in dysfunctions:
+            did = d["id"]
+            self.connected[did] = self._resolve(d.get("connected_dysfunctions", []))
+            self.caused_by[did] = self._resolve(d.get("caused_by_dysfunctions", []))
+            for other in self.connected[did]:
+                self.connected_from[other["id"]].append(d)
+            for cause in self.caused_by[did]:
+                self.causes[cause["id"]].append(d)
+        self.graph = DysfunctionGraph(dysfunctions)
+        self.search = SearchIndex(dysfunctions)
+        self.symptoms = SymptomIndex(dysfunctions, self.graph)
+
+    def _resolve(self, ids):
+        return [self.by_id[i] for i in ids if i in self.by_id]
+
+    def get(self, dysfunction_id):
+        """Return the entry with an id, or None."""
+        return self.by_id.get(dysfunction_id)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_catalog(path=DATA_PATH):
+    """Parse a dysfunction file into a Catalog."""
+    try:
+        stamp = _stamp(path)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise CatalogError(f"Can't read {path}: {e}") from e
+    if not isinstance(data, list) or not all(isinstance(d, dict) and "id" in d and "category" in d
+                                             for d in data):
+        raise CatalogError(f"{path}: expected a list of entries with 'id' and 'category'")
+    return Catalog(data, stamp)
+
+
+_current = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the live catalog, reloading it if the source file has changed."""
+    global _current, _checked_at
+    catalog = _current
+    now = time.monotonic()
+    if catalog is not None and now - _checked_at < CHECK_INTERVAL:
+        return catalog
+
+    with _lock:
+        if _current is not catalog:  # another thread already reloaded
+            return _current
+        _checked_at = now
+        try:
+            stamp = _stamp(DATA_PATH)
+        except OSError:
+            stamp = None
+        if catalog is not None and (stamp is None or stamp == catalog.source_stamp):
+            return catalog
+        try:
+            _current = load_catalog(DATA_PATH)
+        except CatalogError as e:
+            if catalog is None:
+                raise
+            # Keep serving the last good catalog until the file is fixed
+            warnings.warn(f"Dysfunction catalog reload failed, keeping previous version: {e}")
+            catalog.source_stamp = stamp
+        return _current
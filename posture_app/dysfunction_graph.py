@@ -0,0 +1,202 @@
+"""Causal graph over the dysfunction catalog.
+
+Each entry's caused_by_dysfunctions become directed edges, cause to
+effect. connected_dysfunctions ("often leads to") links nearly every entry
+to nearly every other, so it is kept as a looser "related" edge for the
+JSON graph but not followed when tracing causes. The graph is built once
+per catalog load:
+
+    adjacency   out- and in-edge lists over integer node ids (file order)
+    components  strongly connected components, found with Tarjan's
+                algorithm; a component of more than one entry is a cycle
+                of dysfunctions that feed each other
+    closure     per component, a bitset of every component reachable
+                downstream and upstream of it, computed in topological order
+
+Per-entry answers (upstream chain, downstream set, root causes) are
+decoded from the closure on first use and memoized, so requests after the
+first are dictionary lookups.
+"""
+
+
+def _bits(mask):
+    """Yield the indexes of the set bits of an int."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class DysfunctionGraph:
+    """Directed cause-to-effect graph with SCCs and transitive closure."""
+
+    def __init__(self, dysfunctions):
+        self.ids = [d["id"] for d in dysfunctions]
+        self.entries = list(dysfunctions)
+        index = {did: i for i, did in enumerate(self.ids)}
+        self.index = index
+
+        n = len(self.ids)
+        self.out_edges = [[] for _ in range(n)]  # node -> effects
+        self.in_edges = [[] for _ in range(n)]   # node -> causes
+        self.related = set()                     # (from, to) connected_dysfunctions pairs
+        for i, d in enumerate(dysfunctions):
+            for other in d.get("caused_by_dysfunctions", []):
+                cause = index.get(other)
+                if cause is not None and cause != i and i not in self.out_edges[cause]:
+                    self.out_edges[cause].append(i)
+                    self.in_edges[i].append(cause)
+            for other in d.get("connected_dysfunctions", []):
+                if other in index and index[other] != i:
+                    self.related.add((i, index[other]))
+
+        self._find_components()
+        self._build_closure()
+        self._memo = {}
+
+    # ── Components ────────────────────────────────────────────
+
+    def _find_components(self):
+        """Tarjan's SCC algorithm, iteratively. Components come out sinks first."""
+        n = len(self.ids)
+        order = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        self.component_of = [-1] * n
+        self.components = []  # lists of node ids, in reverse topological order
+        counter = 0
+
+        for root in range(n):
+            if order[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, edge = work.pop()
+                if edge == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                out = self.out_edges[node]
+                if edge < len(out):
+                    work.append((node, edge + 1))
+                    nxt = out[edge]
+                    if order[nxt] < 0:
+                        work.append((nxt, 0))
+                    elif on_stack[nxt]:
+                        low[node] = min(low[node], order[nxt])
+                    continue
+                if low[node] == order[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        self.component_of[member] = len(self.components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    self.components.append(sorted(members))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+    def _build_closure(self):
+        """Bitsets of the components reachable down- and upstream of each component."""
+        count = len(self.components)
+        succ = [set() for _ in range(count)]
+        pred = [set() for _ in range(count)]
+        for a, effects in enumerate(self.out_edges):
+            for b in effects:
+                ca, cb = self.component_of[a], self.component_of[b]
+                if ca != cb:
+                    succ[ca].add(cb)
+                    pred[cb].add(ca)
+        self.sources = [not p for p in pred]  # components nothing else feeds into
+
+        # Components are numbered sinks first, so successors are always done first
+        self.down = [0] * count
+        for c in range(count):
+            mask = 1 << c
+            for s in succ[c]:
+                mask |= self.down[s]
+            self.down[c] = mask
+        self.up = [0] * count
+        for c in reversed(range(count)):
+            mask = 1 << c
+            for p in pred[c]:
+                mask |= self.up[p]
+            self.up[c] = mask
+
+    # ── Queries ───────────────────────────────────────────────
+
+    def _nodes(self, component_mask, exclude):
+        nodes = [m for c in _bits(component_mask) for m in self.components[c] if m != exclude]
+        nodes.sort()
+        return nodes
+
+    def _memoized(self, kind, dysfunction_id, build):
+        key = (kind, dysfunction_id)
+        result = self._memo.get(key)
+        if result is None:
+            i = self.index.get(dysfunction_id)
+            result = self._memo[key] = [] if i is None else build(i)
+        return result
+
+    def upstream(self, dysfunction_id):
+        """Every entry that causes this one, directly or through others (file order)."""
+        return self._memoized("up", dysfunction_id, lambda i: [
+            self.entries[n] for n in self._nodes(self.up[self.component_of[i]], i)])
+
+    def downstream(self, dysfunction_id):
+        """Every entry this one causes, directly or through others (file order)."""
+        return self._memoized("down", dysfunction_id, lambda i: [
+            self.entries[n] for n in self._nodes(self.down[self.component_of[i]], i)])
+
+    def root_causes(self, dysfunction_id):
+        """Upstream entries that nothing outside their own cycle causes."""
+        return self._memoized("roots", dysfunction_id, lambda i: [
+            d for d in self.upstream(dysfunction_id)
+            if self.sources[self.component_of[self.index[d["id"]]]]])
+
+    def cycle(self, dysfunction_id):
+        """The other entries in this entry's cycle, or [] if it is in none."""
+        return self._memoized("cycle", dysfunction_id, lambda i: [
+            self.entries[n] for n in self.components[self.component_of[i]] if n != i])
+
+    def causes(self, cause_id, effect_id):
+        """True if cause_id causes effect_id through any chain of causes."""
+        a, b = self.index.get(cause_id), self.index.get(effect_id)
+        if a is None or b is None or a == b:
+            return False
+        return bool(self.down[self.component_of[a]] >> self.component_of[b] & 1)
+
+    # ── JSON ──────────────────────────────────────────────────
+
+    def to_json(self):
+        """The whole graph: nodes, causal and related edges, and causal cycles."""
+        if "graph" not in self._memo:
+            self._memo["graph"] = {
+                "nodes": [{"id": d["id"], "name": d["name"], "category": d["category"]}
+                          for d in self.entries],
+                "edges": [{"from": self.ids[a], "to": self.ids[b], "kind": "causes"}
+                          for a, effects in enumerate(self.out_edges) for b in effects]
+                         + [{"from": self.ids[a], "to": self.ids[b], "kind": "related"}
+                            for a, b in sorted(self.related)],
+                "cycles": [[self.ids[m] for m in members]
+                           for members in self.components if len(members) > 1],
+            }
+        return self._memo["graph"]
+
+    def node_json(self, dysfunction_id):
+        """One entry's place in the graph, as ids."""
+        def ids(entries):
+            return [d["id"] for d in entries]
+
+        return self._memoized("json", dysfunction_id, lambda i: {
+            "id": dysfunction_id,
+            "upstream": ids(self.upstream(dysfunction_id)),
+            "downstream": ids(self.downstream(dysfunction_id)),
+            "root_causes": ids(self.root_causes(dysfunction_id)),
+            "cycle": ids(self.cycle(dysfunction_id)),
+        })
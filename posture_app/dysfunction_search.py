@@ -0,0 +1,128 @@
+"""Full-text search over the dysfunction catalog.
+
+An inverted index is built once per catalog load over each entry's name,
+description, how_it_forms and side_effects. Every posting already holds
+its final BM25 contribution (term frequency weighted by field, document
+length normalization and IDF are all static), so a query only looks up
+its terms and adds up scores; the JSON is never scanned per query.
+
+The last query word is treated as a prefix, so "tens" finds "tension"
+while the user is still typing. Prefix expansion is a bisect into the
+sorted vocabulary.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+
+# How much a term occurrence counts for, by field
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.5, "how_it_forms": 1.0, "side_effects": 1.0}
+K1 = 1.2
+B = 0.75
+MAX_PREFIX_TERMS = 64  # vocabulary terms a trailing prefix may expand to
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the "
+    "their this to with your you".split())
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word):
+    """Fold simple plurals so "headaches" and "headache" index alike."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lowercase words of a text, stopwords dropped and plurals folded."""
+    return [_stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+def _field_text(d, field):
+    value = d.get(field, "")
+    if isinstance(value, dict):
+        return " ".join(" ".join(v) for v in value.values())
+    if isinstance(value, list):
+        return " ".join(value)
+    return value
+
+
+class SearchIndex:
+    """BM25 inverted index over dysfunction entries."""
+
+    def __init__(self, dysfunctions):
+        self.entries = list(dysfunctions)
+        term_freqs = []  # per document: term -> field-weighted frequency
+        lengths = []
+        for d in self.entries:
+            tf = {}
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(_field_text(d, field)):
+                    tf[term] = tf.get(term, 0.0) + weight
+                    length += weight
+            term_freqs.append(tf)
+            lengths.append(length)
+
+        n = len(self.entries)
+        avg_length = (sum(lengths) / n) if n else 1.0
+        doc_freq = {}
+        for tf in term_freqs:
+            for term in tf:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+
+        # term -> {doc index: BM25 score contribution}
+        self.postings = {}
+        for doc, tf in enumerate(term_freqs):
+            norm = K1 * (1 - B + B * lengths[doc] / avg_length)
+            for term, freq in tf.items():
+                df = doc_freq[term]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                self.postings.setdefault(term, {})[doc] = idf * freq * (K1 + 1) / (freq + norm)
+        self.vocabulary = sorted(self.postings)
+
+    def expand_prefix(self, prefix):
+        """Vocabulary terms starting with a prefix, at most MAX_PREFIX_TERMS."""
+        terms = []
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and len(terms) < MAX_PREFIX_TERMS:
+            term = self.vocabulary[i]
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+            i += 1
+        return terms
+
+    def search(self, query, limit=10, prefix=True):
+        """Return [(entry, score)] for a query, best first.
+
+        With prefix=True the last word also matches any term it begins, for
+        type-ahead; a prefix group scores as its best-matching term.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return []
+        scores = {}
+        last = len(words) - 1
+        for i, word in enumerate(words):
+            if prefix and i == last and not query[-1:].isspace():
+                group = self.expand_prefix(word)
+                if word not in STOPWORDS and _stem(word) not in group:
+                    group.append(_stem(word))
+            elif word in STOPWORDS:
+                continue
+            else:
+                group = [_stem(word)]
+            best = {}
+            for term in group:
+                for doc, score in self.postings.get(term, {}).items():
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.entries[doc], score) for doc, score in ranked]
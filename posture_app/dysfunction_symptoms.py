@@ -0,0 +1,119 @@
+"""Rank dysfunctions by the symptoms a user reports.
+
+Built once per catalog load from every entry's side_effects:
+
+    symptoms   each distinct symptom phrase ("tension headaches"), with a
+               sparse vector over dysfunctions: short-term effects weigh
+               more than long-term ones, scaled by how specific the
+               symptom is (IDF over entries)
+    terms      word -> symptom phrases containing it, to match free-text
+               input such as "headache" or "stiff neck"
+
+A query turns the user's symptoms into a sparse vector over symptom
+phrases (match strength = share of the phrase's words found times share
+of the query's words used), multiplies it through the symptom vectors,
+then adds a share of each entry's causes' and effects' scores along the
+causal graph, so an entry whose causes also fit the symptoms ranks
+higher. Only non-zero entries are touched.
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+
+from dysfunction_search import tokenize
+
+TERM_WEIGHTS = {"short_term": 1.0, "long_term": 0.6}
+CAUSE_BOOST = 0.25   # share of a cause's score added to each entry it causes
+EFFECT_BOOST = 0.15  # share of an effect's score added to each of its causes
+MIN_MATCH = 0.4      # match strength a symptom phrase needs to count
+MIN_PREFIX = 4       # query words this long also match longer words ("stiff")
+
+
+class SymptomIndex:
+    """Symptom -> dysfunction weighted index with causal-graph boosting."""
+
+    def __init__(self, dysfunctions, graph):
+        self.entries = list(dysfunctions)
+        self.graph = graph
+        self.symptoms = []   # phrase as written, by symptom id
+        self.words = []      # set of words, by symptom id
+        self.vectors = []    # {doc index: weight}, by symptom id
+        self.terms = {}      # word -> [symptom id]
+        ids = {}
+        for doc, d in enumerate(self.entries):
+            for kind, weight in TERM_WEIGHTS.items():
+                for phrase in d.get("side_effects", {}).get(kind, []):
+                    words = frozenset(tokenize(phrase))
+                    if not words:
+                        continue
+                    sid = ids.get(words)
+                    if sid is None:
+                        sid = ids[words] = len(self.symptoms)
+                        self.symptoms.append(phrase)
+                        self.words.append(words)
+                        self.vectors.append({})
+                        for word in words:
+                            self.terms.setdefault(word, []).append(sid)
+                    vector = self.vectors[sid]
+                    vector[doc] = max(vector.get(doc, 0.0), weight)
+        self.vocabulary = sorted(self.terms)
+
+        n = len(self.entries)
+        for vector in self.vectors:
+            idf = math.log(1 + n / len(vector))
+            for doc in vector:
+                vector[doc] *= idf
+
+    def _phrases_with(self, word):
+        """Symptom ids whose phrase has the word, or a word it begins if it is long enough."""
+        if len(word) < MIN_PREFIX:
+            return set(self.terms.get(word, ()))
+        found = set()
+        i = bisect_left(self.vocabulary, word)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(word):
+            found.update(self.terms[self.vocabulary[i]])
+            i += 1
+        return found
+
+    def match(self, symptom):
+        """Return {symptom id: strength} for the indexed phrases a free-text symptom matches."""
+        words = set(tokenize(symptom))
+        candidates = {}
+        for word in words:
+            for sid in self._phrases_with(word):
+                candidates[sid] = candidates.get(sid, 0) + 1
+        matches = {}
+        for sid, hits in candidates.items():
+            strength = hits / len(self.words[sid]) * hits / len(words)
+            if strength >= MIN_MATCH:
+                matches[sid] = strength
+        return matches
+
+    def rank(self, symptoms, limit=10):
+        """Rank dysfunctions for a list of symptom strings.
+
+        Returns [(entry, score, matched phrases)], best first.
+        """
+        query = {}
+        for symptom in symptoms:
+            for sid, strength in self.match(symptom).items():
+                query[sid] = max(query.get(sid, 0.0), strength)
+
+        scores = {}
+        matched = {}
+        for sid, strength in query.items():
+            for doc, weight in self.vectors[sid].items():
+                scores[doc] = scores.get(doc, 0.0) + strength * weight
+                matched.setdefault(doc, []).append(self.symptoms[sid])
+
+        # One step along the causal graph in each direction
+        boosted = dict(scores)
+        for doc, score in scores.items():
+            for effect in self.graph.out_edges[doc]:
+                boosted[effect] = boosted.get(effect, 0.0) + CAUSE_BOOST * score
+            for cause in self.graph.in_edges[doc]:
+                boosted[cause] = boosted.get(cause, 0.0) + EFFECT_BOOST * score
+
+        ranked = heapq.nsmallest(limit, boosted.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.entries[doc], score, matched.get(doc, [])) for doc, score in ranked]
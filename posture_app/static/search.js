@@ -0,0 +1,60 @@
+// Search-as-you-type for the search page: queries /api/search on each
+// keystroke and redraws the result cards. The form still works without it.
+(function () {
+    var input = document.getElementById("search-input");
+    var results = document.getElementById("search-results");
+    if (!input || !results) return;
+
+    var api = results.dataset.api;
+    var detail = results.dataset.detail;
+    var latest = 0;
+
+    function card(d) {
+        var a = document.createElement("a");
+        a.className = "card";
+        a.href = detail + encodeURIComponent(d.id);
+
+        var header = document.createElement("div");
+        header.className = "card-header";
+        var title = document.createElement("h3");
+        title.className = "card-title";
+        title.textContent = d.name;
+        header.appendChild(title);
+        var badge = document.createElement("span");
+        badge.className = "category-badge";
+        badge.textContent = d.category_label;
+        header.appendChild(badge);
+
+        var desc = document.createElement("p");
+        desc.className = "card-desc";
+        desc.textContent = d.description;
+
+        var arrow = document.createElement("span");
+        arrow.className = "card-arrow";
+        arrow.innerHTML = "&rarr;";
+
+        a.appendChild(header);
+        a.appendChild(desc);
+        a.appendChild(arrow);
+        return a;
+    }
+
+    input.addEventListener("input", function () {
+        var query = input.value;
+        var request = ++latest;
+        var empty = document.getElementById("search-empty");
+        if (empty) empty.remove();
+        if (!query.trim()) {
+            results.innerHTML = "";
+            return;
+        }
+        fetch(api + "?q=" + encodeURIComponent(query))
+            .then(function (res) { return res.json(); })
+            .then(function (data) {
+                if (request !== latest) return;  // a newer keystroke already answered
+                results.innerHTML = "";
+                data.forEach(function (d) { results.appendChild(card(d)); });
+                history.replaceState(null, "", "?q=" + encodeURIComponent(query));
+            });
+    });
+})();
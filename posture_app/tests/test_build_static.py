@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import build_static
+from app import app
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """A scratch copy of static/, so a test can edit assets."""
+    path = tmp_path / "static"
+    shutil.copytree(app.static_folder, path)
+    monkeypatch.setattr(app, "static_folder", str(path))
+    return path
+
+
+def _snapshot(out):
+    """{relative path: (mtime_ns, bytes)} for every file of a build."""
+    files = {}
+    for root, _, names in os.walk(out):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, out)] = (os.stat(path).st_mtime_ns, f.read())
+    return files
+
+
+def _manifest(out):
+    with open(os.path.join(out, build_static.MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_second_build_rewrites_nothing(tmp_path, static_dir):
+    out = str(tmp_path / "build")
+    rendered, unchanged, removed = build_static.build(out)
+    assert rendered > 1 and unchanged == removed == 0
+    before = _snapshot(out)
+
+    assert build_static.build(out) == (0, rendered, 0)
+    after = _snapshot(out)
+    before.pop(build_static.MANIFEST_NAME)
+    after.pop(build_static.MANIFEST_NAME)
+    assert after == before
+
+
+def test_editing_an_asset_changes_only_its_name(tmp_path, static_dir):
+    out = str(tmp_path / "build")
+    build_static.build(out)
+    assets = _manifest(out)["assets"]
+
+    with open(static_dir / "search.js", "a", encoding="utf-8") as f:
+        f.write("\n// edited\n")
+    rendered, _, removed = build_static.build(out)
+
+    changed = _manifest(out)["assets"]
+    assert changed["style.css"] == assets["style.css"]
+    assert changed["search.js"] != assets["search.js"]
+    assert removed == 1  # the old search.js
+    assert sorted(os.listdir(os.path.join(out, "static"))) == sorted(changed.values())
+    # Every page links the assets, so every page is rendered again
+    assert rendered == len(_manifest(out)["pages"])
@@ -0,0 +1,37 @@
+import json
+import shutil
+
+import pytest
+
+import dysfunction_catalog
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = tmp_path / "dysfunctions.json"
+    shutil.copyfile(dysfunction_catalog.DATA_PATH, path)
+    monkeypatch.setattr(dysfunction_catalog, "DATA_PATH", str(path))
+    monkeypatch.setattr(dysfunction_catalog, "CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(dysfunction_catalog, "_current", None)
+    return path
+
+
+def test_editing_the_file_reloads_the_catalog(data_file):
+    before = dysfunction_catalog.get_catalog()
+    assert dysfunction_catalog.get_catalog() is before  # unchanged file, same object
+
+    entries = json.loads(data_file.read_text(encoding="utf-8"))
+    entries[0]["name"] = "Renamed While Running"
+    data_file.write_text(json.dumps(entries), encoding="utf-8")
+
+    after = dysfunction_catalog.get_catalog()
+    assert after is not before
+    assert after.get(entries[0]["id"])["name"] == "Renamed While Running"
+    assert after.search.search("renamed while running")[0][0]["id"] == entries[0]["id"]
+
+
+def test_a_broken_edit_keeps_the_previous_catalog(data_file):
+    before = dysfunction_catalog.get_catalog()
+    data_file.write_text("[{", encoding="utf-8")
+    with pytest.warns(UserWarning, match="keeping previous version"):
+        assert dysfunction_catalog.get_catalog() is before
@@ -0,0 +1,61 @@
+import pytest
+
+from dysfunction_catalog import load_catalog
+from dysfunction_graph import DysfunctionGraph
+
+
+def _entry(did, caused_by=()):
+    return {"id": did, "name": did.title(), "category": "test",
+            "caused_by_dysfunctions": list(caused_by)}
+
+
+# a -> b -> c -> a is a cycle; d feeds it, c and e feed f, g stands alone
+SMALL = [
+    _entry("a", ["c", "d"]),
+    _entry("b", ["a"]),
+    _entry("c", ["b"]),
+    _entry("d"),
+    _entry("e"),
+    _entry("f", ["c", "e", "missing"]),
+    _entry("g", ["g"]),
+]
+
+
+def _naive(entries, start, upstream):
+    """Breadth-first search over caused_by links, as ids in file order."""
+    ids = [d["id"] for d in entries]
+    causes = {d["id"]: [c for c in d.get("caused_by_dysfunctions", []) if c in ids]
+              for d in entries}
+    effects = {did: [e for e in ids if did in causes[e]] for did in ids}
+    step = causes if upstream else effects
+    seen, queue = set(), [start]
+    while queue:
+        for nxt in step[queue.pop(0)]:
+            if nxt not in seen:
+                seen.add(nxt)
+                queue.append(nxt)
+    seen.discard(start)
+    return [did for did in ids if did in seen]
+
+
+def _ids(entries):
+    return [d["id"] for d in entries]
+
+
+@pytest.mark.parametrize("entries", [SMALL, load_catalog().dysfunctions],
+                         ids=["small", "catalog"])
+def test_closure_matches_breadth_first_search(entries):
+    graph = DysfunctionGraph(entries)
+    for d in entries:
+        assert _ids(graph.upstream(d["id"])) == _naive(entries, d["id"], upstream=True)
+        assert _ids(graph.downstream(d["id"])) == _naive(entries, d["id"], upstream=False)
+
+
+def test_cycles_and_root_causes():
+    graph = DysfunctionGraph(SMALL)
+    assert _ids(graph.cycle("a")) == ["b", "c"]
+    assert graph.cycle("g") == []
+    assert _ids(graph.root_causes("f")) == ["d", "e"]
+    assert graph.causes("a", "a") is False
+    assert graph.causes("b", "a") and graph.causes("d", "f") and not graph.causes("f", "d")
+    assert graph.to_json()["cycles"] == [["a", "b", "c"]]
@@ -0,0 +1,40 @@
+import re
+
+import pytest
+
+from app import app
+from dysfunction_catalog import get_catalog
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def _ids(results):
+    return [d["id"] for d, _ in results]
+
+
+def test_name_matches_rank_first():
+    results = get_catalog().search.search("pelvic tilt", prefix=False)
+    assert _ids(results)[:3] == ["anterior_pelvic_tilt", "lateral_pelvic_tilt",
+                                 "posterior_pelvic_tilt"]
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("typed", ["tension headache", "tension headach", "tension heada"])
+def test_type_ahead_agrees_with_the_full_query(typed):
+    search = get_catalog().search
+    full = _ids(search.search("tension headache", prefix=False))
+    assert _ids(search.search(typed))[:2] == full[:2] == ["elevated_shoulders", "forward_head"]
+
+
+def test_search_page_lists_what_the_api_returns(client):
+    api = [r["id"] for r in client.get("/api/search?q=neck%20stiff&limit=20").get_json()]
+    page = client.get("/search?q=neck%20stiff").get_data(as_text=True)
+    assert api and re.findall(r'href="/dysfunction/([a-z_]+)"', page) == api
+
+
+def test_api_search_rejects_a_negative_limit(client):
+    assert client.get("/api/search?q=neck&limit=-1").status_code == 400
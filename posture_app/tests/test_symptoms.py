@@ -0,0 +1,39 @@
+import pytest
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_symptoms_rank_the_matching_entry_first(client):
+    body = {"symptoms": ["neck stiffness", "tension headaches"], "limit": 3}
+    results = client.post("/api/symptoms", json=body).get_json()
+    assert [r["id"] for r in results] == ["forward_head", "elevated_shoulders", "rounded_shoulders"]
+    assert "Neck stiffness" in results[0]["matched_symptoms"]
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+    query = client.get("/api/symptoms?symptom=neck+stiffness&symptom=tension+headaches&limit=3")
+    assert query.get_json() == results
+
+
+@pytest.mark.parametrize("body", [
+    ["neck stiffness"],
+    "neck stiffness",
+    {"symptoms": "neck stiffness"},
+    {"symptoms": []},
+    {"symptoms": ["neck stiffness"], "limit": -1},
+    {"symptoms": ["neck stiffness"], "limit": 0},
+    {"symptoms": ["neck stiffness"], "limit": "5"},
+])
+def test_symptoms_rejects_bad_bodies(client, body):
+    response = client.post("/api/symptoms", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_symptoms_rejects_a_negative_limit_in_the_query(client):
+    assert client.get("/api/symptoms?symptom=neck&limit=-5").status_code == 400
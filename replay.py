@@ -0,0 +1,157 @@
+"""Deterministic replay of recorded battles.
+
+A battle is reproducible from its setup (the seed of its RNG stream and
+the exact player, boss and attacks it started with) plus the actions taken.
+event_log.py stores the setup in each battle's start record and the action
+in each turn record. This tool rebuilds every finished battle from the log,
+plays it headless at full engine speed and checks that it produces the same
+events and result. Usage:
+
+    python replay.py                        # every finished battle in data/events.log
+    python replay.py --export corpus.jsonl  # save them as a self-contained corpus
+    python replay.py --corpus corpus.jsonl  # replay a corpus, e.g. in CI
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from attacks import Attack
+from bosses import Boss
+from engine import Battle
+from player import Player
+
+PLAYER_FIELDS = ("level", "xp", "hp", "max_hp", "energy", "max_energy",
+                 "sanity", "max_sanity", "wins", "losses")
+
+
+# ── Setup ─────────────────────────────────────────────────────
+
+def _attack_row(atk):
+    se = atk.status_effect
+    return [atk.name, atk.power, atk.accuracy, atk.energy_cost, atk.sanity_cost,
+            atk.description, dict(se) if se else None]
+
+
+def battle_setup(fight):
+    """Describe a just-started Battle as JSON-ready data that rebuild() can replay."""
+    player, boss = fight.player, fight.boss
+    return {
+        "seed": fight.seed,
+        "survival": fight.survival,
+        "turn": fight.turn,
+        "player": dict({f: getattr(player, f) for f in PLAYER_FIELDS},
+                       name=player.name, bosses_defeated=list(player.bosses_defeated)),
+        "player_attacks": [_attack_row(a) for a in fight.player_attacks],
+        "boss": {"name": boss.name, "level": boss.level, "hp": boss.hp, "max_hp": boss.max_hp,
+                 "attacks": [_attack_row(a) for a in boss.attacks]},
+    }
+
+
+def rebuild(setup):
+    """Return a fresh Battle in the state a setup describes."""
+    p = setup["player"]
+    player = Player(p["name"])
+    for field in PLAYER_FIELDS:
+        setattr(player, field, p[field])
+    player.bosses_defeated = list(p["bosses_defeated"])
+
+    b = setup["boss"]
+    boss = Boss(b["name"], b["level"], b["hp"], [Attack(*row) for row in b["attacks"]])
+    boss.max_hp = b["max_hp"]
+
+    fight = Battle(player, boss, [Attack(*row) for row in setup["player_attacks"]],
+                   survival=setup["survival"], seed=setup["seed"])
+    fight.turn = setup["turn"]
+    return fight
+
+
+# ── Replaying ─────────────────────────────────────────────────
+
+def _normalize(events):
+    # Recorded events went through JSON; compare like with like
+    return json.loads(json.dumps(events))
+
+
+def replay(recording):
+    """Replay one recording. Returns None if it matches, else a description of the first difference."""
+    fight = rebuild(recording["setup"])
+    for i, turn in enumerate(recording["turns"]):
+        events = _normalize(fight.step(turn["action"]))
+        if events != turn["events"]:
+            return f"turn {turn['turn']}: expected {turn['events']}, got {events}"
+        if fight.over != (i == len(recording["turns"]) - 1):
+            return f"turn {turn['turn']}: battle over={fight.over} at the wrong time"
+    if fight.result != recording["result"] or fight.xp_gained != recording["xp"]:
+        return (f"expected {recording['result']} (+{recording['xp']} XP), "
+                f"got {fight.result} (+{fight.xp_gained} XP)")
+    return None
+
+
+def recordings_from_log(path):
+    """Yield a recording for every finished battle in an event log that has a setup."""
+    from event_log import _by_battle, read_records
+
+    _, battles = _by_battle(read_records(path))
+    for bid, records in battles.items():
+        start, end = records[0], records[-1]
+        if "setup" not in start or end["k"] != "end":
+            continue
+        yield {
+            "id": bid,
+            "setup": start["setup"],
+            "turns": [{"turn": r["turn"], "action": r["action"], "events": r["events"]}
+                      for r in records if r["k"] == "turn"],
+            "result": end["result"],
+            "xp": end["xp"],
+        }
+
+
+def recordings_from_corpus(path):
+    """Yield recordings from a JSON-lines corpus written by --export."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    from event_log import LOG_PATH
+
+    parser = argparse.ArgumentParser(description="Replay recorded battles and check they match.")
+    parser.add_argument("--log", default=LOG_PATH, help="event log to read battles from")
+    parser.add_argument("--corpus", help="replay a JSON-lines corpus instead of the log")
+    parser.add_argument("--export", metavar="FILE",
+                        help="write the log's battles to a corpus file instead of replaying")
+    parser.add_argument("--id", help="only this battle id")
+    args = parser.parse_args()
+
+    source = recordings_from_corpus(args.corpus) if args.corpus else recordings_from_log(args.log)
+    recordings = [r for r in source if args.id is None or r["id"] == args.id]
+
+    if args.export:
+        with open(args.export, "w", encoding="utf-8") as f:
+            for r in recordings:
+                f.write(json.dumps(r, separators=(",", ":")) + "\n")
+        print(f"Wrote {len(recordings)} battle(s) to {args.export}")
+        return
+
+    start = time.perf_counter()
+    failures = 0
+    turns = 0
+    for r in recordings:
+        turns += len(r["turns"])
+        problem = replay(r)
+        if problem:
+            failures += 1
+            print(f"MISMATCH {r['id']}: {problem}")
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {len(recordings)} battle(s), {turns} turns in {elapsed:.2f}s: "
+          f"{failures} mismatch(es)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""Keyed player save storage, one record per player name.
+
+Player.save() and Player.load() go through a save store instead of a single
+shared JSON file, so players never overwrite each other and saving one
+player costs the same however many others there are.
+
+Two backends share one interface (get / put / delete / names):
+
+    SQLiteSaveStore   one row per player in a SQLite file, looked up by its
+                      primary key. The default, at data/saves.db.
+    ShardedSaveStore  one small JSON file per player, spread over hashed
+                      subdirectories so no directory grows too large.
+                      Files are replaced atomically (temp file, fsync,
+                      rename) under an advisory lock on the shard, so a
+                      crash or a concurrent writer never leaves a torn save.
+
+make_save_store() picks one from a URL such as "sqlite:///data/saves.db" or
+"dir:///data/saves"; BOSS_BATTLE_SAVES sets the URL get_save_store() uses,
+and set_save_store() swaps in another store for the whole process.
+A legacy data/save.json is copied into an empty store the first time it
+is opened.
+
+WriteBehindStore wraps either backend for the web app: put() only queues
+the record and a background thread writes it out, so several saves of one
+player between flushes cost a single write.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from urllib.parse import quote, unquote, urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic renames still apply, just no cross-process lock
+    fcntl = None
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_URL = "sqlite:///" + os.path.join(DATA_DIR, "saves.db")
+LEGACY_SAVE_PATH = os.path.join(DATA_DIR, "save.json")
+
+
+def _encode(data):
+    return json.dumps(data, separators=(",", ":"))
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on a lock file for the duration of the block."""
+    with open(path, "a") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path, text):
+    """Replace a file's contents so readers see either the old or the new version."""
+    directory = os.path.dirname(path) or "."
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class SQLiteSaveStore:
+    """Player records as JSON rows in a SQLite database."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS players ("
+                "name TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _conn(self):
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, name):
+        """Return the saved record for a player, or None."""
+        row = self._conn().execute("SELECT data FROM players WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, name, data):
+        """Insert or replace one player's record."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO players (name, data, updated) VALUES (?, ?, ?)",
+                (name, _encode(data), time.time()),
+            )
+
+    def delete(self, name):
+        """Remove a player's record."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM players WHERE name = ?", (name,))
+
+    def names(self):
+        """Return every saved player name, sorted."""
+        return [r[0] for r in self._conn().execute("SELECT name FROM players ORDER BY name")]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+
+class ShardedSaveStore:
+    """Player records as one JSON file each under <directory>/<shard>/."""
+
+    def __init__(self, directory, shard_chars=2):
+        self.directory = directory
+        self.shard_chars = shard_chars  # hex digits of the name hash per shard dir
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, name):
+        """Return the file a player's record lives in."""
+        shard = hashlib.sha1(name.encode("utf-8")).hexdigest()[:self.shard_chars]
+        return os.path.join(self.directory, shard, quote(name, safe="") + ".json")
+
+    def get(self, name):
+        """Return the saved record for a player, or None."""
+        try:
+            with open(self.path_for(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, name, data):
+        """Write one player's record atomically."""
+        path = self.path_for(name)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+        with file_lock(os.path.join(shard, ".lock")):
+            atomic_write(path, _encode(data))
+
+    def delete(self, name):
+        """Remove a player's record."""
+        path = self.path_for(name)
+        try:
+            with file_lock(os.path.join(os.path.dirname(path), ".lock")):
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def names(self):
+        """Return every saved player name, sorted."""
+        names = []
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                names.extend(unquote(e.name[:-5]) for e in os.scandir(shard.path)
+                             if e.name.endswith(".json"))
+        return sorted(names)
+
+    def __len__(self):
+        return len(self.names())
+
+
+class WriteBehindStore:
+    """Queue saves in memory and write them to another store in the background.
+
+    Records are flushed every `interval` seconds, or sooner once
+    `max_dirty` players are waiting. Only the latest record per player is
+    written. get() answers from the queue first, so a load right after a
+    save sees it. Pending saves are flushed at interpreter exit.
+    """
+
+    def __init__(self, inner, interval=1.0, max_dirty=100):
+        self.inner = inner
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self._pending = {}  # name -> record not yet written
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._thread = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def get(self, name):
+        """Return the saved record for a player, including unflushed saves."""
+        with self._cond:
+            data = self._pending.get(name)
+        return data if data is not None else self.inner.get(name)
+
+    def put(self, name, data):
+        """Queue a player's record to be written on the next flush."""
+        # Copy the lists so later changes to the player don't leak into the queue
+        data = {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
+        if self._closed:
+            self.inner.put(name, data)
+            return
+        with self._cond:
+            self._pending[name] = data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.max_dirty:
+                self._cond.notify()
+
+    def delete(self, name):
+        """Remove a player's record, queued or written."""
+        with self._cond:
+            self._pending.pop(name, None)
+        self.inner.delete(name)
+
+    def names(self):
+        """Return every saved player name, sorted."""
+        with self._cond:
+            pending = set(self._pending)
+        return sorted(pending.union(self.inner.names()))
+
+    def __len__(self):
+        return len(self.names())
+
+    def flush(self):
+        """Write every queued record now. Returns how many were written."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+            written = 0
+            for name, data in batch.items():
+                try:
+                    self.inner.put(name, data)
+                    written += 1
+                except (OSError, sqlite3.Error) as e:
+                    warnings.warn(f"Saving {name!r} failed, will retry: {e}")
+                    with self._cond:
+                        self._pending.setdefault(name, data)  # unless a newer save arrived
+            return written
+
+    def _run(self):
+        while not self._closed:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.max_dirty, self.interval)
+            self.flush()
+
+    def close(self):
+        """Stop the writer thread and flush whatever is still queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+
+def make_save_store(url=DEFAULT_URL):
+    """Build a save store from a URL: "sqlite:///path" or "dir:///path"."""
+    parsed = urlparse(url)
+    # scheme:///rel/x is relative to the working directory, scheme:////abs/x absolute
+    path = parsed.path[1:]
+    if parsed.scheme == "sqlite":
+        return SQLiteSaveStore(path)
+    if parsed.scheme == "dir":
+        return ShardedSaveStore(path)
+    raise ValueError(f"Unknown save store: {url!r}")
+
+
+def import_legacy_save(store, path=LEGACY_SAVE_PATH):
+    """Copy the old single-player save.json into an empty store. Returns True if it did."""
+    if len(store) or not os.path.exists(path):
+        return False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    if not isinstance(data, dict) or not data.get("name"):
+        return False
+    store.put(data["name"], data)
+    return True
+
+
+_store = None
+_lock = threading.Lock()
+
+
+def get_save_store():
+    """Return the process-wide save store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                store = make_save_store(os.environ.get("BOSS_BATTLE_SAVES", DEFAULT_URL))
+                import_legacy_save(store)
+                _store = store
+    return _store
+
+
+def set_save_store(store):
+    """Make store the process-wide save store (benchmarks, tests, scripts). Returns it."""
+    global _store
+    with _lock:
+        _store = store
+    return store
+
+
+def use_write_behind(interval=1.0, max_dirty=100):
+    """Put the process-wide store behind a WriteBehindStore. Returns it."""
+    global _store
+    store = get_save_store()
+    with _lock:
+        if not isinstance(_store, WriteBehindStore):
+            _store = WriteBehindStore(store, interval, max_dirty)
+        return _store
@@ -0,0 +1,313 @@
+"""Boss Battle Simulator: Life Edition - Monte Carlo battle simulator.
+
+Runs many headless fights of a player level against every boss and reports
+win rates, so PLAYER_ATTACKS can be balanced against the roster without
+hand-playing. Usage:
+
+    python simulate.py --level 10 --fights 100000 --policy greedy
+    python simulate.py --level 10 --fights 1000000 --vectorized
+
+--vectorized needs NumPy (pip install -r requirements-numpy.txt).
+"""
+
+import argparse
+import importlib
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from attacks import PLAYER_ATTACKS, REFILL_ATTACK, STUDY_ATTACK
+from bosses import BOSS_TEMPLATES, Boss
+from engine import Battle
+from player import Player
+
+CHUNK_SIZE = 5000
+VECTOR_CHUNK_SIZE = 100000
+HP_BUCKETS = 10  # HP-left histogram buckets (deciles of max HP)
+MAX_TURNS = 500  # safety cap so a stalling policy can't loop forever
+Z_95 = 1.96
+
+
+# ── Attack Policies ───────────────────────────────────────────
+# A policy takes (fight, rng) and returns an action for Battle.step().
+
+def _affordable(fight):
+    """Return indexes of attacks the player can pay for right now."""
+    player = fight.player
+    return [
+        i for i, atk in enumerate(fight.player_attacks)
+        if not (atk.energy_cost > 0 and player.energy < atk.energy_cost)
+        and not (atk.sanity_cost > 0 and player.sanity < atk.sanity_cost)
+    ]
+
+
+def random_policy(fight, rng):
+    """Pick any affordable attack at random. Never runs."""
+    return rng.choice(_affordable(fight))
+
+
+def greedy_policy(fight, rng):
+    """Pick the affordable attack with the best expected damage,
+    recovering sanity with Cry when it gets low."""
+    player = fight.player
+    options = _affordable(fight)
+    attacks = fight.player_attacks
+    if player.sanity <= 25:
+        healers = [i for i in options if attacks[i].sanity_cost < 0]
+        if healers:
+            return healers[0]
+    return max(options, key=lambda i: attacks[i].power * attacks[i].accuracy)
+
+
+def _attack_index(fight, name):
+    """Return the index of a PLAYER_ATTACKS entry in the fight, by name."""
+    for i, atk in enumerate(fight.player_attacks):
+        if atk.name == name:
+            return i
+    raise ValueError(f"No player attack named {name!r}")
+
+
+def study_policy(fight, rng):
+    """Actually Study while energy lasts, Procrastinate to refill."""
+    study = _attack_index(fight, STUDY_ATTACK)
+    return study if study in _affordable(fight) else _attack_index(fight, REFILL_ATTACK)
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "study": study_policy,
+}
+
+
+def get_policy(name):
+    """Look up a policy by name or by a "module:function" path."""
+    if name in POLICIES:
+        return POLICIES[name]
+    if ":" in name:
+        module_name, attr = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), attr)
+    raise ValueError(f"Unknown policy: {name}")
+
+
+# ── Simulation ────────────────────────────────────────────────
+
+def player_at_level(level):
+    """Return a fresh player with the stats they'd have at a given level."""
+    player = Player("Simulator")
+    while player.level < level:
+        player.gain_xp(player.xp_to_next_level())
+    player.xp = 0
+    player.restore_for_battle()
+    return player
+
+
+def run_chunk(job):
+    """Run a batch of fights in a worker. Returns aggregated counters."""
+    boss_index, level, policy_name, seed, n = job
+    rng = random.Random(seed)
+    policy = get_policy(policy_name)
+    template = BOSS_TEMPLATES[boss_index]
+    base = player_at_level(level)
+
+    wins = 0
+    turns_sum = 0
+    turns_sq = 0
+    hp_hist = [0] * HP_BUCKETS
+
+    for _ in range(n):
+        player = _clone_player(base)
+        boss = Boss(template.name, template.level, template.max_hp, template.attacks)
+        fight = Battle(player, boss, PLAYER_ATTACKS, rng=rng)
+
+        while not fight.over and fight.turn <= MAX_TURNS:
+            action = None if fight.player_stunned() else policy(fight, rng)
+            fight.step(action)
+
+        turns_sum += fight.turn
+        turns_sq += fight.turn * fight.turn
+        if fight.result == "victory":
+            wins += 1
+            bucket = min(HP_BUCKETS - 1, player.hp * HP_BUCKETS // player.max_hp)
+            hp_hist[bucket] += 1
+
+    return boss_index, n, wins, turns_sum, turns_sq, hp_hist
+
+
+def _require_batch():
+    """Import the NumPy batch kernel, with a clear error if NumPy is missing."""
+    try:
+        import batch
+    except ImportError as err:
+        raise RuntimeError(
+            "--vectorized needs NumPy; install it with pip install -r requirements-numpy.txt"
+        ) from err
+    return batch
+
+
+def run_chunk_vectorized(job):
+    """Run a batch of fights with the NumPy kernel. Same output as run_chunk()."""
+    import numpy as np
+
+    import batch
+
+    boss_index, level, policy_name, seed, n = job
+    policy = batch.VECTOR_POLICIES.get(policy_name) or get_policy(policy_name)
+    template = BOSS_TEMPLATES[boss_index]
+    base = player_at_level(level)
+    # NumPy seeds must be integers; derive one from the chunk's string seed
+    state = batch.run_batch(n, base, template, PLAYER_ATTACKS, policy,
+                            seed=random.Random(seed).getrandbits(64), max_turns=MAX_TURNS)
+
+    won = state.result == batch.VICTORY
+    buckets = np.minimum(HP_BUCKETS - 1, state.final_hp[won] * HP_BUCKETS // base.max_hp)
+    hp_hist = np.bincount(buckets, minlength=HP_BUCKETS).tolist()
+    turns = state.turns
+    return (boss_index, n, int(won.sum()), int(turns.sum()),
+            int((turns * turns).sum()), hp_hist)
+
+
+def _clone_player(base):
+    """Copy the combat stats of a template player into a new Player."""
+    player = Player(base.name)
+    player.level = base.level
+    player.max_hp = player.hp = base.max_hp
+    player.max_energy = player.energy = base.max_energy
+    player.max_sanity = player.sanity = base.max_sanity
+    return player
+
+
+def wilson_interval(wins, n, z=Z_95):
+    """Return the Wilson score interval for a win rate."""
+    if n == 0:
+        return 0.0, 0.0
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def simulate(level, fights, policy_name="greedy", seed=0, workers=None, boss_names=None,
+             vectorized=False):
+    """Simulate fights against every boss. Returns a list of result dicts.
+
+    With vectorized=True, chunks run through the NumPy batch kernel and the
+    policy must be a vector policy (see batch.VECTOR_POLICIES).
+    """
+    if fights < 1:
+        raise ValueError("fights must be at least 1")
+    if vectorized:
+        _require_batch()  # fail here rather than inside every worker
+    else:
+        get_policy(policy_name)  # fail fast on a bad policy name
+    chunk_size = VECTOR_CHUNK_SIZE if vectorized else CHUNK_SIZE
+    worker = run_chunk_vectorized if vectorized else run_chunk
+    bosses = BOSS_TEMPLATES
+    indexes = [i for i, b in enumerate(bosses) if not boss_names or b.name in boss_names]
+
+    jobs = []
+    for i in indexes:
+        remaining = fights
+        chunk = 0
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            # Deterministic per-chunk seed, independent of worker scheduling
+            jobs.append((i, level, policy_name, f"{seed}:{i}:{chunk}", n))
+            remaining -= n
+            chunk += 1
+
+    totals = {i: [0, 0, 0, 0, [0] * HP_BUCKETS] for i in indexes}
+    if workers == 1:
+        outputs = list(map(worker, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(worker, jobs))
+
+    for boss_index, n, wins, turns_sum, turns_sq, hp_hist in outputs:
+        t = totals[boss_index]
+        t[0] += n
+        t[1] += wins
+        t[2] += turns_sum
+        t[3] += turns_sq
+        t[4] = [a + b for a, b in zip(t[4], hp_hist)]
+
+    results = []
+    for i in indexes:
+        n, wins, turns_sum, turns_sq, hp_hist = totals[i]
+        mean_turns = turns_sum / n
+        var_turns = max(0.0, turns_sq / n - mean_turns * mean_turns)
+        low, high = wilson_interval(wins, n)
+        results.append({
+            "boss": bosses[i].name,
+            "boss_level": bosses[i].level,
+            "fights": n,
+            "wins": wins,
+            "win_rate": wins / n,
+            "win_rate_ci": (low, high),
+            "mean_turns": mean_turns,
+            "mean_turns_ci": Z_95 * math.sqrt(var_turns / n),
+            "hp_left_hist": hp_hist,
+        })
+    return results
+
+
+# ── Report ────────────────────────────────────────────────────
+
+def format_hp_hist(hist):
+    """Return a compact sparkline of the HP-left histogram."""
+    blocks = " ▁▂▃▄▅▆▇█"
+    peak = max(hist) or 1
+    return "".join(blocks[round(c / peak * (len(blocks) - 1))] for c in hist)
+
+
+def print_report(results, level, policy_name, elapsed):
+    """Print a table of simulation results."""
+    total = sum(r["fights"] for r in results)
+    print(f"\n  Player Lv.{level} | policy: {policy_name} | "
+          f"{total:,} fights in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f}/s)")
+    print(f"  {'Boss':<20} {'Lv':>3} {'Win %':>7} {'95% CI':>15} {'Turns':>12}  HP left 0→100%")
+    print(f"  {'─' * 80}")
+    for r in results:
+        low, high = r["win_rate_ci"]
+        print(
+            f"  {r['boss']:<20} {r['boss_level']:>3} {r['win_rate'] * 100:>6.1f}% "
+            f"{low * 100:>6.1f}–{high * 100:<6.1f}% "
+            f"{r['mean_turns']:>6.1f} ±{r['mean_turns_ci']:<4.1f}  "
+            f"{format_hp_hist(r['hp_left_hist'])}"
+        )
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+
+def main():
+    """Parse arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description="Monte Carlo win-rate simulator.")
+    parser.add_argument("--level", type=int, default=1, help="player level (default: 1)")
+    parser.add_argument("--fights", type=_positive_int, default=10000, help="fights per boss (default: 10000)")
+    parser.add_argument("--policy", default="greedy",
+                        help=f"attack policy: {', '.join(POLICIES)} or module:function")
+    parser.add_argument("--seed", type=int, default=0, help="base RNG seed (default: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--boss", action="append", help="only simulate this boss (repeatable)")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="use the NumPy batch kernel (much faster, needs NumPy)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        results = simulate(args.level, args.fights, args.policy, args.seed, args.workers, args.boss,
+                           vectorized=args.vectorized)
+    except RuntimeError as err:
+        parser.error(str(err))
+    print_report(results, args.level, args.policy, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,700 @@
+"""Optimal-policy solver for one player vs boss matchup.
+
+A battle is a finite Markov decision process: the state is the player's HP,
+energy and sanity, the boss's HP and the status-effect timers on both
+sides, and the actions are the player attacks plus running. This module
+finds the win-maximizing action for every reachable state and the win
+probability from the opening turn, following the rules in engine.py.
+
+Neither HP can go up during a battle, so states are grouped into layers by
+(player HP, boss HP) and solved from the bottom up; value iteration is only
+needed inside a layer, where energy and sanity can cycle. A state is an
+integer, a mixed-radix code of its fields, with radices sized to what
+this matchup can actually reach (energy values the attacks can produce,
+only the effects either side can inflict). Reachable states are found
+layer by layer from the opening turn, highest first, using a bitmap per
+pending layer. Each layer's reached codes, policy and values are kept
+in flat array('i') / array('b') / array('d') buffers, not dicts of
+tuples. Only the codes and the policy, 5 bytes a state, are kept for
+every layer. While solving, values are freed once their layer is more
+than one turn's damage below the current one, so they only take room
+for that band of layers. reachable() raises StateLimitExceeded past
+max_states.
+
+Time is driven by the grid. hp_step / sanity_step round HP and sanity up
+to a coarser grid; with both at 1 the answer is exact, otherwise it is an
+approximation and not a bound either way (rounding the player's HP and
+sanity up helps the player, rounding the boss's HP up hurts). Measured on
+one core, both passes together run at roughly 3-10k states/s:
+
+    Alarm Clock, level 1, steps 10/10      32k states, 3s, 24 MB
+    Alarm Clock, level 1, steps 5/5        227k states, 25s, 29 MB
+    Pop Quiz, level 7, steps 10/10         163k states, 21s, 30 MB
+    Homework Pile, level 1, steps 2/2      2.85M states, 14 min, 87 MB
+
+Exact solves stay out of reach for the real roster. Homework Pile at
+level 1 already has tens of millions of reachable states (extrapolating
+from the grids above), and the 420+ HP
+bosses at their own levels have about 1e9. Memory is no longer the limit
+there, but time is: hours to days in pure Python. Late matchups are
+better measured with simulate.py or batch.py. The CLI uses a 10/10 grid
+unless --exact is given, and stops with an error once max_states is
+exceeded (1M by default, a few minutes).
+Usage:
+
+    python solver.py --level 5 --boss "Pop Quiz"
+    python solver.py --level 1 --boss "Alarm Clock" --hp-step 5 --sanity-step 5
+    python solver.py --level 1 --boss "Alarm Clock" --exact --max-states 30000000
+"""
+
+import argparse
+import heapq
+import time
+from array import array
+from bisect import bisect_left
+
+from attacks import PLAYER_ATTACKS
+from bosses import get_boss
+from engine import CRIT_CHANCE, POISON, RUN_CHANCE, STUN, WEAKEN
+
+WIN = -1
+LOSS = -2
+RUN = "run"
+DEFAULT_GRID = 10                # CLI hp_step / sanity_step unless --exact
+DEFAULT_MAX_STATES = 1_000_000   # fail fast rather than enumerate for hours
+
+# Policy codes stored per state, besides attack indexes
+_NO_CHOICE = -1                  # stunned or already decided: the engine wants None
+
+# Fields of a state tuple. HP and effect timers hold their values; energy,
+# sanity, poison damage and weaken reduction hold indexes into per-solver
+# value tables, so every field's radix is only as large as it needs to be
+(PHP, BHP, ENERGY, SANITY,
+ P_POISON, P_POISON_DMG, P_STUN,
+ B_POISON, B_POISON_DMG, B_STUN, B_WEAKEN, B_WEAKEN_RED) = range(12)
+
+
+class StateLimitExceeded(RuntimeError):
+    """Raised when a solve would enumerate more than max_states states."""
+
+
+def _uniform(low, high):
+    """Return [(value, probability)] for random.randint(low, high)."""
+    p = 1 / (high - low + 1)
+    return [(v, p) for v in range(low, high + 1)]
+
+
+def _add(dist, key, p):
+    """Accumulate probability mass p onto key in dist."""
+    dist[key] = dist.get(key, 0.0) + p
+
+
+def _effects(attacks, name):
+    return [a.status_effect for a in attacks if a.status_effect and a.status_effect["name"] == name]
+
+
+class Solver:
+    """Win-probability solver for a player (at their current stats) vs a boss."""
+
+    def __init__(self, player, boss, player_attacks=PLAYER_ATTACKS, hp_step=1,
+                 sanity_step=1, allow_run=True, tolerance=1e-10, max_states=DEFAULT_MAX_STATES,
+                 keep_values=False):
+        self.player = player
+        self.boss = boss
+        self.attacks = player_attacks
+        self.hp_step = hp_step
+        self.sanity_step = sanity_step
+        self.allow_run = allow_run
+        self.tolerance = tolerance
+        self.max_states = max_states
+        self.keep_values = keep_values
+
+        # Effect fields only get room for effects this matchup can inflict; a
+        # weakened player deals full damage in the rules, so weaken is only
+        # tracked on the boss
+        on_player, on_boss = list(boss.attacks), list(player_attacks)
+        self.p_poison = sorted({se["damage"] for se in _effects(on_player, "poison")}) or [0]
+        self.b_poison = sorted({se["damage"] for se in _effects(on_boss, "poison")}) or [0]
+        self.reductions = sorted({se["reduction"] for se in _effects(on_boss, "weaken")}) or [0.0]
+
+        def timer(attacks, name):
+            return max([se.get("turns", 1) for se in _effects(attacks, name)] + [0]) + 1
+
+        self.energies = self._reachable_energies()
+        self.energy_index = {e: i for i, e in enumerate(self.energies)}
+        self.sanities = sorted({self._q_sanity(v) for v in range(player.max_sanity + 1)})
+        self.sanity_index = {v: i for i, v in enumerate(self.sanities)}
+
+        self.radices = [
+            player.max_hp + 1, boss.max_hp + 1, len(self.energies), len(self.sanities),
+            timer(on_player, "poison"), len(self.p_poison), timer(on_player, "stun"),
+            timer(on_boss, "poison"), len(self.b_poison), timer(on_boss, "stun"),
+            timer(on_boss, "weaken"), len(self.reductions),
+        ]
+        self.mult = [1] * len(self.radices)
+        for i in range(len(self.radices) - 2, -1, -1):
+            self.mult[i] = self.mult[i + 1] * self.radices[i + 1]
+        self.inner = self.mult[BHP]  # states per (player HP, boss HP) layer
+
+        # The most player HP one turn can take: poison, the hardest boss hit
+        # and an existential crisis. Layers further up are never read again.
+        self.max_hp_drop = max(self.p_poison) + max(a.power for a in boss.attacks) + 3 + 20
+
+        self.state_count = 0
+        self._index = {}    # layer -> array of the layer's reached inner indexes, sorted
+        self._policy = {}   # layer -> array of policy codes, aligned with _index
+        self._values = {}   # layer -> array of win probabilities, aligned with _index
+        self._memo = {}
+
+    def _reachable_energies(self):
+        """Every energy value the player can get to from their current energy."""
+        p = self.player
+        found = {p.energy}
+        frontier = [p.energy]
+        while frontier:
+            energy = frontier.pop()
+            for atk in self.attacks:
+                if atk.energy_cost > 0 and energy < atk.energy_cost:
+                    continue
+                nxt = max(0, min(p.max_energy, energy - atk.energy_cost))
+                if nxt not in found:
+                    found.add(nxt)
+                    frontier.append(nxt)
+        return sorted(found)
+
+    # ── State Encoding ────────────────────────────────────────
+
+    def encode(self, state):
+        """Pack a state tuple into one integer."""
+        code = 0
+        for value, radix in zip(state, self.radices):
+            code = code * radix + value
+        return code
+
+    def decode(self, code):
+        """Unpack an integer back into a state tuple."""
+        out = []
+        for radix in reversed(self.radices):
+            code, value = divmod(code, radix)
+            out.append(value)
+        return tuple(reversed(out))
+
+    def start_state(self):
+        """Encoded state at the opening turn of the battle."""
+        p = self.player
+        return self.encode((self._q_hp(p.hp, p.max_hp), self._q_hp(self.boss.hp, self.boss.max_hp),
+                            self.energy_index[p.energy], self.sanity_index[self._q_sanity(p.sanity)],
+                            0, 0, 0, 0, 0, 0, 0, 0))
+
+    def state_of(self, fight):
+        """Encoded state of a live engine.Battle at the start of its next turn.
+
+        Raises KeyError if the battle is somewhere this solver can't reach.
+        """
+        p, b = fight.player, fight.boss
+        fields = [self._q_hp(p.hp, p.max_hp), self._q_hp(b.hp, b.max_hp),
+                  self.energy_index[p.energy], self.sanity_index[self._q_sanity(p.sanity)],
+                  0, 0, 0, 0, 0, 0, 0, 0]
+        pe, be = fight.player_effects, fight.boss_effects
+        if pe.turns[POISON]:
+            fields[P_POISON] = pe.turns[POISON]
+            fields[P_POISON_DMG] = self.p_poison.index(pe.magnitude[POISON])
+        fields[P_STUN] = pe.turns[STUN]
+        if be.turns[POISON]:
+            fields[B_POISON] = be.turns[POISON]
+            fields[B_POISON_DMG] = self.b_poison.index(be.magnitude[POISON])
+        fields[B_STUN] = be.turns[STUN]
+        if be.turns[WEAKEN]:
+            fields[B_WEAKEN] = be.turns[WEAKEN]
+            fields[B_WEAKEN_RED] = self.reductions.index(be.magnitude[WEAKEN])
+        if any(f >= r for f, r in zip(fields, self.radices)):
+            raise KeyError("Battle state is outside this solver's state space")
+        return self.encode(tuple(fields))
+
+    def _q_hp(self, hp, cap):
+        """Round HP up onto the solver's grid (never rounds a living combatant to 0)."""
+        step = self.hp_step
+        return hp if step == 1 else min(-(-hp // step) * step, cap)
+
+    def _q_sanity(self, sanity):
+        """Round sanity up onto the solver's grid."""
+        step = self.sanity_step
+        return sanity if step == 1 else min(-(-sanity // step) * step, self.player.max_sanity)
+
+    # ── Transitions ───────────────────────────────────────────
+    # Transitions work directly on encoded states: changing one field by d
+    # changes the code by d * mult[field]. A turn is split in two stages.
+    # The player's action leads to a "mid" state (keyed by code * 2 + 1 if
+    # the boss is stunned this turn); the boss's turn and the sanity check
+    # lead from a mid state to the next turn. Mid states are shared between
+    # actions and between states, which keeps the branching factor small.
+
+    def actions(self, state):
+        """Return the legal actions in a state (attack indexes and maybe "run")."""
+        energy, sanity = self.energies[state[ENERGY]], self.sanities[state[SANITY]]
+        acts = [
+            i for i, atk in enumerate(self.attacks)
+            if not (atk.energy_cost > 0 and energy < atk.energy_cost)
+            and not (atk.sanity_cost > 0 and sanity < atk.sanity_cost)
+        ]
+        if self.allow_run:
+            acts.append(RUN)
+        return acts
+
+    def _effect_delta(self, s, se, on_player):
+        """Return the code change from applying a status effect to state s."""
+        m = self.mult
+        turns = se.get("turns", 1)
+        if se["name"] == "poison":
+            t, d = (P_POISON, P_POISON_DMG) if on_player else (B_POISON, B_POISON_DMG)
+            delta = (turns - s[t]) * m[t]
+            if s[t] == 0:
+                damages = self.p_poison if on_player else self.b_poison
+                delta += (damages.index(se["damage"]) - s[d]) * m[d]
+            return delta
+        if se["name"] == "stun":
+            t = P_STUN if on_player else B_STUN
+            return (turns - s[t]) * m[t]
+        if se["name"] == "weaken" and not on_player:
+            delta = (turns - s[B_WEAKEN]) * m[B_WEAKEN]
+            if s[B_WEAKEN] == 0:
+                delta += (self.reductions.index(se["reduction"]) - s[B_WEAKEN_RED]) * m[B_WEAKEN_RED]
+            return delta
+        return 0
+
+    def _tick(self, state):
+        """Start-of-turn effect processing. Returns (state list, player_stunned, boss_stunned)."""
+        s = list(state)
+        if s[P_POISON]:
+            s[PHP] = self._q_hp(max(0, s[PHP] - self.p_poison[s[P_POISON_DMG]]), self.player.max_hp)
+        if s[B_POISON]:
+            s[BHP] = self._q_hp(max(0, s[BHP] - self.b_poison[s[B_POISON_DMG]]), self.boss.max_hp)
+        player_stunned = s[P_STUN] > 0
+        boss_stunned = s[B_STUN] > 0
+        for t, extra in ((P_POISON, P_POISON_DMG), (P_STUN, None), (B_POISON, B_POISON_DMG),
+                         (B_STUN, None), (B_WEAKEN, B_WEAKEN_RED)):
+            if s[t]:
+                s[t] -= 1
+                if s[t] == 0 and extra is not None:
+                    s[extra] = 0  # keep expired effects canonical
+        return s, player_stunned, boss_stunned
+
+    def _boss_hp_dist(self, action, bhp):
+        """[(boss HP after a landed player attack, probability)], hit chance included."""
+        key = (action, bhp)
+        if key not in self._memo:
+            atk = self.attacks[action]
+            dist = {}
+            for roll, p_roll in _uniform(-5, 5):
+                base = max(1, atk.power + roll)
+                for damage, p_crit in ((base * 2, CRIT_CHANCE / 100), (base, 1 - CRIT_CHANCE / 100)):
+                    _add(dist, self._q_hp(max(0, bhp - damage), self.boss.max_hp),
+                         atk.accuracy / 100 * p_roll * p_crit)
+            self._memo[key] = list(dist.items())
+        return self._memo[key]
+
+    def _player_hp_dist(self, boss_action, php, reduction):
+        """[(player HP after a landed boss attack, probability)], hit chance included."""
+        key = ("boss", boss_action, php, reduction)
+        if key not in self._memo:
+            atk = self.boss.attacks[boss_action]
+            dist = {}
+            for roll, p_roll in _uniform(-3, 3):
+                damage = max(1, atk.power + roll)
+                if reduction:
+                    damage = int(damage * (1.0 - reduction))
+                _add(dist, self._q_hp(max(0, php - damage), self.player.max_hp),
+                     atk.accuracy / 100 * p_roll)
+            self._memo[key] = list(dist.items())
+        return self._memo[key]
+
+    def _sanity_dist(self, sanity):
+        """[(sanity index after a boss's 2-8 drain, probability)] for a sanity index."""
+        key = ("drain", sanity)
+        if key not in self._memo:
+            dist = {}
+            value = self.sanities[sanity]
+            for drain, p in _uniform(2, 8):
+                _add(dist, self.sanity_index[self._q_sanity(max(0, value - drain))], p)
+            self._memo[key] = list(dist.items())
+        return self._memo[key]
+
+    def _crisis_dist(self, php):
+        """[(player HP after existential-crisis damage, probability)]."""
+        key = ("crisis", php)
+        if key not in self._memo:
+            dist = {}
+            for extra, p in _uniform(10, 20):
+                _add(dist, self._q_hp(max(0, php - extra), self.player.max_hp), p)
+            self._memo[key] = list(dist.items())
+        return self._memo[key]
+
+    def player_stage(self, code):
+        """Return {action: [(mid key or WIN/LOSS, probability)]} for an encoded state."""
+        state = self.decode(code)
+        s, player_stunned, boss_stunned = self._tick(state)
+        if s[PHP] == 0:
+            return {None: [(LOSS, 1.0)]}
+        if s[BHP] == 0:
+            return {None: [(WIN, 1.0)]}
+
+        m = self.mult
+        c = self.encode(s)
+        flag = 1 if boss_stunned else 0
+        if player_stunned:
+            # A stunned player's choice doesn't matter; the engine ignores it
+            return {None: [(c * 2 + flag, 1.0)]}
+
+        result = {}
+        for action in self.actions(state):
+            if action == RUN:
+                # Escaping isn't a win
+                result[action] = [(LOSS, RUN_CHANCE / 100), (c * 2 + flag, 1 - RUN_CHANCE / 100)]
+                continue
+
+            atk = self.attacks[action]
+            energy = self.energy_index[max(0, min(self.player.max_energy,
+                                                  self.energies[s[ENERGY]] - atk.energy_cost))]
+            sanity = self.sanity_index[self._q_sanity(max(0, min(
+                self.player.max_sanity, self.sanities[s[SANITY]] - atk.sanity_cost)))]
+            c1 = c + (energy - s[ENERGY]) * m[ENERGY] + (sanity - s[SANITY]) * m[SANITY]
+            if atk.power == 0:
+                result[action] = [(c1 * 2 + flag, 1.0)]
+                continue
+
+            dist = {}
+            if atk.accuracy < 100:
+                _add(dist, c1 * 2 + flag, 1 - atk.accuracy / 100)
+            se = atk.status_effect
+            p_effect = se["chance"] / 100 if se else 0.0
+            effect = self._effect_delta(s, se, on_player=False) if se else 0
+            for bhp, p in self._boss_hp_dist(action, s[BHP]):
+                if bhp == 0:
+                    _add(dist, WIN, p)
+                    continue
+                c2 = c1 + (bhp - s[BHP]) * m[BHP]
+                if p_effect:
+                    _add(dist, (c2 + effect) * 2 + flag, p * p_effect)
+                if p_effect < 1:
+                    _add(dist, c2 * 2 + flag, p * (1 - p_effect))
+            result[action] = list(dist.items())
+        return result
+
+    def boss_stage(self, mid):
+        """Return [(next encoded state or LOSS, probability)] for a mid key."""
+        c, boss_stunned = divmod(mid, 2)
+        s = self.decode(c)
+        m = self.mult
+        out = {}
+
+        def emit(code, php, sanity, p):
+            # Existential crisis when sanity hits 0 (always index 0)
+            if sanity > 0:
+                _add(out, code, p)
+                return
+            for php2, q in self._crisis_dist(php):
+                _add(out, LOSS if php2 == 0 else code + (php2 - php) * m[PHP], p * q)
+
+        if boss_stunned:
+            emit(c, s[PHP], s[SANITY], 1.0)
+            return list(out.items())
+
+        reduction = self.reductions[s[B_WEAKEN_RED]] if s[B_WEAKEN] else 0.0
+        p_atk = 1 / len(self.boss.attacks)
+        for j, atk in enumerate(self.boss.attacks):
+            if atk.accuracy < 100:
+                emit(c, s[PHP], s[SANITY], p_atk * (1 - atk.accuracy / 100))
+            se = atk.status_effect
+            p_effect = se["chance"] / 100 if se else 0.0
+            effect = self._effect_delta(s, se, on_player=True) if se else 0
+            for php, p in self._player_hp_dist(j, s[PHP], reduction):
+                if php == 0:
+                    _add(out, LOSS, p_atk * p)
+                    continue
+                c1 = c + (php - s[PHP]) * m[PHP]
+                for sanity, q in self._sanity_dist(s[SANITY]):
+                    c2 = c1 + (sanity - s[SANITY]) * m[SANITY]
+                    pq = p_atk * p * q
+                    if p_effect:
+                        emit(c2 + effect, php, sanity, pq * p_effect)
+                    if p_effect < 1:
+                        emit(c2, php, sanity, pq * (1 - p_effect))
+        return list(out.items())
+
+    # ── Solving ───────────────────────────────────────────────
+    # Neither HP can go up, so every successor of a state is in its own
+    # (player HP, boss HP) layer or in one that comes earlier in layer code
+    # order (player HP major). Layers are enumerated from the top down and
+    # solved from the bottom up; per layer only the sorted inner indexes of
+    # the reached states, their policy codes and (while later layers can
+    # still read them) their values are kept, in flat arrays.
+
+    def _layer_php(self, layer):
+        return layer // self.radices[BHP]
+
+    def reachable(self):
+        """Enumerate every state reachable from the opening turn.
+
+        Returns {layer: array of reached inner indexes, sorted}. Raises
+        StateLimitExceeded past max_states.
+        """
+        inner = self.inner
+        pending = {}   # layer -> bytearray marking the states found in it so far
+        heap = []      # pending layers, highest first
+
+        def mark(code):
+            layer, i = divmod(code, inner)
+            bits = pending.get(layer)
+            if bits is None:
+                bits = pending[layer] = bytearray(inner)
+                heapq.heappush(heap, -layer)
+            bits[i] = 1
+
+        mark(self.start_state())
+        layers = {}
+        seen_mids = {}  # player HP of a mid -> mids already expanded
+        total = 0
+        while heap:
+            layer = -heapq.heappop(heap)
+            bits = pending.pop(layer)
+            base = layer * inner
+            php = self._layer_php(layer)
+            # Nothing from here down produces mids above this player HP
+            for row in [r for r in seen_mids if r > php]:
+                del seen_mids[row]
+
+            work = []
+            i = bits.find(1)
+            while i >= 0:
+                work.append(i)
+                i = bits.find(1, i + 1)
+            while work:
+                for edges in self.player_stage(base + work.pop()).values():
+                    for mid, _ in edges:
+                        if mid < 0:
+                            continue
+                        row = mid // 2 // self.mult[PHP]
+                        seen = seen_mids.setdefault(row, set())
+                        if mid in seen:
+                            continue
+                        seen.add(mid)
+                        for nxt, _ in self.boss_stage(mid):
+                            if nxt < 0:
+                                continue
+                            if nxt // inner == layer:
+                                ni = nxt - base
+                                if not bits[ni]:
+                                    bits[ni] = 1
+                                    work.append(ni)
+                            else:
+                                mark(nxt)
+
+            found = array("i")
+            i = bits.find(1)
+            while i >= 0:
+                found.append(i)
+                i = bits.find(1, i + 1)
+            layers[layer] = found
+            total += len(found)
+            if total > self.max_states:
+                raise StateLimitExceeded(
+                    f"More than {self.max_states:,} reachable states; "
+                    "raise hp_step/sanity_step or max_states (see the module docstring)"
+                )
+            self._memo.clear()
+        return layers
+
+    def _value(self, code):
+        """Win probability of a solved state in an earlier layer."""
+        if code < 0:
+            return 1.0 if code == WIN else 0.0
+        layer, i = divmod(code, self.inner)
+        return self._values[layer][bisect_left(self._index[layer], i)]
+
+    def solve(self):
+        """Compute the optimal policy for every reachable state. Returns the win probability."""
+        self._index = index = self.reachable()
+        self.state_count = sum(len(found) for found in index.values())
+        values = self._values
+        inner = self.inner
+        n_attacks = len(self.attacks)
+        mid_values = {}  # player HP of a mid -> {mid: value}
+
+        for layer in sorted(index):
+            found = index[layer]
+            base = layer * inner
+            php = self._layer_php(layer)
+            if not self.keep_values:
+                # Layers more than one turn's damage below can't be read again
+                for old in [k for k in values if self._layer_php(k) < php - self.max_hp_drop]:
+                    del values[old]
+                # Mids are only shared with states up to one poison tick above them
+                for row in [r for r in mid_values if r < php - max(self.p_poison)]:
+                    del mid_values[row]
+
+            position = {i: pos for pos, i in enumerate(found)}
+            current = [0.0] * len(found)
+
+            # Value iteration is only needed for mids that lead back into the
+            # layer. Each of those is split into a constant part (successors in
+            # finished layers) and its terms on this layer's states, and each
+            # action into a constant part and its terms on looping mids, so a
+            # sweep only touches the probability mass that actually cycles.
+            stages = [self.player_stage(base + i) for i in found]
+            known = {WIN: 1.0, LOSS: 0.0}
+            loop_slot = {}    # looping mid -> slot in loop_const / loop_terms
+            loop_const = []
+            loop_terms = []   # per looping mid: [(state position, p)]
+            loop_mids = []
+            for stage in stages:
+                for edges in stage.values():
+                    for mid, _ in edges:
+                        if mid in known or mid in loop_slot:
+                            continue
+                        row = mid // 2 // self.mult[PHP]
+                        cached = mid_values.get(row, {}).get(mid)
+                        if cached is not None:
+                            known[mid] = cached
+                            continue
+                        const, terms = 0.0, []
+                        for nxt, p in self.boss_stage(mid):
+                            if nxt >= 0 and nxt // inner == layer:
+                                terms.append((position[nxt - base], p))
+                            else:
+                                const += p * self._value(nxt)
+                        if terms:
+                            loop_slot[mid] = len(loop_mids)
+                            loop_mids.append(mid)
+                            loop_const.append(const)
+                            loop_terms.append(terms)
+                        else:
+                            known[mid] = const
+
+            # Per state: [(action, constant part, [(loop slot, p)])]
+            choices = []
+            for stage in stages:
+                options = []
+                for action, edges in stage.items():
+                    const, terms = 0.0, []
+                    for mid, p in edges:
+                        slot = loop_slot.get(mid)
+                        if slot is None:
+                            const += p * known[mid]
+                        else:
+                            terms.append((slot, p))
+                    options.append((action, const, terms))
+                choices.append(options)
+
+            policy = array("b", [_NO_CHOICE]) * len(found)
+            loop_values = list(loop_const)
+            while True:
+                for slot, terms in enumerate(loop_terms):
+                    loop_values[slot] = loop_const[slot] + sum(p * current[pos] for pos, p in terms)
+                delta = 0.0
+                for pos, options in enumerate(choices):
+                    best_action, best = None, -1.0
+                    for action, const, terms in options:
+                        v = const + sum(p * loop_values[slot] for slot, p in terms) if terms else const
+                        if v > best:
+                            best_action, best = action, v
+                    delta = max(delta, abs(best - current[pos]))
+                    current[pos] = best
+                    policy[pos] = (_NO_CHOICE if best_action is None
+                                   else n_attacks if best_action == RUN else best_action)
+                if delta < self.tolerance:
+                    break
+            for slot, mid in enumerate(loop_mids):
+                known[mid] = loop_values[slot]
+
+            for mid, v in known.items():
+                if mid >= 0:
+                    mid_values.setdefault(mid // 2 // self.mult[PHP], {})[mid] = v
+            values[layer] = array("d", current)
+            self._policy[layer] = policy
+            self._memo.clear()
+
+        return self._value(self.start_state())
+
+    def _position(self, code):
+        layer, i = divmod(code, self.inner)
+        found = self._index.get(layer)
+        pos = bisect_left(found, i) if found is not None else -1
+        if found is None or pos == len(found) or found[pos] != i:
+            raise KeyError("State was not reached while solving; solve() first")
+        return layer, pos
+
+    def action_at(self, code):
+        """Return the optimal action in a solved encoded state."""
+        layer, pos = self._position(code)
+        action = self._policy[layer][pos]
+        return None if action == _NO_CHOICE else RUN if action == len(self.attacks) else action
+
+    def best_action(self, fight):
+        """Return the optimal action for a live battle (for hints and policies)."""
+        return self.action_at(self.state_of(fight))
+
+    def as_policy(self):
+        """Return a simulate.py-style policy that plays optimally."""
+        def policy(fight, rng):
+            return self.best_action(fight)
+        return policy
+
+    def win_probability(self, fight):
+        """Return the optimal win probability from a live battle's current state.
+
+        Needs keep_values=True; otherwise the values of lower layers are
+        dropped as the solve moves past them.
+        """
+        if not self.keep_values:
+            raise ValueError("win_probability() needs a Solver built with keep_values=True")
+        layer, pos = self._position(self.state_of(fight))
+        return self._values[layer][pos]
+
+
+def main():
+    """Solve a matchup and print its win probability and opening move."""
+    from simulate import player_at_level
+
+    parser = argparse.ArgumentParser(description="Optimal-policy solver for one matchup.")
+    parser.add_argument("--level", type=int, default=1, help="player level (default: 1)")
+    parser.add_argument("--boss", required=True, help="boss name")
+    parser.add_argument("--hp-step", type=int, default=DEFAULT_GRID,
+                        help=f"HP grid size (default: {DEFAULT_GRID})")
+    parser.add_argument("--sanity-step", type=int, default=DEFAULT_GRID,
+                        help=f"sanity grid size (default: {DEFAULT_GRID})")
+    parser.add_argument("--exact", action="store_true",
+                        help="solve without rounding (steps of 1); only feasible for tiny matchups")
+    parser.add_argument("--max-states", type=int, default=DEFAULT_MAX_STATES,
+                        help=f"give up past this many states (default: {DEFAULT_MAX_STATES:,})")
+    args = parser.parse_args()
+
+    boss = get_boss(args.boss)
+    if boss is None:
+        parser.error(f"Unknown boss: {args.boss}")
+    hp_step, sanity_step = (1, 1) if args.exact else (args.hp_step, args.sanity_step)
+    if hp_step < 1 or sanity_step < 1:
+        parser.error("grid steps must be at least 1")
+
+    solver = Solver(player_at_level(args.level), boss, hp_step=hp_step,
+                    sanity_step=sanity_step, max_states=args.max_states)
+    start = time.perf_counter()
+    try:
+        win = solver.solve()
+    except StateLimitExceeded as e:
+        parser.exit(1, f"{e}\n")
+    elapsed = time.perf_counter() - start
+
+    opening = solver.action_at(solver.start_state())
+    name = "Run" if opening == RUN else solver.attacks[opening].name
+    if hp_step == sanity_step == 1:
+        exact = "exact"
+    else:
+        exact = f"approximate, HP/sanity grid {hp_step}/{sanity_step}"
+    print(f"\n  Player Lv.{args.level} vs {boss.name}: optimal win probability "
+          f"{win * 100:.2f}% ({exact})")
+    print(f"  Opening move: {name}")
+    print(f"  {solver.state_count:,} states solved in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
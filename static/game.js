@@ -9,6 +9,42 @@
     var isSurvival = !!waveBadge;
     var actionUrl = isSurvival ? "/survival/action" : "/battle/action";
 
+    // Under the ASGI server (asgi.py) actions go over a WebSocket and each
+    // turn is pushed as it is played; otherwise they are posted as JSON.
+    var socket = null;
+    var streaming = false;
+    if (window.WebSocket) {
+        var wsUrl = (location.protocol === "https:" ? "wss://" : "ws://") + location.host +
+            (isSurvival ? "/survival/ws" : "/battle/ws");
+        try {
+            var ws = new WebSocket(wsUrl);
+            ws.onopen = function () { socket = ws; };
+            ws.onclose = function () { socket = null; };
+            ws.onerror = function () { socket = null; };
+            ws.onmessage = function (msg) { onSocketMessage(JSON.parse(msg.data)); };
+        } catch (e) {
+            socket = null;
+        }
+    }
+
+    function onSocketMessage(data) {
+        if (data.type === "turn") {
+            if (!streaming) {
+                resetModal();
+                streaming = true;
+            }
+            updateBars(data);
+            appendEvents(data.events);
+        } else if (data.type === "done") {
+            if (!streaming) resetModal();
+            streaming = false;
+            finishModal(data);
+        } else if (data.type === "error") {
+            alert(data.error);
+            location.reload();
+        }
+    }
+
     // Attach click handlers to attack buttons
     document.querySelectorAll(".attack-btn").forEach(function (btn) {
         btn.addEventListener("click", function () {
@@ -25,14 +61,55 @@
         disableAllButtons();
     });
 
+    // Auto Battle: send a whole plan and play it out in one request
+    document.getElementById("auto-btn").addEventListener("click", function () {
+        sendAction(buildAutoPlan(), actionUrl + "s");
+        disableAllButtons();
+    });
+
     function disableAllButtons() {
         document.querySelectorAll(".attack-btn, .run-btn").forEach(function (b) {
             b.disabled = true;
         });
     }
 
-    function sendAction(payload) {
-        fetch(actionUrl, {
+    // Heal when sanity runs low, hit with the best attack while energy
+    // lasts, and rest when it runs out.
+    function buildAutoPlan() {
+        var attacks = [];
+        document.querySelectorAll(".attack-btn").forEach(function (btn) {
+            attacks.push({
+                index: parseInt(btn.dataset.index, 10),
+                energy: parseInt(btn.dataset.energyCost, 10),
+                sanity: parseInt(btn.dataset.sanityCost, 10),
+                expected: parseInt(btn.dataset.power, 10) * parseInt(btn.dataset.accuracy, 10),
+            });
+        });
+        function best(score) {
+            return attacks.reduce(function (a, b) { return score(b) > score(a) ? b : a; });
+        }
+        var main = best(function (a) { return a.sanity > 0 ? -1 : a.expected; });
+        var heal = best(function (a) { return -a.sanity; });
+        var rest = best(function (a) { return -a.energy; });
+
+        var steps = [];
+        if (heal.sanity < 0) {
+            steps.push({ action_type: "attack", attack_index: heal.index, repeat: 5,
+                         until: { sanity_at_least: 40, energy_below: Math.max(heal.energy, 0) } });
+        }
+        steps.push({ action_type: "attack", attack_index: main.index, repeat: 99,
+                     until: { energy_below: Math.max(main.energy, 1), sanity_below: 25 } });
+        steps.push({ action_type: "attack", attack_index: rest.index, repeat: 3,
+                     until: { sanity_below: 10 } });
+        return { steps: steps, loop: true, max_turns: 100 };
+    }
+
+    function sendAction(payload, url) {
+        if (socket && socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify(url ? { plan: payload } : payload));
+            return;
+        }
+        fetch(url || actionUrl, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify(payload),
@@ -107,15 +184,29 @@
     }
 
     function showModal(data) {
+        resetModal();
+        appendEvents(data.events);
+        finishModal(data);
+    }
+
+    function resetModal() {
         modalEvents.innerHTML = "";
+        modalBtn.disabled = true;
+        overlay.classList.add("active");
+    }
 
-        data.events.forEach(function (ev) {
+    function appendEvents(events) {
+        events.forEach(function (ev) {
             var div = document.createElement("div");
             div.className = "event event-" + ev.type;
             div.textContent = ev.text;
             modalEvents.appendChild(div);
         });
+        modalEvents.scrollTop = modalEvents.scrollHeight;
+    }
 
+    function finishModal(data) {
+        modalBtn.disabled = false;
         if (data.battle_over) {
             battleOver = true;
 
@@ -159,8 +250,6 @@
         } else {
             modalBtn.textContent = "Continue";
         }
-
-        overlay.classList.add("active");
     }
 
     modalBtn.addEventListener("click", function () {
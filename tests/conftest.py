@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep saves and the event log out of data/ and write saves synchronously
+_scratch = tempfile.mkdtemp(prefix="boss_battle_tests_")
+os.environ.setdefault("BOSS_BATTLE_SAVES", f"sqlite:///{_scratch}/saves.db")
+os.environ.setdefault("BOSS_BATTLE_EVENT_LOG", "off")
+os.environ.setdefault("BOSS_BATTLE_SAVE_FLUSH", "0")
+os.environ.setdefault("BOSS_BATTLE_STORE", "memory")
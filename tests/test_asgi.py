@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+import app as web
+import asgi
+from battle_store import make_store
+
+
+@pytest.fixture
+def sid(tmp_path, monkeypatch):
+    # A pickling store, so only states that are put() back survive
+    monkeypatch.setattr(web, "store", make_store(f"sqlite:///{tmp_path}/battles.db"))
+    client = web.app.test_client()
+    client.post("/start", data={"name": "Socket"})
+    client.post("/battle/start", data={"boss_index": "15"})
+    with client.session_transaction() as session:
+        return session["sid"]
+
+
+def _talk(sid, *texts):
+    """Run a BattleSocket over some client messages; return what it sent back."""
+    sent = []
+    incoming = [{"type": "websocket.receive", "text": t} for t in texts]
+    incoming.append({"type": "websocket.disconnect"})
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(json.loads(message["text"]))
+
+    asyncio.run(asgi.BattleSocket(sid, False, send).run(receive))
+    return sent
+
+
+def test_non_object_messages_are_rejected(sid):
+    sent = _talk(sid, "[1, 2]", '"attack"', "3")
+    assert [m["type"] for m in sent] == ["state", "error", "error", "error"]
+    assert sent[1]["error"] == "Messages must be JSON objects"
+
+
+def test_a_plan_that_fails_part_way_keeps_its_turns(sid, monkeypatch):
+    play_turn = web.play_turn
+    calls = []
+
+    def flaky(state, action):
+        calls.append(action)
+        if len(calls) == 3:
+            raise RuntimeError("boom")
+        return play_turn(state, action)
+
+    monkeypatch.setattr(web, "play_turn", flaky)
+    plan = {"plan": {"steps": [{"action_type": "attack", "attack_index": 0, "repeat": 5}]}}
+    sent = _talk(sid, json.dumps(plan))
+
+    assert [m["type"] for m in sent] == ["state", "turn", "turn", "error"]
+    assert sent[-1]["error"] == "Server error: RuntimeError"
+    assert web.store.get(sid).fight.turn == sent[0]["turn"] + 2
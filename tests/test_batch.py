@@ -0,0 +1,39 @@
+"""The NumPy batch kernel must play the same game as engine.Battle.
+
+The two use different random streams, so they are compared statistically:
+for a few bosses and policies, the win rates have to agree within their
+Wilson intervals and the mean turn counts within their 95% intervals.
+"""
+
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from simulate import Z_95, run_chunk, run_chunk_vectorized, wilson_interval  # noqa: E402
+
+SCALAR_FIGHTS = 2000
+VECTOR_FIGHTS = 20000
+
+
+def _stats(output):
+    _, n, wins, turns_sum, turns_sq, _ = output
+    mean = turns_sum / n
+    ci = Z_95 * math.sqrt(max(0.0, turns_sq / n - mean * mean) / n)
+    return wilson_interval(wins, n), mean, ci
+
+
+@pytest.mark.parametrize("boss_index,policy", [
+    (7, "greedy"),   # Monday Morning II, about even
+    (5, "random"),   # Procrastination, mostly lost
+    (9, "study"),    # Group Project, mostly lost
+])
+def test_batch_matches_engine(boss_index, policy):
+    scalar = run_chunk((boss_index, 1, policy, "scalar", SCALAR_FIGHTS))
+    vector = run_chunk_vectorized((boss_index, 1, policy, "vector", VECTOR_FIGHTS))
+
+    (s_low, s_high), s_turns, s_ci = _stats(scalar)
+    (v_low, v_high), v_turns, v_ci = _stats(vector)
+    assert s_low <= v_high and v_low <= s_high, "win rates disagree"
+    assert abs(s_turns - v_turns) <= s_ci + v_ci, "mean turns disagree"
@@ -0,0 +1,51 @@
+import threading
+
+import app as web
+from battle_store import SQLiteStore, WebState, make_store
+from player import Player
+
+
+def test_sqlite_store_purges_expired_rows_as_it_goes(tmp_path):
+    store = SQLiteStore(str(tmp_path / "battles.db"), ttl=-1, purge_every=3)
+    for i in range(2):
+        store.put(f"old{i}", WebState(Player("Old")))
+    count = store._conn().execute("SELECT COUNT(*) FROM battles").fetchone()[0]
+    assert count == 2
+
+    store.ttl = 60
+    store.put("live", WebState(Player("Live")))  # third put sweeps
+    ids = [row[0] for row in store._conn().execute("SELECT id FROM battles")]
+    assert ids == ["live"]
+    assert store.get("live").player.name == "Live"
+
+
+def test_make_store_reads_purge_interval(tmp_path):
+    store = make_store(f"sqlite:///{tmp_path}/battles.db?purge=0")
+    assert store.purge_every == 0
+
+
+def test_requests_for_one_session_take_turns():
+    client = web.app.test_client()
+    client.post("/start", data={"name": "Locked"})
+    client.post("/battle/start", data={"boss_index": "15"})
+    with client.session_transaction() as session:
+        sid = session["sid"]
+    turn = web.store.get(sid).fight.turn
+
+    replies = []
+    worker = threading.Thread(target=lambda: replies.append(client.post(
+        "/battle/action", json={"action_type": "attack", "attack_index": 0})))
+    with web.store.lock(sid):
+        worker.start()
+        worker.join(0.2)
+        # The action waits for the lock, so the battle can't change under us
+        assert worker.is_alive() and web.store.get(sid).fight.turn == turn
+    worker.join(5)
+    assert replies[0].status_code == 200 and web.store.get(sid).fight.turn == turn + 1
+
+
+def test_session_locks_are_shared_by_id():
+    store = make_store("memory")
+    assert store.lock("a") is store.lock("a")
+    with store.lock("a"), store.lock("a"):  # re-entrant
+        pass
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import app as web
+import engine
+from attacks import get_player_attacks
+from bosses import get_boss_templates
+from engine import Battle, EffectTable, survival_wave
+from player import Player
+
+
+def _battle():
+    player = Player("Engine")
+    player.restore_for_battle()
+    return Battle(player, get_boss_templates()[0].spawn(), get_player_attacks(), seed=1)
+
+
+@pytest.mark.parametrize("make", [
+    _battle,
+    EffectTable,
+    lambda: Player("Engine"),
+    lambda: get_boss_templates()[0],
+    lambda: get_boss_templates()[0].spawn(),
+    lambda: get_player_attacks()[0],
+    lambda: get_player_attacks()[0].spawn(),
+])
+def test_hot_objects_have_no_instance_dict(make):
+    # Every live battle holds these; a __dict__ on any of them roughly
+    # doubles its size (see bench_memory.py)
+    assert not hasattr(make(), "__dict__")
+
+
+def _run(seed, waves):
+    """(boss, boss HP, battle seed) for the first waves of a survival run."""
+    player = Player("Survivor")
+    rng = random.Random(seed)
+    picks = []
+    for wave in range(1, waves + 1):
+        fight = survival_wave(get_boss_templates(), wave, player, get_player_attacks(), rng)
+        picks.append((fight.boss.name, fight.boss.max_hp, fight.seed))
+        rng = fight.rng
+    return picks
+
+
+def test_survival_run_follows_from_its_seed():
+    assert _run(7, 5) == _run(7, 5)
+    assert _run(7, 5) != _run(8, 5)
+
+
+def test_web_survival_draws_the_first_boss_from_the_run_seed(monkeypatch):
+    monkeypatch.setattr(engine, "new_seed", lambda: 7)
+    client = web.app.test_client()
+    client.post("/start", data={"name": "Survivor"})
+    client.post("/survival/start")
+    with client.session_transaction() as session:
+        fight = web.store.get(session["sid"]).fight
+    assert (fight.boss.name, fight.boss.max_hp, fight.seed) == _run(7, 1)[0]
+
+
+def test_stunned_player_skips_the_turn():
+    fight = _battle()
+    fight.player_effects.turns[engine.STUN] = 1
+    events = fight.step(None)
+    kinds = [e["type"] for e in events]
+    assert {"type": "effect_stun", "text": "Engine is stunned and can't act!"} in events
+    assert kinds.index("effect_stun") < kinds.index("stun_skip")
+    assert "player_attack" not in kinds
+
+
+def test_stunned_boss_skips_the_turn():
+    fight = _battle()
+    fight.boss.hp = fight.boss.max_hp = 10 ** 6
+    fight.boss_effects.turns[engine.STUN] = 1
+    events = fight.step(0)
+    assert {"type": "effect_stun", "text": f"{fight.boss.name} is stunned and can't act!"} in events
+    assert {"type": "stun_skip", "text": f"{fight.boss.name} is stunned! Turn skipped!"} in events
+    assert "boss_attack" not in [e["type"] for e in events]
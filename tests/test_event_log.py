@@ -0,0 +1,85 @@
+import os
+import random
+
+import pytest
+
+from attacks import get_player_attacks
+from bosses import get_boss_templates
+from engine import Battle
+from event_log import EventLog
+from player import Player
+from simulate import greedy_policy
+
+
+def _battle(log, name, seed, turns=None):
+    """Play a logged battle, to the end or for a number of turns."""
+    player = Player(name)
+    fight = Battle(player, get_boss_templates()[-1].spawn(), get_player_attacks(), seed=seed)
+    log.begin(fight)
+    rng = random.Random(seed)
+    while not fight.over and turns != 0:
+        turn = fight.turn
+        action = None if fight.player_stunned() else greedy_policy(fight, rng)
+        log.record_turn(fight, turn, action, fight.step(action))
+        turns = None if turns is None else turns - 1
+    return fight
+
+
+@pytest.fixture
+def log(tmp_path):
+    return EventLog(str(tmp_path / "events.log"))
+
+
+def test_compact_folds_finished_battles_and_keeps_open_ones(log):
+    _battle(log, "Ada", 1)
+    _battle(log, "Ada", 2)
+    open_fight = _battle(log, "Bo", 3, turns=1)
+    assert log.summaries()["Ada"]["battles"] == 2
+
+    assert log.compact() == 2
+    assert list(log.open_battles()) == [open_fight.log_id]
+    assert log.summaries()["Ada"]["battles"] == 2
+
+
+def test_a_replaced_log_is_still_counted(log):
+    _battle(log, "Ada", 1)
+    log.compact()
+    os.remove(log.path)  # rotated away; the new log has no gen record
+    _battle(log, "Ada", 2)
+    assert log.summaries()["Ada"]["battles"] == 2
+    log.compact()
+    assert log.summaries()["Ada"]["battles"] == 2
+
+
+def test_compaction_that_dies_before_the_swap_does_not_double_count(log, monkeypatch):
+    _battle(log, "Ada", 1)
+
+    def crash(src, dst):
+        raise OSError("killed")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        log.compact()
+    monkeypatch.undo()
+
+    assert log.summaries()["Ada"]["battles"] == 1
+    log.compact()
+    assert log.summaries()["Ada"]["battles"] == 1
+
+
+def test_resume_continues_an_interrupted_battle(log):
+    fight = _battle(log, "Cy", 5, turns=3)
+    resumed = log.resume(fight.log_id)
+    assert resumed.turn == fight.turn
+    assert (resumed.player.hp, resumed.boss.hp) == (fight.player.hp, fight.boss.hp)
+    action = greedy_policy(fight, random.Random(0))
+    assert resumed.step(action) == fight.step(action)
+
+
+def test_maybe_compact_runs_in_the_background(log):
+    _battle(log, "Ada", 1)
+    assert log.maybe_compact(threshold=1 << 30) is None
+    thread = log.maybe_compact(threshold=1)
+    thread.join()
+    assert log.open_battles() == {}
+    assert log.summaries()["Ada"]["battles"] == 1
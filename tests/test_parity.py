@@ -0,0 +1,69 @@
+"""The CLI and the web app must play the same battle from the same seed.
+
+Both start a fresh player against the same boss with the same seed, then
+make the same choices turn by turn; the event lists, the bars and the
+outcome have to match exactly.
+"""
+
+import json
+import random
+
+import pytest
+
+import app as web
+import engine
+from attacks import get_player_attacks
+from bosses import get_boss_templates
+from combat import play_turn
+from event_log import NullEventLog
+from player import Player
+from simulate import greedy_policy
+
+MAX_TURNS = 200
+BAR_FIELDS = ("player", "boss", "player_effects", "boss_effects", "turn")
+
+
+def _cli_battle(name, boss_index, seed):
+    player = Player(name)
+    player.restore_for_battle()
+    boss = get_boss_templates()[boss_index].spawn()
+    return engine.Battle(player, boss, get_player_attacks(), seed=seed)
+
+
+def _web_fight(client):
+    with client.session_transaction() as session:
+        return web.store.get(session["sid"]).fight
+
+
+def _bars(fight_json):
+    return {k: fight_json[k] for k in BAR_FIELDS}
+
+
+@pytest.mark.parametrize("boss_index,seed", [(0, 1), (1, 7), (3, 42), (5, 2024)])
+def test_cli_and_web_play_identical_battles(monkeypatch, boss_index, seed):
+    name = f"Parity{boss_index}-{seed}"
+    monkeypatch.setattr(engine, "new_seed", lambda: seed)
+    client = web.app.test_client()
+    client.post("/start", data={"name": name})
+    client.post("/battle/start", data={"boss_index": str(boss_index)})
+
+    fight = _cli_battle(name, boss_index, seed)
+    assert _bars(web.fight_json(_web_fight(client))) == _bars(web.fight_json(fight))
+
+    log = NullEventLog()
+    rng = random.Random(seed)
+    for _ in range(MAX_TURNS):
+        action = None if fight.player_stunned() else greedy_policy(fight, rng)
+        reply = client.post("/battle/action",
+                            json={"action_type": "attack", "attack_index": action or 0})
+        assert reply.status_code == 200, reply.get_json()
+        reply = reply.get_json()
+
+        events = json.loads(json.dumps(play_turn(fight, action, log)))
+        assert reply["events"] == events
+        assert _bars(reply) == _bars(web.fight_json(fight))
+        assert reply["battle_over"] == fight.over
+        assert reply["result"] == fight.result
+        if fight.over:
+            break
+    assert fight.over
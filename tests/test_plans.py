@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app as web
+from engine import InvalidAction
+from plans import MAX_PLAN_TURNS, MAX_STEPS, ActionPlan, parse_action
+
+
+def _fight(hp=100, energy=100, sanity=100, boss_hp=50):
+    return SimpleNamespace(player=SimpleNamespace(hp=hp, energy=energy, sanity=sanity),
+                           boss=SimpleNamespace(hp=boss_hp))
+
+
+def _attack(index, **extra):
+    return {"action_type": "attack", "attack_index": index, **extra}
+
+
+def test_from_json_builds_steps():
+    plan = ActionPlan.from_json({
+        "steps": [_attack(1, repeat=5, until={"energy_below": 20}), {"action_type": "run"}],
+        "loop": True,
+        "max_turns": 30,
+    })
+    assert [step.action for step in plan.steps] == [1, "run"]
+    assert [step.repeat for step in plan.steps] == [5, 1]
+    assert plan.loop and plan.max_turns == 30
+    assert ActionPlan.from_json({"steps": [_attack(0)]}).max_turns == MAX_PLAN_TURNS
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"steps": []},
+    {"steps": [_attack(0)] * (MAX_STEPS + 1)},
+    {"steps": ["attack"]},
+    {"steps": [_attack(0, repeat=0)]},
+    {"steps": [_attack(0, repeat=True)]},
+    {"steps": [_attack(0, until={"mana_below": 5})]},
+    {"steps": [_attack(0, until={"hp_above": 5})]},
+    {"steps": [_attack(0, until={"hp_below": "5"})]},
+    {"steps": [_attack(0, until=[])]},
+    {"steps": [_attack(0)], "max_turns": MAX_PLAN_TURNS + 1},
+])
+def test_from_json_rejects_malformed_plans(data):
+    with pytest.raises(InvalidAction):
+        ActionPlan.from_json(data)
+
+
+@pytest.mark.parametrize("data", [
+    ["attack"], "run", 3, _attack(True), _attack(-1), _attack(99), _attack("1"), {"action_type": "heal"},
+])
+def test_parse_action_rejects_bad_bodies(data):
+    with pytest.raises(InvalidAction):
+        parse_action(data)
+
+
+def test_parse_action():
+    assert parse_action({"action_type": "run"}) == "run"
+    assert parse_action(_attack(2)) == 2
+    assert parse_action({"action_type": "attack"}) == 0
+
+
+def test_until_stops_a_step_before_its_repeat_count():
+    plan = ActionPlan.from_json({"steps": [
+        _attack(1, repeat=99, until={"energy_below": 20}),
+        _attack(4, until={"boss_hp_at_least": 60}),
+    ]})
+    fight = _fight(energy=50)
+    assert plan.next_action(fight) == 1
+    fight.player.energy = 19
+    # The first step is over; the second is played once, its condition never holding
+    assert plan.next_action(fight) == 4
+    with pytest.raises(StopIteration):
+        plan.next_action(fight)
+
+
+def test_step_whose_condition_already_holds_is_skipped():
+    plan = ActionPlan.from_json({"steps": [_attack(1, until={"hp_below": 200}), _attack(0)]})
+    assert plan.next_action(_fight()) == 0
+
+
+def test_looping_plan_stops_at_max_turns():
+    plan = ActionPlan.from_json({"steps": [_attack(1, repeat=2), _attack(4)],
+                                 "loop": True, "max_turns": 7})
+    fight = _fight()
+    actions = []
+    with pytest.raises(StopIteration):
+        while True:
+            actions.append(plan.next_action(fight))
+    assert actions == [1, 1, 4, 1, 1, 4, 1]
+
+
+def test_loop_stops_when_a_whole_pass_plays_nothing():
+    plan = ActionPlan.from_json({"steps": [_attack(1, until={"sanity_at_least": 50})], "loop": True})
+    with pytest.raises(StopIteration):
+        plan.next_action(_fight(sanity=80))
+
+
+@pytest.mark.parametrize("body", [[1], "attack", 5])
+def test_action_routes_reject_non_object_bodies(body):
+    client = web.app.test_client()
+    client.post("/start", data={"name": "Planner"})
+    client.post("/battle/start", data={"boss_index": "0"})
+    response = client.post("/battle/action", json=body)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Action must be an object"
@@ -0,0 +1,26 @@
+import pytest
+
+import bench_saves
+import save_store
+from player import Player
+
+
+@pytest.fixture(params=["sqlite", "dir"])
+def store_url(request, tmp_path):
+    if request.param == "sqlite":
+        return f"sqlite:///{tmp_path}/saves.db"
+    return f"dir:///{tmp_path}/saves"
+
+
+def test_killing_a_writer_mid_save_leaves_no_torn_records(store_url):
+    assert bench_saves.run_crash_check(store_url, 5) == 0
+
+
+def test_set_save_store_routes_player_saves(store_url, monkeypatch):
+    monkeypatch.setattr(save_store, "_store", None)
+    store = save_store.set_save_store(save_store.make_save_store(store_url))
+    player = Player("Routed")
+    player.wins = 3
+    player.save()
+    assert store.get("Routed")["wins"] == 3
+    assert save_store.get_save_store() is store
@@ -0,0 +1,76 @@
+"""The solver on a matchup small enough to solve exactly in a second or two.
+
+Its win probability has to agree with playing its own policy through
+engine.Battle, and beat a fixed policy; past max_states it has to stop.
+"""
+
+import random
+
+import pytest
+
+from attacks import Attack, get_player_attacks
+from bosses import Boss
+from engine import Battle
+from player import Player
+from simulate import wilson_interval
+from solver import Solver, StateLimitExceeded
+
+FIGHTS = 3000
+
+
+def _player():
+    player = Player("Solver")
+    player.max_hp = player.hp = 20
+    player.max_energy = player.energy = 40
+    player.max_sanity = player.sanity = 10
+    return player
+
+
+def _boss():
+    nag = Attack("Nag", 8, 80, status_effect={"name": "stun", "chance": 20, "turns": 1})
+    return Boss("Tiny", 1, 20, [nag])
+
+
+def _attacks():
+    # Educated Guess, Actually Study, Cry, Procrastinate: no effects on the boss
+    attacks = get_player_attacks()
+    return [attacks[0], attacks[1], attacks[3], attacks[4]]
+
+
+def _win_rate(policy, seed):
+    rng = random.Random(seed)
+    wins = 0
+    for i in range(FIGHTS):
+        fight = Battle(_player(), _boss(), _attacks(), seed=seed * FIGHTS + i)
+        while not fight.over:
+            fight.step(None if fight.player_stunned() else policy(fight, rng))
+        wins += fight.result == "victory"
+    return wins
+
+
+@pytest.fixture(scope="module")
+def solver():
+    solver = Solver(_player(), _boss(), _attacks(), allow_run=False, keep_values=True)
+    solver.value = solver.solve()
+    return solver
+
+
+def test_optimal_policy_wins_as_often_as_predicted(solver):
+    low, high = wilson_interval(_win_rate(solver.as_policy(), 1), FIGHTS)
+    assert low <= solver.value <= high
+
+
+def test_optimal_policy_beats_a_fixed_one(solver):
+    low, _ = wilson_interval(_win_rate(lambda fight, rng: 0, 2), FIGHTS)
+    assert solver.value > low
+
+
+def test_values_are_kept_for_live_battles(solver):
+    fight = Battle(_player(), _boss(), _attacks(), seed=0)
+    assert solver.win_probability(fight) == pytest.approx(solver.value)
+    assert solver.best_action(fight) in range(len(_attacks()))
+
+
+def test_stops_past_max_states():
+    with pytest.raises(StateLimitExceeded):
+        Solver(_player(), _boss(), _attacks(), max_states=100).solve()